@@ -1,6 +1,8 @@
 import streamlit as st
 from utils import project_id, run_query
 from millify import millify
+from progressive import Section, load_concurrently, placeholder, render_when_ready
+from search import search_box
 
 st.set_page_config(
     page_title="Singapore Parliament Speeches",
@@ -19,10 +21,12 @@ def get_dataset_overview():
     return run_query(query)[0]
 
 
-def get_member_counts(latest_date):
+def get_member_counts():
     query = f"""
     select
-        countif(latest_sitting = '{latest_date}') as count_current_members,
+        countif(
+            latest_sitting = (select max(date) from `{project_id}.prod_fact.fact_sittings`)
+        ) as count_current_members,
         count(*) as count_members
     from `{project_id}.prod_dim.dim_members`
     where member_name != ''
@@ -49,36 +53,62 @@ def get_bill_counts():
     return run_query(query)[0]
 
 
-# Fetch data
-min_max_sittings = get_dataset_overview()
-earliest_date = min_max_sittings["earliest_date"].strftime("%Y-%m-%d")
-latest_date = min_max_sittings["latest_date"].strftime("%Y-%m-%d")
-count_members = get_member_counts(latest_date)
-count_speeches = get_speech_counts()
-count_bills = get_bill_counts()
+def display_overview(min_max_sittings):
+    earliest_date = min_max_sittings["earliest_date"].strftime("%Y-%m-%d")
+    latest_date = min_max_sittings["latest_date"].strftime("%Y-%m-%d")
+    st.write(
+        f"The earliest sitting in this dataset is _**{earliest_date}**_, and the latest sitting available in this dataset is _**{latest_date}**_. There is information from _**{min_max_sittings['count_sittings']}**_ sittings in this dataset."
+    )
+
+
+def display_member_counts(count_members):
+    st.metric("# Current Members", count_members["count_current_members"])
+    st.metric("# Members (Past & Present)", count_members["count_members"])
+
+
+def display_speech_counts(count_speeches):
+    st.metric("# Speeches", millify(count_speeches["count_speeches"], precision=1))
+    st.metric("# Topics", millify(count_speeches["count_topics"], precision=1))
+
+
+def display_bill_counts(count_bills):
+    st.metric("# Bills", millify(count_bills["count_bills"], precision=1))
+
+
+def display_question_counts(count_speeches):
+    st.metric(
+        "# Primary Questions",
+        millify(count_speeches["count_primary_questions"], precision=1),
+    )
+
 
 ### FRONTEND
 st.title("Singapore Parliament Speeches")
+search_box()
 st.markdown(
     "This webapp is built to help Singaporeans understand the legislative outputs of their elected representatives."
 )
 st.subheader("Dataset overview")
-st.write(
-    f"The earliest sitting in this dataset is _**{earliest_date}**_, and the latest sitting available in this dataset is _**{latest_date}**_. There is information from _**{min_max_sittings['count_sittings']}**_ sittings in this dataset."
+
+# the layout below is drawn while these load, and filled in as each finishes
+data = load_concurrently(
+    {
+        "overview": get_dataset_overview,
+        "member_counts": get_member_counts,
+        "speech_counts": get_speech_counts,
+        "bill_counts": get_bill_counts,
+    }
 )
+
+overview = placeholder("dataset overview")
 col1, col2, col3 = st.columns(3, gap="medium")
 with col1:
-    st.metric("# Current Members", count_members["count_current_members"])
-    st.metric("# Members (Past & Present)", count_members["count_members"])
+    member_counts = placeholder("member counts")
 with col2:
-    st.metric("# Speeches", millify(count_speeches["count_speeches"], precision=1))
-    st.metric("# Topics", millify(count_speeches["count_topics"], precision=1))
+    speech_counts = placeholder("speech counts")
 with col3:
-    st.metric("# Bills", millify(count_bills["count_bills"], precision=1))
-    st.metric(
-        "# Primary Questions",
-        millify(count_speeches["count_primary_questions"], precision=1),
-    )
+    bill_counts = placeholder("bill counts")
+    question_counts = placeholder("question counts")
 st.image(
     image="images/Parliament_house_Singapore_edge.png",
     caption="ProjectManhattan., CC BY-SA 3.0, via Wikimedia Commons"
@@ -93,3 +123,14 @@ st.warning(
            While best efforts are made to ensure the information is accurate, there may be inevitable parsing errors. Please use the information here with caution and check the underlying data.
            """
 )
+
+render_when_ready(
+    data,
+    [
+        Section(overview, ("overview",), display_overview),
+        Section(member_counts, ("member_counts",), display_member_counts),
+        Section(speech_counts, ("speech_counts",), display_speech_counts),
+        Section(bill_counts, ("bill_counts",), display_bill_counts),
+        Section(question_counts, ("speech_counts",), display_question_counts),
+    ],
+)
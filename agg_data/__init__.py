@@ -1,9 +1,44 @@
+import os
+
+import pandas as pd
 import streamlit as st
-from utils import project_id, query_to_dataframe
+from utils import project_id, query_to_dataframe, run_query
 
+# where the sync job (python -m sync) keeps local copies of the datasets below
+SYNCED_DATA_DIR = os.path.join("data", "sync")
 
-def get_member_list():
+
+@st.cache_data(max_entries=20)
+def _read_parquet(path, modified_time):
+    return pd.read_parquet(path)
+
+
+def read_synced_dataset(name):
+    """
+    Returns the locally synced copy of a dataset, or None if it has not been synced.
+    """
+    path = os.path.join(SYNCED_DATA_DIR, f"{name}.parquet")
+    if not os.path.exists(path):
+        return None
+    # the modification time is part of the cache key, so each sync is picked up
+    return _read_parquet(path, os.path.getmtime(path))
+
+
+def get_data_version():
+    """
+    Identifies the current state of the dataset by its latest sitting, for
+    caches which should only be invalidated when new sittings arrive.
+    """
     query = f"""
+    select cast(max(date) as string) as latest_date, count(*) as count_sittings
+    from `{project_id}.prod_fact.fact_sittings`
+    """
+    row = run_query(query)[0]
+    return f"{row['latest_date']}-{row['count_sittings']}"
+
+
+def member_list_query(where_clause="true"):
+    return f"""
     select
         member_name,
         member_birth_year,
@@ -16,20 +51,40 @@ def get_member_list():
         count_sittings_total,
         latest_sitting = max(latest_sitting) over() as is_active
     from `{project_id}.prod_dim.dim_members`
-    where member_name != '' and member_name is not null
+    where member_name != '' and member_name is not null and ({where_clause})
     """
-    return query_to_dataframe(query)
 
 
-def get_member_positions():
-    query = f"""
-    select * from `{project_id}.prod_fact.fact_member_positions`
+def get_member_list():
+    synced = read_synced_dataset("member_list")
+    if synced is not None:
+        return synced.copy()
+    return query_to_dataframe(member_list_query())
+
+
+def member_positions_query(where_clause="true"):
+    return f"""
+    select
+        member_name,
+        member_position,
+        type,
+        effective_from_date,
+        effective_to_date,
+        is_latest_position
+    from `{project_id}.prod_fact.fact_member_positions`
+    where {where_clause}
     """
-    return query_to_dataframe(query)
 
 
-def get_all_member_speeches():
-    query = f"""
+def get_member_positions():
+    synced = read_synced_dataset("member_positions")
+    if synced is not None:
+        return synced.copy()
+    return query_to_dataframe(member_positions_query())
+
+
+def all_member_speeches_query(where_clause="true"):
+    return f"""
       select
           parliament,
           year,
@@ -49,8 +104,15 @@ def get_all_member_speeches():
           count_sentences,
           count_syllables
       from `{project_id}.prod_agg.agg_speech_metrics_by_member`
+      where {where_clause}
     """
-    return query_to_dataframe(query)
+
+
+def get_all_member_speeches():
+    synced = read_synced_dataset("member_speeches")
+    if synced is not None:
+        return synced.copy()
+    return query_to_dataframe(all_member_speeches_query())
 
 
 def primary_question_topics():
@@ -0,0 +1,194 @@
+import functools
+import hashlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pyarrow as pa
+
+from agg_data import (
+    get_all_member_speeches,
+    get_data_version,
+    get_member_list,
+    get_member_positions,
+)
+from members import aggregate_member_metrics
+from utils import calculate_readability_vectorised
+
+API_HOST = "127.0.0.1"
+API_PORT = 8502
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# consumers may reuse a response for this long before revalidating it
+CACHE_MAX_AGE = 300
+
+# seconds between checks for a new data version
+DATA_VERSION_TTL = 300
+
+
+def _member_metrics(group_by_fields):
+    return lambda: aggregate_member_metrics(
+        get_all_member_speeches(), calculate_readability_vectorised, group_by_fields
+    )
+
+
+DATASETS: Dict[str, Callable[[], pd.DataFrame]] = {
+    "members": get_member_list,
+    "positions": get_member_positions,
+    "speeches": get_all_member_speeches,
+    "metrics/members": _member_metrics(
+        ["member_name", "member_party", "member_constituency"]
+    ),
+    "metrics/members-by-parliament": _member_metrics(
+        ["member_name", "member_party", "member_constituency", "parliament"]
+    ),
+    "metrics/constituencies": _member_metrics(["member_constituency", "parliament"]),
+    "metrics/parliaments": _member_metrics(["parliament"]),
+}
+
+
+# st.cache_data only persists within the Streamlit runtime, which this server
+# runs outside of, so it keeps its own caches
+_data_version_lock = threading.Lock()
+_data_version = (float("-inf"), "")
+
+
+def current_data_version() -> str:
+    """
+    Returns the data version, checking it at most every DATA_VERSION_TTL seconds.
+    """
+    global _data_version
+    with _data_version_lock:
+        checked_at, data_version = _data_version
+        if time.monotonic() - checked_at > DATA_VERSION_TTL:
+            _data_version = (time.monotonic(), get_data_version())
+        return _data_version[1]
+
+
+@functools.lru_cache(maxsize=len(DATASETS) * 2)
+def load_dataset(name: str, data_version: str) -> pd.DataFrame:
+    return DATASETS[name]()
+
+
+def dataset_etag(name: str, data_version: str, media_type: str) -> str:
+    """
+    Returns the ETag of a dataset's encoding. It only depends on the data
+    version, dataset and format, so it is known without encoding anything.
+    """
+    etag = hashlib.sha256(f"{data_version}/{name}/{media_type}".encode()).hexdigest()[
+        :32
+    ]
+    return f'"{etag}"'
+
+
+@functools.lru_cache(maxsize=len(DATASETS) * 4)
+def encode_dataset(name: str, data_version: str, media_type: str) -> bytes:
+    """
+    Encodes a dataset for the API, once per data version and format.
+
+    Parameters:
+    - name (str): Key of the dataset in DATASETS.
+    - data_version (str): Output of `get_data_version`, part of the cache key.
+    - media_type (str): JSON_MEDIA_TYPE or ARROW_MEDIA_TYPE.
+
+    Returns:
+    - bytes: The encoded dataset.
+    """
+    dataset = load_dataset(name, data_version)
+    if media_type == ARROW_MEDIA_TYPE:
+        table = pa.Table.from_pandas(dataset, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue()
+    else:
+        body = dataset.to_json(orient="records", date_format="iso").encode()
+    return body
+
+
+def negotiate_media_type(query: dict, accept: str) -> str:
+    requested = query.get("format", [""])[0]
+    if requested == "arrow" or (not requested and ARROW_MEDIA_TYPE in accept):
+        return ARROW_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # weak tags match too: the encodings never differ for the same tag
+    tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+    return "*" in tags or etag in tags
+
+
+class DataRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves GET /<dataset>[?format=json|arrow] for every dataset in DATASETS,
+    and GET / to list them. Responses carry an ETag tied to the data version,
+    and requests with a matching If-None-Match are answered with 304 Not
+    Modified without encoding anything. Datasets which fail to load are
+    answered with 500 and a JSON error.
+    """
+
+    server_version = "SingaporeParliamentSpeechesAPI"
+
+    def do_GET(self, include_body=True):
+        url = urlparse(self.path)
+        name = url.path.strip("/")
+        if not name:
+            return self.send_body(
+                200,
+                JSON_MEDIA_TYPE,
+                json.dumps(sorted(DATASETS)).encode(),
+                include_body,
+            )
+        if name not in DATASETS:
+            message = json.dumps({"error": f"Unknown dataset: {name}"}).encode()
+            return self.send_body(404, JSON_MEDIA_TYPE, message, include_body)
+
+        media_type = negotiate_media_type(
+            parse_qs(url.query), self.headers.get("Accept", "")
+        )
+        try:
+            data_version = current_data_version()
+            etag = dataset_etag(name, data_version, media_type)
+            if etag_matches(self.headers.get("If-None-Match", ""), etag):
+                self.send_response(304)
+                self.send_cache_headers(etag)
+                self.end_headers()
+                return
+            body = encode_dataset(name, data_version, media_type)
+        except Exception as error:
+            # e.g. BigQuery unavailable or over budget; the failure isn't cached
+            self.log_error("Could not load %s: %r", name, error)
+            message = json.dumps({"error": f"Could not load dataset: {name}"}).encode()
+            return self.send_body(500, JSON_MEDIA_TYPE, message, include_body)
+        self.send_body(200, media_type, body, include_body, etag)
+
+    def do_HEAD(self):
+        self.do_GET(include_body=False)
+
+    def send_cache_headers(self, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"public, max-age={CACHE_MAX_AGE}")
+        self.send_header("Vary", "Accept")
+
+    def send_body(self, status, media_type, body, include_body=True, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", media_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_cache_headers(etag)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+
+def serve(host: str = API_HOST, port: int = API_PORT):
+    ThreadingHTTPServer((host, port), DataRequestHandler).serve_forever()
@@ -0,0 +1,13 @@
+import argparse
+
+from api import API_HOST, API_PORT, serve
+
+parser = argparse.ArgumentParser(
+    description="Serve the app's datasets and member metrics as a read-only JSON/Arrow API."
+)
+parser.add_argument("--host", default=API_HOST)
+parser.add_argument("--port", type=int, default=API_PORT)
+args = parser.parse_args()
+
+print(f"Serving on http://{args.host}:{args.port}/")
+serve(args.host, args.port)
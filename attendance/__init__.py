@@ -0,0 +1,246 @@
+import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import project_id, run_query, stream_query
+
+# number of set bits in each byte value
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class AttendanceBitsets(NamedTuple):
+    """
+    Per-sitting attendance as one bitset per member over the ordered sittings.
+
+    - sitting_dates (np.ndarray): Sorted dates of all sittings, as datetime64[D].
+    - member_names (np.ndarray): Member name of each row.
+    - present (np.ndarray): Packed bits (members x sittings), set where the member was present.
+    - eligible (np.ndarray): Packed bits (members x sittings), set where the member
+      was a member at the sitting, i.e. their attendance was taken.
+    """
+
+    sitting_dates: np.ndarray
+    member_names: np.ndarray
+    present: np.ndarray
+    eligible: np.ndarray
+
+
+def build_attendance_bitsets(sitting_dates, attendance_batches) -> AttendanceBitsets:
+    """
+    Builds attendance bitsets from batches of (date, member_name, is_present)
+    rows, holding only one batch of rows in memory at a time.
+
+    Parameters:
+    - sitting_dates (Iterable): Dates of all sittings.
+    - attendance_batches (Iterable[pd.DataFrame]): Batches of attendance rows.
+
+    Returns:
+    - AttendanceBitsets: The attendance bitsets.
+    """
+    sitting_dates = np.unique(np.asarray(sitting_dates, dtype="datetime64[D]"))
+    count_bytes = (len(sitting_dates) + 7) // 8
+
+    member_rows = {}
+    present = np.zeros((0, count_bytes), dtype=np.uint8)
+    eligible = np.zeros((0, count_bytes), dtype=np.uint8)
+
+    for batch in attendance_batches:
+        batch = batch.dropna(subset=["member_name", "date"])
+        for member_name in batch["member_name"].unique():
+            member_rows.setdefault(member_name, len(member_rows))
+        if len(member_rows) > len(present):
+            added_rows = np.zeros(
+                (len(member_rows) - len(present), count_bytes), np.uint8
+            )
+            present = np.vstack([present, added_rows])
+            eligible = np.vstack([eligible, added_rows])
+
+        rows = batch["member_name"].map(member_rows).to_numpy()
+        dates = batch["date"].to_numpy(dtype="datetime64[D]")
+        sittings = np.searchsorted(sitting_dates, dates)
+        # attendance on a date which is not a sitting is dropped, rather than
+        # counted at the next sitting
+        known_sitting = sittings < len(sitting_dates)
+        known_sitting[known_sitting] = (
+            sitting_dates[sittings[known_sitting]] == dates[known_sitting]
+        )
+        rows, sittings = rows[known_sitting], sittings[known_sitting]
+        is_present = batch["is_present"].to_numpy(dtype=bool)[known_sitting]
+
+        # bits are packed big-endian within each byte, as np.packbits does
+        bytes_, bits = np.divmod(sittings, 8)
+        masks = (np.uint8(0x80) >> bits.astype(np.uint8)).astype(np.uint8)
+        np.bitwise_or.at(eligible, (rows, bytes_), masks)
+        np.bitwise_or.at(
+            present, (rows[is_present], bytes_[is_present]), masks[is_present]
+        )
+
+    return AttendanceBitsets(
+        sitting_dates, np.asarray(list(member_rows)), present, eligible
+    )
+
+
+def _sitting_range(
+    bitsets: AttendanceBitsets,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+) -> Tuple[int, int]:
+    start = 0
+    end = len(bitsets.sitting_dates)
+    if start_date is not None:
+        start = np.searchsorted(bitsets.sitting_dates, np.datetime64(start_date, "D"))
+    if end_date is not None:
+        end = np.searchsorted(
+            bitsets.sitting_dates, np.datetime64(end_date, "D"), side="right"
+        )
+    return int(start), int(end)
+
+
+def _range_mask(count_sittings: int, start: int, end: int) -> np.ndarray:
+    in_range = np.zeros(count_sittings, dtype=bool)
+    in_range[start:end] = True
+    return np.packbits(in_range)
+
+
+def attendance_in_range(
+    bitsets: AttendanceBitsets,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+) -> pd.DataFrame:
+    """
+    Counts the sittings each member attended, and could have attended, between
+    two dates (inclusive) by popcount over the masked bitsets.
+
+    Returns:
+    - pd.DataFrame: Columns 'member_name', 'count_sittings_attended' and
+      'count_sittings_total', for members with at least one sitting in the range.
+    """
+    start, end = _sitting_range(bitsets, start_date, end_date)
+    mask = _range_mask(len(bitsets.sitting_dates), start, end)
+    attendance = pd.DataFrame(
+        {
+            "member_name": bitsets.member_names,
+            "count_sittings_attended": POPCOUNT[bitsets.present & mask].sum(axis=1),
+            "count_sittings_total": POPCOUNT[bitsets.eligible & mask].sum(axis=1),
+        }
+    )
+    return attendance[attendance["count_sittings_total"] > 0].reset_index(drop=True)
+
+
+def _member_row(bitsets: AttendanceBitsets, member_name: str) -> Optional[int]:
+    rows = np.flatnonzero(bitsets.member_names == member_name)
+    return int(rows[0]) if len(rows) else None
+
+
+def member_attendance(bitsets: AttendanceBitsets, member_name: str) -> pd.DataFrame:
+    """
+    Returns the attendance of one member at every sitting they were a member for.
+    """
+    row = _member_row(bitsets, member_name)
+    if row is None:
+        return pd.DataFrame(columns=["date", "is_present"])
+    count_sittings = len(bitsets.sitting_dates)
+    eligible = np.unpackbits(bitsets.eligible[row], count=count_sittings).astype(bool)
+    present = np.unpackbits(bitsets.present[row], count=count_sittings).astype(bool)
+    return pd.DataFrame(
+        {"date": bitsets.sitting_dates[eligible], "is_present": present[eligible]}
+    )
+
+
+def longest_absence_streaks(
+    bitsets: AttendanceBitsets,
+    member_names: List[str],
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+) -> pd.DataFrame:
+    """
+    Finds the longest run of consecutive sittings each of some members missed,
+    among the sittings they were a member for, between two dates (inclusive).
+    Only the rows of these members are unpacked.
+
+    Parameters:
+    - bitsets (AttendanceBitsets): Output of `get_attendance_bitsets`.
+    - member_names (List[str]): The members; members without attendance are left out.
+    - start_date (datetime.date): First day of the period.
+    - end_date (datetime.date): Last day of the period.
+
+    Returns:
+    - pd.DataFrame: Columns 'member_name', 'longest_absence' (in sittings),
+      'absence_from' and 'absence_to' (dates of the first and last sitting missed).
+    """
+    start, end = _sitting_range(bitsets, start_date, end_date)
+    count_sittings = len(bitsets.sitting_dates)
+    dates = bitsets.sitting_dates[start:end]
+
+    streaks = []
+    for member_name in member_names:
+        row = _member_row(bitsets, member_name)
+        if row is None:
+            continue
+        eligible = np.unpackbits(bitsets.eligible[row], count=count_sittings)[start:end]
+        present = np.unpackbits(bitsets.present[row], count=count_sittings)[start:end]
+        # sittings outside the member's term do not break or extend a streak
+        member_sittings = np.flatnonzero(eligible)
+        absent = present[member_sittings] == 0
+        if not absent.any():
+            streaks.append((member_name, 0, pd.NaT, pd.NaT))
+            continue
+        # run lengths of absences, from where each run starts and ends
+        edges = np.diff(np.concatenate([[0], absent.astype(np.int8), [0]]))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        longest = np.argmax(run_ends - run_starts)
+        streaks.append(
+            (
+                member_name,
+                int(run_ends[longest] - run_starts[longest]),
+                dates[member_sittings[run_starts[longest]]],
+                dates[member_sittings[run_ends[longest] - 1]],
+            )
+        )
+
+    return pd.DataFrame(
+        streaks,
+        columns=["member_name", "longest_absence", "absence_from", "absence_to"],
+    )
+
+
+def co_attendance(
+    bitsets: AttendanceBitsets,
+    member_name: str,
+    other_member_name: str,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+) -> Tuple[int, int]:
+    """
+    Counts the sittings two members both attended, out of the sittings both
+    were members for, between two dates (inclusive).
+    """
+    row = _member_row(bitsets, member_name)
+    other_row = _member_row(bitsets, other_member_name)
+    if row is None or other_row is None:
+        return 0, 0
+    start, end = _sitting_range(bitsets, start_date, end_date)
+    mask = _range_mask(len(bitsets.sitting_dates), start, end)
+    both_present = bitsets.present[row] & bitsets.present[other_row] & mask
+    both_eligible = bitsets.eligible[row] & bitsets.eligible[other_row] & mask
+    return int(POPCOUNT[both_present].sum()), int(POPCOUNT[both_eligible].sum())
+
+
+@st.cache_data(ttl=6000)
+def get_attendance_bitsets() -> AttendanceBitsets:
+    sittings = run_query(
+        f"select distinct date from `{project_id}.prod_fact.fact_sittings`"
+    )
+    attendance_query = f"""
+    select date, member_name, is_present
+    from `{project_id}.prod_fact.fact_attendance`
+    where member_name != '' and member_name is not null
+    """
+    return build_attendance_bitsets(
+        [row["date"] for row in sittings],
+        (batch for batch, _ in stream_query(attendance_query)),
+    )
@@ -0,0 +1,53 @@
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils import calculate_readability_vectorised
+
+BASELINE_QUANTILES = {"p25": 0.25, "median": 0.5, "p75": 0.75}
+
+
+def cohort_baselines(
+    member_summary: pd.DataFrame,
+    group_by_fields: List[str],
+    column_names: List[str],
+    quantiles: Optional[Dict[str, float]] = None,
+) -> pd.DataFrame:
+    """
+    Calculates the cohort baseline of each metric per group (e.g. per year, or
+    per year and party): the mean and quantiles over members, ignoring zero values,
+    and the overall readability from the summed counts.
+
+    All groups and metrics are computed in a single grouped pass.
+
+    Parameters:
+    - member_summary (pd.DataFrame): One row per member and group, e.g. from
+      `aggregate_member_metrics` grouped by ["member_name", "year"].
+    - group_by_fields (List[str]): List of fields to group by.
+    - column_names (List[str]): Metrics to calculate baselines for.
+    - quantiles (Dict[str, float]): Column prefix and quantile of each band edge;
+      defaults to BASELINE_QUANTILES.
+
+    Returns:
+    - pd.DataFrame: One row per group, with 'avg_<metric>' and '<prefix>_<metric>'
+      columns and 'overall_readability'. Averages are 0 where all values are zero.
+    """
+    quantiles = BASELINE_QUANTILES if quantiles is None else quantiles
+    keys = [member_summary[field] for field in group_by_fields]
+    metrics = member_summary[column_names]
+    non_zero = metrics.where(metrics != 0).groupby(keys)
+
+    averages = non_zero.mean().fillna(0).add_prefix("avg_")
+
+    bands = non_zero.quantile(list(quantiles.values())).unstack()
+    prefixes = {q: prefix for prefix, q in quantiles.items()}
+    bands.columns = [f"{prefixes[q]}_{col}" for col, q in bands.columns]
+
+    readability_totals = member_summary.groupby(group_by_fields)[
+        ["count_words", "count_sentences", "count_syllables"]
+    ].sum()
+    overall_readability = calculate_readability_vectorised(
+        readability_totals
+    ).rename("overall_readability")
+
+    return pd.concat([averages, bands, overall_readability], axis=1).reset_index()
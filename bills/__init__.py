@@ -0,0 +1,154 @@
+import datetime
+from typing import Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from utils import project_id, query_to_dataframe, run_parameterised_query
+
+BILLS_PER_PAGE = 25
+BILL_STATUSES = ["First Reading", "Second Reading", "Passed"]
+
+
+def bills_query(
+    parliaments: Tuple[int, ...] = (),
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+    statuses: Tuple[str, ...] = (),
+    keyword: str = "",
+    after: Optional[Tuple[Optional[datetime.date], str]] = None,
+    limit: int = BILLS_PER_PAGE,
+):
+    """
+    Builds the query for one page of bills, newest first, and its parameters.
+
+    Pages are fetched with a keyset cursor on (first_reading_date, bill_number)
+    rather than OFFSET, so BigQuery never reads the rows of earlier pages into
+    the result. Bills without a first reading date come last. One row more than
+    `limit` is fetched to tell if there is a next page.
+
+    Returns:
+    - Tuple[str, Tuple]: The query, and parameters for `run_parameterised_query`.
+    """
+    filters = []
+    parameters = [("limit", "INT64", limit + 1)]
+    if parliaments:
+        filters.append("parliament in unnest(@parliaments)")
+        parameters.append(("parliaments", "INT64", tuple(parliaments)))
+    if start_date:
+        filters.append("first_reading_date >= @start_date")
+        parameters.append(("start_date", "DATE", start_date))
+    if end_date:
+        filters.append("first_reading_date <= @end_date")
+        parameters.append(("end_date", "DATE", end_date))
+    if statuses:
+        filters.append("status in unnest(@statuses)")
+        parameters.append(("statuses", "STRING", tuple(statuses)))
+    if keyword:
+        filters.append("contains_substr(title, @keyword)")
+        parameters.append(("keyword", "STRING", keyword))
+    if after:
+        after_date, after_bill_number = after
+        if after_date is None:
+            filters.append(
+                "(first_reading_date is null and bill_number < @after_bill_number)"
+            )
+        else:
+            filters.append(
+                "(first_reading_date < @after_date"
+                " or (first_reading_date = @after_date and bill_number < @after_bill_number)"
+                " or first_reading_date is null)"
+            )
+            parameters.append(("after_date", "DATE", after_date))
+        parameters.append(("after_bill_number", "STRING", after_bill_number))
+
+    query = f"""
+    select *
+    from (
+        select
+            bill_number,
+            title,
+            parliament,
+            first_reading_date,
+            second_reading_date,
+            third_reading_date,
+            case
+                when third_reading_date is not null then 'Passed'
+                when second_reading_date is not null then 'Second Reading'
+                else 'First Reading'
+            end as status
+        from `{project_id}.prod_mart.mart_bills`
+    )
+    {'where ' + ' and '.join(filters) if filters else ''}
+    order by first_reading_date desc nulls last, bill_number desc
+    limit @limit
+    """
+    return query, tuple(parameters)
+
+
+@st.cache_data(max_entries=1000)
+def get_bills_page(
+    data_version: str,
+    parliaments: Tuple[int, ...] = (),
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+    statuses: Tuple[str, ...] = (),
+    keyword: str = "",
+    after: Optional[Tuple[Optional[datetime.date], str]] = None,
+    limit: int = BILLS_PER_PAGE,
+) -> Tuple[pd.DataFrame, Optional[Tuple[Optional[datetime.date], str]]]:
+    """
+    Fetches one page of bills matching the filters. Pages are cached until the
+    data version changes, i.e. until new sittings arrive.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`; only used as part of the cache key.
+    - parliaments (Tuple[int, ...]): Only return bills from these parliaments.
+    - start_date (datetime.date): Only return bills first read on or after this date.
+    - end_date (datetime.date): Only return bills first read on or before this date.
+    - statuses (Tuple[str, ...]): Only return bills with these statuses (see BILL_STATUSES).
+    - keyword (str): Only return bills whose title contains this text (case-insensitive).
+    - after (Tuple[Optional[datetime.date], str]): Cursor returned with the previous page.
+    - limit (int): Number of bills per page.
+
+    Returns:
+    - Tuple[pd.DataFrame, Optional[Tuple[Optional[datetime.date], str]]]: The bills,
+      and the cursor for the next page (None on the last page).
+    """
+    query, parameters = bills_query(
+        parliaments, start_date, end_date, statuses, keyword, after, limit
+    )
+    bills = pd.DataFrame(run_parameterised_query(query, parameters))
+
+    next_cursor = None
+    if len(bills) > limit:
+        bills = bills.iloc[:limit]
+        last = bills.iloc[-1]
+        first_reading_date = last["first_reading_date"]
+        next_cursor = (
+            None
+            if pd.isna(first_reading_date)
+            else pd.Timestamp(first_reading_date).date(),
+            str(last["bill_number"]),
+        )
+    return bills, next_cursor
+
+
+@st.cache_data(max_entries=2)
+def get_bill_titles(data_version: str) -> pd.DataFrame:
+    """
+    Fetches the number and title of every bill, e.g. for the search index.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`; only used as part of the cache key.
+
+    Returns:
+    - pd.DataFrame: The 'bill_number' and 'title' of each bill, newest first.
+    """
+    query = f"""
+    select bill_number, title
+    from `{project_id}.prod_mart.mart_bills`
+    where title is not null
+    order by first_reading_date desc nulls last, bill_number desc
+    """
+    return query_to_dataframe(query)
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agg_data import get_all_member_speeches, get_member_list, get_member_positions
+from members import MEMBER_COUNT_COLUMNS, calculate_member_metrics
+from utils import calculate_readability_vectorised
+
+AGE_BINS = [0, 40, 50, 60, 200]
+AGE_LABELS = ["Under 40", "40 to 49", "50 to 59", "60 and above"]
+TENURE_BINS = [-1, 4, 9, 200]
+TENURE_LABELS = ["Under 5 years", "5 to 9 years", "10 years and above"]
+
+DEMOGRAPHIC_FIELDS = {
+    "age_group": "Age at Sitting",
+    "member_party": "Party",
+    "tenure_group": "Tenure",
+    "appointment_status": "Appointment",
+}
+
+
+def assign_demographics(
+    speech_summary: pd.DataFrame,
+    members_df: pd.DataFrame,
+    member_positions: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Labels each member x month row of speech metrics with the member's age
+    group, tenure group and appointment status in that month.
+
+    Tenure counts years since the member's earliest sitting in the dataset,
+    so members first elected before it are under-counted.
+
+    Parameters:
+    - speech_summary (pd.DataFrame): Output of `get_all_member_speeches`.
+    - members_df (pd.DataFrame): Output of `get_member_list`.
+    - member_positions (pd.DataFrame): Output of `get_member_positions`.
+
+    Returns:
+    - pd.DataFrame: `speech_summary` with 'age_group', 'tenure_group' and
+      'appointment_status' columns. Unknown ages, tenures and parties are
+      labelled "Unknown", so that their rows are still counted.
+    """
+    members = members_df[["member_name", "member_birth_year", "earliest_sitting"]]
+    labelled = speech_summary.merge(members, how="left", on="member_name")
+
+    age = labelled["year"] - pd.to_numeric(labelled["member_birth_year"])
+    labelled["age_group"] = pd.cut(age, bins=AGE_BINS, labels=AGE_LABELS, right=False)
+    labelled["age_group"] = (
+        labelled["age_group"].cat.add_categories("Unknown").fillna("Unknown")
+    )
+
+    tenure = labelled["year"] - pd.to_datetime(labelled["earliest_sitting"]).dt.year
+    labelled["tenure_group"] = pd.cut(tenure, bins=TENURE_BINS, labels=TENURE_LABELS)
+    labelled["tenure_group"] = (
+        labelled["tenure_group"].cat.add_categories("Unknown").fillna("Unknown")
+    )
+    labelled["member_party"] = labelled["member_party"].fillna("Unknown")
+
+    # a month counts as held with an appointment if any appointment overlaps it
+    month_start = pd.to_datetime(
+        dict(year=labelled["year"], month=labelled["month"], day=1)
+    )
+    month_end = month_start + pd.offsets.MonthEnd(0)
+    appointments = member_positions[member_positions["type"] == "appointment"]
+    row_ids = pd.DataFrame(
+        {"row": np.arange(len(labelled)), "member_name": labelled["member_name"]}
+    )
+    overlaps = row_ids.merge(
+        appointments[["member_name", "effective_from_date", "effective_to_date"]],
+        on="member_name",
+    )
+    overlaps_from = pd.to_datetime(overlaps["effective_from_date"])
+    overlaps_to = pd.to_datetime(overlaps["effective_to_date"]).fillna(pd.Timestamp.max)
+    overlapping = (overlaps_from <= month_end.iloc[overlaps["row"]].to_numpy()) & (
+        overlaps_to >= month_start.iloc[overlaps["row"]].to_numpy()
+    )
+    has_appointment = np.zeros(len(labelled), dtype=bool)
+    has_appointment[overlaps.loc[overlapping, "row"].to_numpy()] = True
+    labelled["appointment_status"] = np.where(
+        has_appointment, "Political Appointee", "Backbencher"
+    )
+
+    return labelled.drop(columns=["member_birth_year", "earliest_sitting"])
+
+
+@st.cache_data(ttl=6000)
+def get_demographic_cube() -> pd.DataFrame:
+    """
+    Sums member speech counts by parliament, year and every demographic field.
+    Any metric can be pivoted by any demographic by summing the cube further
+    and applying `calculate_member_metrics`.
+    """
+    labelled = assign_demographics(
+        get_all_member_speeches(), get_member_list(), get_member_positions()
+    )
+    return (
+        labelled.groupby(
+            ["parliament", "year", *DEMOGRAPHIC_FIELDS.keys()],
+            observed=True,
+            dropna=False,
+        )
+        [MEMBER_COUNT_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+
+
+def pivot_cube(cube: pd.DataFrame, group_by_fields) -> pd.DataFrame:
+    """
+    Sums the demographic cube by the given fields and calculates member metrics.
+    """
+    pivoted = (
+        cube.groupby(list(group_by_fields), observed=True, dropna=False)[
+            MEMBER_COUNT_COLUMNS
+        ]
+        .sum()
+        .reset_index()
+    )
+    return calculate_member_metrics(pivoted, calculate_readability_vectorised)
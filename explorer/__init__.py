@@ -0,0 +1,91 @@
+import json
+import os
+from typing import List, Optional
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from agg_data import get_all_member_speeches
+from members import MEMBER_COUNT_COLUMNS
+
+_member_explorer = components.declare_component(
+    "member_explorer",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend"),
+)
+
+EXPLORER_KEY_FIELDS = ["member_name", "member_party", "member_constituency", "parliament"]
+
+# metrics the frontend can derive from the counts, as in calculate_member_metrics
+EXPLORER_METRICS = [
+    "participation_rate",
+    "attendance",
+    "topics_per_sitting",
+    "questions_per_sitting",
+    "words_per_sitting",
+    "readability",
+]
+
+
+@st.cache_data(max_entries=4)
+def member_explorer_dataset(data_version: str) -> dict:
+    """
+    Returns the member x parliament counts the explorer filters and ranks,
+    in a compact columnar form, once per data version.
+
+    Returns:
+    - dict: "columns" and "data" (one list of values per row).
+    """
+    counts = (
+        get_all_member_speeches()
+        .groupby(EXPLORER_KEY_FIELDS, dropna=False)[MEMBER_COUNT_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+    dataset = json.loads(counts.to_json(orient="split", index=False))
+    return {"columns": dataset["columns"], "data": dataset["data"]}
+
+
+def member_explorer(
+    data_version: str,
+    key: str,
+    metrics: List[str] = EXPLORER_METRICS,
+    parliament: Optional[int] = None,
+    highlighted: Optional[List[str]] = None,
+    group_by: str = "member",
+):
+    """
+    Displays a member table which is filtered by parliament, party and
+    constituency, grouped, ranked and highlighted in the browser, without
+    rerunning the page. The dataset is only sent with the first render in a
+    session (or when the browser asks for it again); later renders just send
+    the data version, and the browser uses its stored copy.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`.
+    - key (str): Unique key of the explorer on the page.
+    - metrics (List[str]): Metrics to show, from EXPLORER_METRICS; ranked by the first.
+    - parliament (int): Parliament selected initially, all if None.
+    - highlighted (List[str]): Names of members and constituencies to highlight.
+    - group_by (str): "member" or "constituency", the grouping shown initially.
+    """
+    shipped_key = f"{key}_shipped_version"
+    served_key = f"{key}_served_request"
+    # the browser asks for the dataset by returning a new request id
+    request = st.session_state.get(key)
+    ship = st.session_state.get(shipped_key) != data_version or (
+        request is not None and request != st.session_state.get(served_key)
+    )
+    if ship:
+        st.session_state[shipped_key] = data_version
+        st.session_state[served_key] = request
+
+    _member_explorer(
+        data_version=data_version,
+        dataset=member_explorer_dataset(data_version) if ship else None,
+        metrics=list(metrics),
+        parliament=parliament,
+        highlighted=[name for name in highlighted or [] if name],
+        group_by=group_by,
+        key=key,
+        default=None,
+    )
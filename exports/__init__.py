@@ -0,0 +1,353 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from agg_data import get_all_member_speeches, get_data_version, get_member_positions
+from members import aggregate_member_metrics
+from utils import calculate_readability_vectorised
+
+EXPORTS_DIR = os.path.join("data", "exports")
+MANIFEST_FILE = "manifest.json"
+CHECKSUMS_FILE = "SHA256SUMS"
+
+# name and description of each exported table
+EXPORT_TABLES = {
+    "members": "Metrics by member",
+    "members_by_parliament": "Metrics by member and parliament",
+    "members_by_year": "Metrics by member and year",
+    "positions": "Member positions",
+}
+EXPORT_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+}
+
+
+def export_tables() -> Dict[str, pd.DataFrame]:
+    """
+    Computes the tables behind the Attendance and By Members pages, keyed by
+    their name in EXPORT_TABLES.
+    """
+    all_members_speech_summary = get_all_member_speeches()
+    return {
+        "members": aggregate_member_metrics(
+            all_members_speech_summary,
+            calculate_readability_vectorised,
+            group_by_fields=["member_name"],
+        ),
+        "members_by_parliament": aggregate_member_metrics(
+            all_members_speech_summary,
+            calculate_readability_vectorised,
+            group_by_fields=[
+                "member_name",
+                "member_party",
+                "member_constituency",
+                "parliament",
+            ],
+        ),
+        "members_by_year": aggregate_member_metrics(
+            all_members_speech_summary,
+            calculate_readability_vectorised,
+            group_by_fields=["member_name", "year"],
+        ),
+        "positions": get_member_positions(),
+    }
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def version_dir(data_version: str, exports_dir: str = EXPORTS_DIR) -> str:
+    return os.path.join(exports_dir, re.sub(r"[^\w.-]", "_", data_version))
+
+
+def _write_atomically(path: str, write) -> None:
+    # written next to the destination and moved into place, so a reader never
+    # sees a partly written file
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    os.close(file_descriptor)
+    try:
+        write(temporary_path)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def _read_manifest(directory: str) -> Optional[dict]:
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except ValueError:
+        return None
+
+
+def _remove_older_exports(manifest: dict, exports_dir: str) -> None:
+    """
+    Removes the exports of other data versions written before this one. Only
+    directories with a manifest are removed, so nothing else kept in
+    exports_dir, or being written by another process, is touched.
+    """
+    directory = version_dir(manifest["data_version"], exports_dir)
+    for entry in os.listdir(exports_dir):
+        path = os.path.join(exports_dir, entry)
+        if path == directory or not os.path.isdir(path):
+            continue
+        other = _read_manifest(path)
+        if (
+            other is not None
+            and other.get("data_version") != manifest["data_version"]
+            and other.get("created_at", "") < manifest["created_at"]
+        ):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def write_exports(
+    data_version: str,
+    exports_dir: str = EXPORTS_DIR,
+    tables: Optional[Dict[str, pd.DataFrame]] = None,
+) -> dict:
+    """
+    Writes every table in every format into a directory for the data version,
+    with a SHA256SUMS file and a manifest. The manifest is written last, so a
+    directory without one is incomplete. Exports of older data versions are removed.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`.
+    - exports_dir (str): Directory holding a subdirectory per data version.
+    - tables (Dict[str, pd.DataFrame]): Tables to export; defaults to `export_tables()`.
+
+    Returns:
+    - dict: The manifest, with the 'sha256', 'bytes' and 'rows' of each file
+      under files -> table -> format.
+    """
+    tables = export_tables() if tables is None else tables
+    directory = version_dir(data_version, exports_dir)
+    os.makedirs(directory, exist_ok=True)
+    # mark the directory incomplete while files are rewritten
+    if os.path.exists(os.path.join(directory, MANIFEST_FILE)):
+        os.remove(os.path.join(directory, MANIFEST_FILE))
+
+    files = {}
+    for name, table in tables.items():
+        table = table.reset_index(drop=True)
+        files[name] = {}
+        for export_format in EXPORT_FORMATS:
+            file_name = f"{name}.{export_format}"
+            path = os.path.join(directory, file_name)
+            if export_format == "parquet":
+                _write_atomically(
+                    path, lambda file: table.to_parquet(file, index=False)
+                )
+            else:
+                _write_atomically(path, lambda file: table.to_csv(file, index=False))
+            files[name][export_format] = {
+                "file": file_name,
+                "sha256": _sha256(path),
+                "bytes": os.path.getsize(path),
+                "rows": len(table),
+            }
+
+    def write_checksums(file):
+        with open(file, "w") as checksums:
+            for formats in files.values():
+                for exported in formats.values():
+                    checksums.write(f"{exported['sha256']}  {exported['file']}\n")
+
+    _write_atomically(os.path.join(directory, CHECKSUMS_FILE), write_checksums)
+
+    manifest = {
+        "data_version": data_version,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "files": files,
+    }
+
+    def write_manifest(file):
+        with open(file, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+    _write_atomically(os.path.join(directory, MANIFEST_FILE), write_manifest)
+    _remove_older_exports(manifest, exports_dir)
+    return manifest
+
+
+def load_manifest(data_version: str, exports_dir: str = EXPORTS_DIR) -> Optional[dict]:
+    manifest = _read_manifest(version_dir(data_version, exports_dir))
+    if manifest is None or manifest.get("data_version") != data_version:
+        return None
+    return manifest
+
+
+def mismatched_exports(manifest: dict, exports_dir: str = EXPORTS_DIR) -> List[str]:
+    """
+    Checks the exported files against the sizes and checksums in their manifest.
+
+    Returns:
+    - List[str]: Names of the files which are missing or do not match.
+    """
+    directory = version_dir(manifest["data_version"], exports_dir)
+    mismatched = []
+    for formats in manifest["files"].values():
+        for exported in formats.values():
+            path = os.path.join(directory, exported["file"])
+            if (
+                not os.path.exists(path)
+                or os.path.getsize(path) != exported["bytes"]
+                or _sha256(path) != exported["sha256"]
+            ):
+                mismatched.append(exported["file"])
+    return mismatched
+
+
+def update_exports(
+    data_version: str, exports_dir: str = EXPORTS_DIR, force: bool = False
+) -> Tuple[dict, bool]:
+    """
+    Writes the exports for a data version, unless they exist and match their
+    manifest. Run from the command line (`python -m exports`).
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`.
+    - exports_dir (str): Directory holding a subdirectory per data version.
+    - force (bool): Rewrite the exports even if they match their manifest.
+
+    Returns:
+    - Tuple[dict, bool]: The manifest, and whether the exports were written.
+    """
+    manifest = None if force else load_manifest(data_version, exports_dir)
+    if manifest is not None and not mismatched_exports(manifest, exports_dir):
+        return manifest, False
+    return write_exports(data_version, exports_dir), True
+
+
+def _manifest_times(exports_dir: str) -> Tuple[Tuple[str, float], ...]:
+    if not os.path.isdir(exports_dir):
+        return ()
+    paths = (
+        os.path.join(exports_dir, entry, MANIFEST_FILE)
+        for entry in sorted(os.listdir(exports_dir))
+    )
+    return tuple(
+        (path, os.path.getmtime(path)) for path in paths if os.path.exists(path)
+    )
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _read_exports(
+    data_version: str,
+    exports_dir: str,
+    manifest_times: Tuple[Tuple[str, float], ...],
+) -> Optional[dict]:
+    manifests = [
+        manifest
+        for manifest in (
+            _read_manifest(os.path.dirname(path)) for path, _ in manifest_times
+        )
+        if manifest is not None and "data_version" in manifest
+    ]
+    # the data version's own exports first, then the newest of the others
+    manifests.sort(
+        key=lambda manifest: (
+            manifest["data_version"] == data_version,
+            manifest.get("created_at", ""),
+        ),
+        reverse=True,
+    )
+    for manifest in manifests:
+        if not mismatched_exports(manifest, exports_dir):
+            return manifest
+    return None
+
+
+def get_exports(data_version: str, exports_dir: str = EXPORTS_DIR) -> Optional[dict]:
+    """
+    Returns the manifest of the exports written by `python -m exports` for a
+    data version or, until they are written, the newest exports of an earlier
+    one. Exports which do not match their manifest are skipped, and None is
+    returned if there are none. The files are checked once per set of
+    manifests, and never written by a page.
+    """
+    return _read_exports(data_version, exports_dir, _manifest_times(exports_dir))
+
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def read_export(path: str, sha256: str) -> bytes:
+    """
+    Reads an exported file, checking it against its checksum. The checksum is
+    also part of the cache key, so a rewritten file is read again.
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+    if hashlib.sha256(content).hexdigest() != sha256:
+        raise ValueError(
+            f"{path} does not match its checksum; run `python -m exports` to rewrite it."
+        )
+    return content
+
+
+def export_downloads(
+    manifest: Optional[dict],
+    tables: List[str],
+    key: str,
+    exports_dir: str = EXPORTS_DIR,
+) -> None:
+    """
+    Draws a Parquet and a CSV download button for each table.
+
+    Parameters:
+    - manifest (dict): Output of `get_exports`; None shows how to write the exports.
+    - tables (List[str]): Names of tables in EXPORT_TABLES.
+    - key (str): Prefix for the widget keys, unique within the page.
+    - exports_dir (str): Directory the exports were written into.
+    """
+    if manifest is None:
+        st.info(
+            "Downloads have not been prepared yet. Run `python -m exports` to write them."
+        )
+        return
+    directory = version_dir(manifest["data_version"], exports_dir)
+    if manifest["data_version"] != get_data_version():
+        st.caption(
+            f"These downloads are of data version {manifest['data_version']}; "
+            "the latest sittings are not included yet."
+        )
+    for name in tables:
+        label, *format_columns = st.columns([2] + [1] * len(EXPORT_FORMATS))
+        label.write(EXPORT_TABLES[name])
+        for column, (export_format, mime) in zip(
+            format_columns, EXPORT_FORMATS.items()
+        ):
+            exported = manifest["files"][name][export_format]
+            with column:
+                st.download_button(
+                    label=export_format.upper(),
+                    data=read_export(
+                        os.path.join(directory, exported["file"]), exported["sha256"]
+                    ),
+                    file_name=f"{name}-{manifest['data_version']}.{export_format}",
+                    mime=mime,
+                    help=(
+                        f"{exported['rows']:,} rows, {exported['bytes'] / 1024:,.0f} KB."
+                        f" SHA-256: {exported['sha256']}"
+                    ),
+                    key=f"{key}_{name}_{export_format}",
+                    use_container_width=True,
+                )
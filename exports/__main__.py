@@ -0,0 +1,26 @@
+import argparse
+
+from agg_data import get_data_version
+from exports import EXPORTS_DIR, update_exports, version_dir
+
+parser = argparse.ArgumentParser(
+    description="Write the downloadable exports for the current data version."
+)
+parser.add_argument("--dir", default=EXPORTS_DIR)
+parser.add_argument(
+    "--force",
+    action="store_true",
+    help="rewrite exports which already match their manifest",
+)
+args = parser.parse_args()
+
+data_version = get_data_version()
+directory = version_dir(data_version, args.dir)
+manifest, written = update_exports(data_version, args.dir, force=args.force)
+if not written:
+    print(f"Exports for {data_version} already exist in {directory}.")
+else:
+    for formats in manifest["files"].values():
+        for exported in formats.values():
+            print(f"{exported['sha256']}  {exported['file']} ({exported['rows']} rows)")
+    print(f"Wrote exports for {data_version} into {directory}.")
@@ -1,6 +1,20 @@
-from typing import List, Tuple, Callable
+from typing import List, Optional, Sequence, Tuple, Callable
+import numpy as np
 import pandas as pd
 
+# Additive counts in agg_speech_metrics_by_member, from which all member metrics are derived
+MEMBER_COUNT_COLUMNS = [
+    "count_sittings_total",
+    "count_sittings_attended",
+    "count_sittings_spoken",
+    "count_topics",
+    "count_speeches",
+    "count_words",
+    "count_pri_questions",
+    "count_sentences",
+    "count_syllables",
+]
+
 
 def parse_appointments(appointments: List[str]) -> str:
     """
@@ -75,32 +89,36 @@ def aggregate_member_metrics(
 
     Parameters:
     - all_members_speech_summary (pd.DataFrame): DataFrame containing the speech summary data for all members.
-    - calculate_readability (Callable): Function to calculate readability for each group of data.
+    - calculate_readability (Callable): Function calculating readability for every row of a DataFrame of counts at once, e.g. `calculate_readability_vectorised`.
     - group_by_fields (List[str]): List of fields to group by.
 
     Returns:
     - pd.DataFrame: DataFrame with aggregated data and calculated metrics for each group.
     """
-    column_names = [
-        "count_sittings_total",
-        "count_sittings_attended",
-        "count_sittings_spoken",
-        "count_topics",
-        "count_speeches",
-        "count_words",
-        "count_pri_questions",
-        "count_sentences",
-        "count_syllables",
-    ]
-
     # Aggregate by specified fields
-    agg_by_fields_dict = {col: "sum" for col in column_names}
+    agg_by_fields_dict = {col: "sum" for col in MEMBER_COUNT_COLUMNS}
     aggregated = (
         all_members_speech_summary.groupby(group_by_fields)
         .agg(agg_by_fields_dict)
         .reset_index()
     )
 
+    return calculate_member_metrics(aggregated, calculate_readability)
+
+
+def calculate_member_metrics(
+    aggregated: pd.DataFrame, calculate_readability: Callable
+) -> pd.DataFrame:
+    """
+    Calculates rate and per-sitting metrics from summed member counts.
+
+    Parameters:
+    - aggregated (pd.DataFrame): DataFrame of summed counts, with the columns aggregated by `aggregate_member_metrics`.
+    - calculate_readability (Callable): Function calculating readability for every row of a DataFrame of counts at once, e.g. `calculate_readability_vectorised`.
+
+    Returns:
+    - pd.DataFrame: DataFrame with calculated metrics, excluding rows with no sittings attended.
+    """
     # Calculate additional metrics
     aggregated["attendance"] = (
         aggregated["count_sittings_attended"]
@@ -126,10 +144,8 @@ def aggregate_member_metrics(
         / aggregated["count_sittings_spoken"]
     )
 
-    # Apply readability calculation
-    aggregated["readability"] = aggregated.apply(
-        calculate_readability, axis=1
-    )
+    # Calculate readability for all groups at once
+    aggregated["readability"] = calculate_readability(aggregated)
 
     # Filter out rows where count_sittings_attended is zero
     aggregated = aggregated[
@@ -137,3 +153,76 @@ def aggregate_member_metrics(
     ]
 
     return aggregated
+
+
+SCORECARD_METRICS = [
+    "attendance",
+    "participation_rate",
+    "topics_per_sitting",
+    "questions_per_sitting",
+    "words_per_sitting",
+    "readability",
+]
+
+
+def member_scorecards(
+    aggregated_by_member: pd.DataFrame,
+    member_names: Optional[List[str]] = None,
+    cohort: Optional[pd.Series] = None,
+    metrics: Sequence[str] = tuple(SCORECARD_METRICS),
+    non_zero_average_metrics: Sequence[str] = ("questions_per_sitting",),
+) -> pd.DataFrame:
+    """
+    Builds scorecards for a set of members: their headline metrics, and each
+    metric's rank, percentile and average within a cohort, for all members at once.
+
+    Percentiles follow `scipy.stats.percentileofscore` (kind="rank"). Ranks are
+    1 for the highest value. Members without a value for a metric are left out
+    of that metric's cohort.
+
+    Parameters:
+    - aggregated_by_member (pd.DataFrame): Output of `aggregate_member_metrics` grouped by ["member_name"].
+    - member_names (List[str]): Members to return scorecards for. Defaults to all members.
+    - cohort (pd.Series): Boolean mask over `aggregated_by_member` selecting the
+      members to compare against. Defaults to all members.
+    - metrics (Sequence[str]): Metrics to score.
+    - non_zero_average_metrics (Sequence[str]): Metrics whose cohort average leaves out
+      zero values, e.g. questions, which political appointees do not ask.
+
+    Returns:
+    - pd.DataFrame: One row per member, with the member's counts and metrics and
+      '<metric>_rank', '<metric>_percentile' and '<metric>_cohort_average' columns.
+    """
+    cohort_df = aggregated_by_member if cohort is None else aggregated_by_member[cohort]
+    if member_names is None:
+        scorecards = aggregated_by_member.copy()
+    else:
+        scorecards = aggregated_by_member[
+            aggregated_by_member["member_name"].isin(member_names)
+        ].copy()
+
+    for metric in metrics:
+        cohort_values = np.sort(cohort_df[metric].dropna().to_numpy(dtype=float))
+        scores = scorecards[metric].to_numpy(dtype=float)
+        count_cohort = len(cohort_values)
+
+        left = np.searchsorted(cohort_values, scores, side="left")
+        right = np.searchsorted(cohort_values, scores, side="right")
+        is_scored = ~np.isnan(scores) & (count_cohort > 0)
+
+        scorecards[f"{metric}_rank"] = np.where(
+            is_scored, count_cohort - right + 1, np.nan
+        )
+        scorecards[f"{metric}_percentile"] = np.where(
+            is_scored,
+            (left + right + (right > left)) * 50.0 / max(count_cohort, 1),
+            np.nan,
+        )
+
+        if metric in non_zero_average_metrics:
+            cohort_values = cohort_values[cohort_values != 0]
+        scorecards[f"{metric}_cohort_average"] = (
+            cohort_values.mean() if len(cohort_values) else np.nan
+        )
+
+    return scorecards.reset_index(drop=True)
@@ -1,10 +1,30 @@
+import itertools
+
 import streamlit as st
 import altair as alt
-
-from agg_data import get_member_list, get_all_member_speeches
+import pandas as pd
+
+from agg_data import get_data_version, get_member_list, get_all_member_speeches
+from attendance import (
+    co_attendance,
+    get_attendance_bitsets,
+    longest_absence_streaks,
+    member_attendance,
+)
+from explorer import member_explorer
+from exports import export_downloads, get_exports
 from members import aggregate_member_metrics
+from portraits import display_portrait
+from search import search_box
+from tables import paginated_member_table
+from time_index import (
+    get_member_time_index,
+    month_range,
+    range_member_metrics,
+    trailing_months,
+)
 from utils import (
-    calculate_readability,
+    calculate_readability_vectorised,
     process_metric_columns,
     EARLIEST_SITTING,
     PARTY_COLOURS,
@@ -20,7 +40,7 @@ all_members_speech_summary = get_all_member_speeches()
 
 aggregated_by_member_parliament = aggregate_member_metrics(
     all_members_speech_summary,
-    calculate_readability,
+    calculate_readability_vectorised,
     group_by_fields=[
         "member_name",
         "member_party",
@@ -29,6 +49,9 @@ aggregated_by_member_parliament = aggregate_member_metrics(
     ],
 )
 
+member_time_index = get_member_time_index()
+attendance_bitsets = get_attendance_bitsets()
+
 constituency_names = sorted(
     all_members_speech_summary[
         all_members_speech_summary["member_constituency"].notna()
@@ -38,6 +61,7 @@ constituency_names = sorted(
 # FRONTEND
 
 st.title("Attendance and Participation")
+search_box()
 
 # SELECTIONS
 
@@ -45,10 +69,47 @@ parliaments = {"13th Parliament": [13], "14th Parliament": [14], "All": [12, 13,
 
 parliament, find_by, select_detail = st.columns(3)
 
+custom_range = "Custom range"
+
 with parliament:
     select_parliament = st.radio(
-        label="Which parliament?", options=parliaments.keys(), index=1
+        label="Which parliament?",
+        options=[*parliaments.keys(), custom_range],
+        index=1,
+    )
+
+    if select_parliament == custom_range:
+        earliest_month, latest_month = month_range(member_time_index)
+        select_dates = st.date_input(
+            label="Which months?",
+            value=trailing_months(member_time_index, 12),
+            min_value=earliest_month,
+            max_value=latest_month,
+        )
+        # the range is partial while being picked, and empty once cleared:
+        # open ends fall back to the first and last month with data
+        select_start_date, select_end_date = (tuple(select_dates) + (None, None))[:2]
+        select_start_date = select_start_date or earliest_month
+        select_end_date = select_end_date or latest_month
+
+if select_parliament == custom_range:
+    # already at member x party x constituency grain
+    selected_period = range_member_metrics(
+        member_time_index, select_start_date, select_end_date
     )
+    period_start = select_start_date.replace(day=1)
+    period_end = (pd.Timestamp(select_end_date) + pd.offsets.MonthEnd(0)).date()
+else:
+    selected_period = aggregated_by_member_parliament[
+        aggregated_by_member_parliament["parliament"].isin(
+            parliaments[select_parliament]
+        )
+    ]
+    parliament_months = all_members_speech_summary[
+        all_members_speech_summary["parliament"].isin(parliaments[select_parliament])
+    ][["year", "month"]].assign(day=1)
+    period_start = pd.to_datetime(parliament_months).min().date()
+    period_end = (pd.to_datetime(parliament_months).max() + pd.offsets.MonthEnd(0)).date()
 
 with find_by:
     select_by = st.radio(
@@ -66,16 +127,8 @@ with select_detail:
 
         if select_constituency:
             selected_members = (
-                aggregated_by_member_parliament[
-                    (
-                        aggregated_by_member_parliament["member_constituency"]
-                        == select_constituency
-                    )
-                    & (
-                        aggregated_by_member_parliament["parliament"].isin(
-                            parliaments[select_parliament]
-                        )
-                    )
+                selected_period[
+                    selected_period["member_constituency"] == select_constituency
                 ]["member_name"]
                 .unique()
                 .tolist()
@@ -105,16 +158,15 @@ participation_cols = {
     "member_party": "Party",
     "member_constituency": "Constituency",
 }
-processed = aggregate_member_metrics(
-    aggregated_by_member_parliament[
-        aggregated_by_member_parliament["parliament"].isin(
-            parliaments[select_parliament]
-        )
-    ],
-    calculate_readability,
-    group_by_fields=["member_name", "member_party", "member_constituency"],
-)
-processed = processed[participation_cols.keys()]
+if select_parliament == custom_range:
+    processed = selected_period
+else:
+    processed = aggregate_member_metrics(
+        selected_period,
+        calculate_readability_vectorised,
+        group_by_fields=["member_name", "member_party", "member_constituency"],
+    )
+processed = processed[participation_cols.keys()].copy()
 processed["# Rank"] = processed["participation_rate"].rank(
     ascending=False, method="min"
 )
@@ -122,13 +174,6 @@ processed.rename(columns=participation_cols, inplace=True)
 to_display = processed.copy()
 to_display = process_metric_columns(to_display)
 to_display = to_display.sort_values("# Rank").reset_index().drop('index', axis=1)
-to_display_with_highlight = to_display.style.apply(
-    lambda row: [
-        "background-color: yellow" if row["Member Name"] in selected_members else ""
-        for _ in row
-    ],
-    axis=1,
-)
 
 def display_members(members, start_index=0):
     columns = st.columns(5, gap="medium")
@@ -140,10 +185,7 @@ def display_members(members, start_index=0):
                 member_image_link = members_df[
                     members_df["member_name"] == member_name
                 ]["member_image_link"].iloc[0]
-                try:
-                    st.image(member_image_link, width=100, caption=member_name)
-                except:
-                    st.write(member_name)
+                display_portrait(member_image_link, width=100, caption=member_name)
             else:
                 st.empty()
 
@@ -173,10 +215,17 @@ def display_header(select_by):
 explain_attendance_md = """
 Attendance (%) is measured by the number of sessions the member **attended** (or was present in) out of the total number of sessions which occured while they were sitting as member.
 """
+if select_parliament == custom_range:
+    period_description = f"period from {select_start_date:%b %Y} to {select_end_date:%b %Y}"
+elif select_parliament == "All":
+    period_description = "dataset"
+else:
+    period_description = select_parliament
+
 explain_participation_md = f"""
 Participation (%) is measured by the number of sessions the member **spoke in** as a percentage of the number of sessions the member **attended**. Number of sessions spoken in are determined by looking at the parliamentary hansard for the day and counting dates where the member name appears in the record for topics which are not pertaining to written answers.
 
-In the {select_parliament if select_parliament != 'All' else 'dataset'}, the member with the highest participation was {to_display.loc[0,'Member Name']} (*{to_display.loc[0,'Participation (%)']}*). They spoke in *{to_display.loc[0,'# Spoken']}* sessions, out of the *{to_display.loc[0,'# Attended']}* sessions they attended.
+In the {period_description}, the member with the highest participation was {to_display.loc[0,'Member Name']} (*{to_display.loc[0,'Participation (%)']:.1f}%*). They spoke in *{to_display.loc[0,'# Spoken']}* sessions, out of the *{to_display.loc[0,'# Attended']}* sessions they attended.
 """
 
 with st.expander(
@@ -254,8 +303,102 @@ chart = (
 
 st.altair_chart(chart, use_container_width=True)
 
+highlighted_members = [member for member in selected_members if member]
+if highlighted_members:
+    st.divider()
+    st.subheader("Attendance by Sitting")
+
+    streaks = longest_absence_streaks(
+        attendance_bitsets, highlighted_members, period_start, period_end
+    ).set_index("member_name")
+    for member_name in highlighted_members:
+        sittings = member_attendance(attendance_bitsets, member_name)
+        sittings = sittings[
+            sittings["date"].between(
+                pd.Timestamp(period_start), pd.Timestamp(period_end)
+            )
+        ]
+        if sittings.empty:
+            continue
+
+        sittings["attendance"] = sittings["is_present"].map(
+            {True: "Present", False: "Absent"}
+        )
+        heatmap = (
+            alt.Chart(sittings)
+            .mark_rect()
+            .encode(
+                x=alt.X("yearmonth(date):O", title=None),
+                y=alt.Y("date(date):O", title="Day"),
+                color=alt.Color("attendance:N", title=None).scale(
+                    alt.Scale(domain=["Present", "Absent"], range=["#99CC99", "#FF9999"])
+                ),
+                tooltip=[
+                    alt.Tooltip("date:T", title="Sitting"),
+                    alt.Tooltip("attendance:N", title="Attendance"),
+                ],
+            )
+            .properties(title=member_name, height=200)
+        )
+        st.altair_chart(heatmap, use_container_width=True)
+
+        caption = f"Attended {sittings['is_present'].sum()} of {len(sittings)} sittings."
+        if member_name in streaks.index and streaks.loc[member_name, "longest_absence"]:
+            streak = streaks.loc[member_name]
+            caption += (
+                f" Longest absence: {streak['longest_absence']} sitting(s) in a row"
+                f" ({streak['absence_from']:%Y-%m-%d} to {streak['absence_to']:%Y-%m-%d})."
+            )
+        st.caption(caption)
+
+    for member_name, other_member_name in itertools.combinations(
+        highlighted_members, 2
+    ):
+        both_present, both_eligible = co_attendance(
+            attendance_bitsets,
+            member_name,
+            other_member_name,
+            period_start,
+            period_end,
+        )
+        if both_eligible:
+            st.caption(
+                f"{member_name} and {other_member_name} attended "
+                f"{both_present} of the {both_eligible} sittings they were both members for together."
+            )
+
 st.divider()
 
 st.subheader("Attendance and Participation by Member")
 
-st.dataframe(to_display_with_highlight, hide_index=True, use_container_width=False)
\ No newline at end of file
+if select_parliament == custom_range:
+    # the explorer only has counts per member and parliament, so a custom
+    # range of months is ranked on the server, from the member time index
+    paginated_member_table(
+        to_display,
+        key="attendance_by_member",
+        default_sort="# Rank",
+        highlighted=selected_members,
+    )
+else:
+    st.caption(
+        "Filter by parliament, party and constituency, group by constituency or re-rank by clicking a column, without reloading the page."
+    )
+    member_explorer(
+        get_data_version(),
+        key="attendance_explorer",
+        metrics=["participation_rate", "attendance"],
+        parliament=(
+            parliaments[select_parliament][0]
+            if len(parliaments[select_parliament]) == 1
+            else None
+        ),
+        highlighted=selected_members,
+    )
+
+with st.expander(label="Download data", expanded=False):
+    export_downloads(
+        get_exports(get_data_version()),
+        ["members", "members_by_parliament"],
+        key="attendance_downloads",
+    )
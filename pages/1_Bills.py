@@ -1,10 +1,85 @@
 import streamlit as st
+from agg_data import get_data_version
+from bills import BILL_STATUSES, get_bills_page
+from search import search_box, search_selection
+from utils import QueryBudgetExceeded
 
 st.title("Bills")
+search_box()
 
-st.warning("Under construction.")
-st.markdown(
-    """
-Please see [current implementation](https://lookerstudio.google.com/u/1/reporting/e41e239f-a88a-45b9-b133-5c91bb1f3f13/page/p_jniba4ngfd) on Looker Studio in the meantime.
-            """
+# SELECTIONS
+
+select_parliaments, select_statuses, select_dates = st.columns(3)
+with select_parliaments:
+    selected_parliaments = st.multiselect(
+        label="Parliaments", options=[12, 13, 14], placeholder="All parliaments"
+    )
+with select_statuses:
+    selected_statuses = st.multiselect(
+        label="Status", options=BILL_STATUSES, placeholder="All statuses"
+    )
+with select_dates:
+    selected_dates = st.date_input(label="First read between:", value=())
+start_date, end_date = (tuple(selected_dates) + (None, None))[:2]
+
+keyword = st.text_input(
+    label="Title contains",
+    value=search_selection("bill") or "",
+    placeholder="e.g. Amendment",
 )
+
+# keyset cursors of the pages visited, reset whenever the filters change
+filters = (
+    tuple(selected_parliaments),
+    start_date,
+    end_date,
+    tuple(selected_statuses),
+    keyword.strip(),
+)
+if st.session_state.get("bills_filters") != filters:
+    st.session_state["bills_filters"] = filters
+    st.session_state["bills_cursors"] = [None]
+cursors = st.session_state["bills_cursors"]
+
+# BACKEND
+
+try:
+    bills, next_cursor = get_bills_page(get_data_version(), *filters, after=cursors[-1])
+except QueryBudgetExceeded:
+    st.warning(
+        "These bills can't be fetched right now, as the query budget has been used up."
+        " Please try again later, or narrow the filters."
+    )
+    st.stop()
+
+# FRONTEND
+
+if bills.empty:
+    st.info("No bills match the selected filters.")
+else:
+    st.dataframe(
+        bills,
+        column_config={
+            "bill_number": "Bill No.",
+            "title": st.column_config.TextColumn("Title", width="large"),
+            "parliament": "Parliament",
+            "first_reading_date": st.column_config.DateColumn("First Reading"),
+            "second_reading_date": st.column_config.DateColumn("Second Reading"),
+            "third_reading_date": st.column_config.DateColumn("Third Reading"),
+            "status": "Status",
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+previous_page, page_number, next_page = st.columns([1, 2, 1])
+with previous_page:
+    if st.button("Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+with page_number:
+    st.caption(f"Page {len(cursors)}")
+with next_page:
+    if st.button("Next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
@@ -1,10 +1,95 @@
 import streamlit as st
+from agg_data import get_member_list
+from speeches import latest_indexed_date, search_speeches
 
 st.title("Speeches")
 
-st.warning("Under construction.")
-st.markdown(
-    """
+# BACKEND
+
+indexed_date = latest_indexed_date()
+members_df = get_member_list()
+member_names = sorted(members_df["member_name"].unique())
+
+# FRONTEND
+
+if not indexed_date:
+    st.info(
+        "The speech index has not been built yet. Run `python -m speeches` to build it."
+    )
+    st.markdown(
+        """
 Please see [current implementation](https://lookerstudio.google.com/u/1/reporting/e41e239f-a88a-45b9-b133-5c91bb1f3f13/page/p_t7zbjn4vfd) on Looker Studio in the meantime.
             """
+    )
+    st.stop()
+
+search_query = st.text_input(
+    label="Search speeches",
+    placeholder="e.g. housing grants for young couples",
+)
+
+select_members, select_parliaments, select_topic = st.columns(3)
+with select_members:
+    selected_members = st.multiselect(
+        label="Members", options=member_names, placeholder="All members"
+    )
+with select_parliaments:
+    selected_parliaments = st.multiselect(
+        label="Parliaments", options=[12, 13, 14], placeholder="All parliaments"
+    )
+with select_topic:
+    selected_topic = st.text_input(label="Topic contains")
+
+selected_dates = st.date_input(label="Between:", value=())
+start_date, end_date = (tuple(selected_dates) + (None, None))[:2]
+
+# keyset cursors of the pages visited, reset whenever the search changes
+search_key = (
+    search_query,
+    tuple(selected_members),
+    tuple(selected_parliaments),
+    selected_topic,
+    start_date,
+    end_date,
 )
+if st.session_state.get("speech_search_key") != search_key:
+    st.session_state["speech_search_key"] = search_key
+    st.session_state["speech_search_cursors"] = [None]
+cursors = st.session_state["speech_search_cursors"]
+
+if search_query:
+    results, next_cursor = search_speeches(
+        search_query,
+        member_names=selected_members,
+        start_date=start_date,
+        end_date=end_date,
+        parliaments=selected_parliaments,
+        topic=selected_topic,
+        after=cursors[-1],
+    )
+
+    if results.empty:
+        st.info("No speeches found.")
+
+    for _, result in results.iterrows():
+        st.markdown(
+            f"""
+**{result['member_name']}** ({result['date']}) · _{result['topic_title']}_
+
+> {result['snippet']}
+"""
+        )
+
+    previous_page, page_number, next_page = st.columns([1, 2, 1])
+    with previous_page:
+        if st.button("Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with page_number:
+        st.caption(f"Page {len(cursors)}")
+    with next_page:
+        if st.button("Next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+st.caption(f"Speeches are indexed up to {indexed_date}.")
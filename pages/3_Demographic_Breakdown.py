@@ -1,5 +1,87 @@
 import streamlit as st
+import altair as alt
+from demographics import DEMOGRAPHIC_FIELDS, get_demographic_cube, pivot_cube
 
 st.title("Demographic Breakdown")
 
-st.warning("Under construction.")
+# BACKEND
+
+demographic_cube = get_demographic_cube()
+
+metrics = {
+    "attendance": ("Attendance (%)", ".1f"),
+    "participation_rate": ("Participation (%)", ".1f"),
+    "topics_per_sitting": ("Topics/Sitting", ".2f"),
+    "questions_per_sitting": ("Qns/Sitting", ".2f"),
+    "words_per_sitting": ("Words/Sitting", ",.0f"),
+    "readability": ("Readability", ".1f"),
+}
+parliaments = {"13th Parliament": [13], "14th Parliament": [14], "All": [12, 13, 14]}
+
+# SELECTIONS
+
+select_metric, select_breakdown, select_colour, select_parliament = st.columns(4)
+with select_metric:
+    selected_metric = st.selectbox(
+        label="Which metric?",
+        options=metrics.keys(),
+        format_func=lambda metric: metrics[metric][0],
+    )
+with select_breakdown:
+    selected_breakdown = st.selectbox(
+        label="Broken down by:",
+        options=DEMOGRAPHIC_FIELDS.keys(),
+        format_func=lambda field: DEMOGRAPHIC_FIELDS[field],
+    )
+with select_colour:
+    selected_colour = st.selectbox(
+        label="And by:",
+        options=[field for field in DEMOGRAPHIC_FIELDS if field != selected_breakdown],
+        format_func=lambda field: DEMOGRAPHIC_FIELDS[field],
+        index=None,
+        placeholder="Nothing",
+    )
+with select_parliament:
+    selected_parliament = st.selectbox(
+        label="Which parliament?", options=parliaments.keys(), index=1
+    )
+
+group_by_fields = [selected_breakdown] + ([selected_colour] if selected_colour else [])
+breakdown = pivot_cube(
+    demographic_cube[
+        demographic_cube["parliament"].isin(parliaments[selected_parliament])
+    ],
+    group_by_fields,
+)
+
+# FRONTEND
+
+metric_label, metric_format = metrics[selected_metric]
+chart = (
+    alt.Chart(breakdown)
+    .mark_bar()
+    .encode(
+        x=alt.X(f"{selected_metric}:Q", title=metric_label),
+        y=alt.Y(f"{selected_breakdown}:N", title=DEMOGRAPHIC_FIELDS[selected_breakdown]),
+        tooltip=[
+            alt.Tooltip(f"{field}:N", title=DEMOGRAPHIC_FIELDS[field])
+            for field in group_by_fields
+        ]
+        + [
+            alt.Tooltip(f"{selected_metric}:Q", title=metric_label, format=metric_format),
+            alt.Tooltip("count_sittings_attended:Q", title="Sittings Attended"),
+        ],
+    )
+)
+if selected_colour:
+    chart = chart.encode(
+        yOffset=f"{selected_colour}:N",
+        color=alt.Color(
+            f"{selected_colour}:N", title=DEMOGRAPHIC_FIELDS[selected_colour]
+        ),
+    )
+st.altair_chart(chart, use_container_width=True)
+
+st.caption(
+    "Age is taken at the year of each sitting. Tenure is counted from the member's earliest sitting in the dataset, so members who sat before it are under-counted."
+)
@@ -1,5 +1,115 @@
 import streamlit as st
+import altair as alt
+import pandas as pd
+from search import search_box, search_selection
+from topics import get_topic_rollup, top_topics, topic_timeline
 
 st.title("Topics")
+search_box()
 
-st.warning("Under construction.")
+# BACKEND
+
+topic_rollup = get_topic_rollup()
+if topic_rollup.empty:
+    st.info("Topics have not been rolled up yet. Run `python -m sync` to build them.")
+    st.stop()
+
+earliest_period = topic_rollup["period"].min().date()
+latest_period = topic_rollup["period"].max().date()
+member_names = sorted(
+    topic_rollup.loc[~topic_rollup["all_members"], "member_name"].dropna().unique()
+)
+
+# SELECTIONS
+
+select_dates, select_count, select_member = st.columns([2, 1, 2])
+with select_dates:
+    selected_dates = st.date_input(
+        label="Which months?",
+        value=(earliest_period, latest_period),
+        min_value=earliest_period,
+        max_value=latest_period,
+    )
+    # the range is partial while it is being picked, and empty once cleared
+    start_date, end_date = (tuple(selected_dates) + (None, None))[:2]
+    start_date = start_date or earliest_period
+    end_date = end_date or latest_period
+with select_count:
+    count_topics = st.number_input(
+        label="How many topics?", min_value=1, max_value=50, value=10
+    )
+with select_member:
+    selected_member = st.selectbox(
+        label="Which member?",
+        options=member_names,
+        index=None,
+        placeholder="All members",
+    )
+
+start_period = pd.Timestamp(start_date.year, start_date.month, 1)
+end_period = pd.Timestamp(end_date.year, end_date.month, 1)
+
+# FRONTEND
+
+st.subheader(
+    f"Top Topics{f' for {selected_member}' if selected_member else ''}, "
+    f"{start_period:%b %Y} to {end_period:%b %Y}"
+)
+
+top = top_topics(
+    topic_rollup,
+    start_period,
+    end_period,
+    n=count_topics,
+    member_name=selected_member,
+)
+
+if top.empty:
+    st.info("No speeches in the selected period.")
+    st.stop()
+
+chart = (
+    alt.Chart(top)
+    .mark_bar()
+    .encode(
+        x=alt.X("count_speeches:Q", title="Speeches"),
+        y=alt.Y("topic_title:N", sort="-x", title=None),
+        tooltip=[
+            alt.Tooltip("topic_title", title="Topic"),
+            alt.Tooltip("count_speeches", title="Speeches"),
+            alt.Tooltip("count_topics", title="Debates"),
+        ],
+    )
+)
+st.altair_chart(chart, use_container_width=True)
+
+st.subheader("Over Time")
+
+default_topics = top["topic_title"].head(5).tolist()
+searched_topic = search_selection("topic")
+if searched_topic and searched_topic not in default_topics:
+    default_topics.insert(0, searched_topic)
+
+selected_topics = st.multiselect(
+    label="Which topics?",
+    options=sorted(topic_rollup["topic_title"].dropna().unique()),
+    default=default_topics,
+)
+
+if selected_topics:
+    timeline = topic_timeline(topic_rollup, selected_topics, selected_member)
+    timeline_chart = (
+        alt.Chart(timeline)
+        .mark_line(point=True)
+        .encode(
+            x=alt.X("period:T", title=None),
+            y=alt.Y("count_speeches:Q", title="Speeches"),
+            color=alt.Color("topic_title:N", title="Topic"),
+            tooltip=[
+                alt.Tooltip("period:T", title="Month", format="%b %Y"),
+                alt.Tooltip("topic_title", title="Topic"),
+                alt.Tooltip("count_speeches", title="Speeches"),
+            ],
+        )
+    )
+    st.altair_chart(timeline_chart, use_container_width=True)
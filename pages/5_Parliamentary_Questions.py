@@ -1,5 +1,116 @@
 import streamlit as st
+import altair as alt
+from questions import (
+    get_question_matrix,
+    member_question_profile,
+    ministry_leaderboard,
+    ministry_totals,
+)
 
 st.title("Parliamentary Questions")
 
-st.warning("Under construction.")
+# BACKEND
+
+question_matrix = get_question_matrix()
+totals_by_ministry = ministry_totals(question_matrix).sort_values(
+    "count_pri_questions", ascending=False
+)
+
+# FRONTEND
+
+st.subheader("By Ministry")
+
+ministry_chart = (
+    alt.Chart(totals_by_ministry)
+    .mark_bar()
+    .encode(
+        x=alt.X("count_pri_questions:Q", title="Primary Questions"),
+        y=alt.Y("ministry_addressed:N", sort="-x", title=None),
+        tooltip=[
+            alt.Tooltip("ministry_addressed", title="Ministry"),
+            alt.Tooltip("count_pri_questions", title="Primary Questions"),
+            alt.Tooltip("proportion_of_questions", title="Share", format=".1%"),
+        ],
+    )
+)
+st.altair_chart(ministry_chart, use_container_width=True)
+
+select_ministry, select_count = st.columns([3, 1])
+with select_ministry:
+    selected_ministry = st.selectbox(
+        label="Which ministry?",
+        options=totals_by_ministry["ministry_addressed"].tolist(),
+    )
+with select_count:
+    count_members = st.number_input(
+        label="How many members?", min_value=1, max_value=50, value=10
+    )
+
+leaderboard = ministry_leaderboard(question_matrix, selected_ministry, count_members)
+st.write(f"Members asking the most questions to {selected_ministry}:")
+st.dataframe(
+    leaderboard,
+    column_config={
+        "member_name": "Member Name",
+        "count_pri_questions": st.column_config.NumberColumn(
+            "# Questions", format="%d"
+        ),
+        "expected_pri_questions": st.column_config.NumberColumn(
+            "# Expected",
+            format="%.1f",
+            help="Questions expected if the member's questions were split across ministries as the whole chamber's are.",
+        ),
+    },
+    hide_index=True,
+    use_container_width=True,
+)
+
+st.divider()
+st.subheader("By Member")
+
+selected_member = st.selectbox(
+    label="Which member?",
+    options=sorted(question_matrix.member_names),
+    index=None,
+    placeholder="Choose member name",
+)
+
+if selected_member:
+    profile = member_question_profile(question_matrix, selected_member)
+    st.write(
+        f"{selected_member} asked {profile['count_pri_questions'].sum():,} primary questions."
+    )
+    profile_long = profile.melt(
+        id_vars="ministry_addressed",
+        value_vars=["count_pri_questions", "expected_pri_questions"],
+        var_name="measure",
+        value_name="questions",
+    ).replace(
+        {
+            "measure": {
+                "count_pri_questions": selected_member,
+                "expected_pri_questions": "Relative Proportion",
+            }
+        }
+    )
+    profile_chart = (
+        alt.Chart(profile_long)
+        .mark_bar()
+        .encode(
+            x=alt.X("questions:Q", title="Primary Questions"),
+            y=alt.Y("measure:N", title=None, axis=None),
+            color=alt.Color("measure:N", title=None),
+            row=alt.Row(
+                "ministry_addressed:N",
+                title=None,
+                header=alt.Header(labelAngle=0, labelAlign="left"),
+            ),
+            tooltip=[
+                alt.Tooltip("ministry_addressed", title="Ministry"),
+                alt.Tooltip("measure", title=" "),
+                alt.Tooltip("questions", title="Questions", format=".1f"),
+            ],
+        )
+        .properties(height=30)
+    )
+    st.altair_chart(profile_chart)
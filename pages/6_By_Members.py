@@ -1,18 +1,26 @@
 import streamlit as st
 import altair as alt
 from agg_data import (
+    get_data_version,
     get_member_list,
     get_member_positions,
     get_all_member_speeches,
-    primary_question_topics,
 )
-from members import aggregate_member_metrics
-from utils import calculate_readability, EARLIEST_SITTING
+from exports import export_downloads, get_exports
+from members import aggregate_member_metrics, member_scorecards
+from utils import calculate_readability_vectorised, EARLIEST_SITTING
+from baselines import cohort_baselines
+from questions import get_question_matrix, member_question_profile
+from similarity import get_similar_members
+from sketches import get_speech_sketches, quantiles_by
+from terms import distinctive_terms, get_term_stats
+from portraits import display_portrait
+from positions import get_position_index, member_history, member_positions_on
+from progressive import Section, load_concurrently, placeholder, render_when_ready
+from search import search_box, search_selection
 import pandas as pd
 from datetime import datetime
-from scipy.stats import percentileofscore
 from millify import millify
-import numpy as np
 
 st.set_page_config(
     page_title="Performance by Members",
@@ -23,57 +31,59 @@ st.set_page_config(
 # BACKEND
 
 
-def average_non_zero(x):
-    non_zero_values = x[x != 0]
-    return np.mean(non_zero_values) if len(non_zero_values) > 0 else 0
-
-
-def aggregate_by_ministry(df):
-    grouped_df = (
-        df.groupby("ministry_addressed")["count_pri_questions"].sum().reset_index()
+def chart_against_baseline(speech_summary, metric, title, average=None):
+    """
+    Line chart of a member's yearly metric, against the average and
+    inter-quartile band of all members in the same year.
+    """
+    base = alt.Chart(speech_summary).encode(x=alt.X("year:O", title=None))
+    band = base.mark_area(opacity=0.2).encode(
+        y=alt.Y(f"p25_{metric}:Q", title=title),
+        y2=f"p75_{metric}:Q",
+    )
+    baseline = base.mark_line(strokeDash=[4, 4], color="grey").encode(
+        y=f"{average or f'avg_{metric}'}:Q",
     )
-    total_questions = grouped_df["count_pri_questions"].sum()
-    grouped_df["proportion_of_questions"] = (
-        grouped_df["count_pri_questions"] / total_questions
+    member = base.mark_line(point=True).encode(
+        y=f"{metric}:Q",
+        tooltip=[
+            alt.Tooltip("year:O", title="Year"),
+            alt.Tooltip(f"{metric}:Q", title=title, format=",.1f"),
+            alt.Tooltip(f"median_{metric}:Q", title="Median", format=",.1f"),
+        ],
     )
-    return grouped_df
+    return (band + baseline + member).properties(height=200)
 
 
-def calculate_relative_proportion(selected_member, df, grouped_df):
-    member_questions = df[df["member_name"] == selected_member]
-    member_total_questions = member_questions["count_pri_questions"].sum()
+def calculate_relative_proportion(question_matrix, selected_member):
+    question_profile = member_question_profile(question_matrix, selected_member)
 
-    grouped_df["relative_proportion_pri_questions"] = (
-        grouped_df["proportion_of_questions"] * member_total_questions
-    )
-    grouped_df = grouped_df[["ministry_addressed", "relative_proportion_pri_questions"]]
-    grouped_df["member_name"] = "Relative Proportion"
-    grouped_df = grouped_df.rename(
-        columns={"relative_proportion_pri_questions": "count_pri_questions"}
+    member_questions = question_profile[question_profile["count_pri_questions"] > 0][
+        ["ministry_addressed", "count_pri_questions"]
+    ].assign(member_name=selected_member)
+    relative_proportion = (
+        question_profile[["ministry_addressed", "expected_pri_questions"]]
+        .rename(columns={"expected_pri_questions": "count_pri_questions"})
+        .assign(member_name="Relative Proportion")
     )
 
-    final_df = pd.concat([member_questions, grouped_df], ignore_index=True)
+    final_df = pd.concat([member_questions, relative_proportion], ignore_index=True)
     final_df = final_df[["member_name", "ministry_addressed", "count_pri_questions"]]
 
     return final_df
 
 
-def get_member_speeches_by_year(member_name):
-    all_members_speeches_summary = get_all_member_speeches()
-
-    all_members_speeches_summary_by_year = aggregate_member_metrics(
-        all_members_speeches_summary, calculate_readability, group_by_fields=["member_name", "year"]
-    )
-
-    return all_members_speeches_summary_by_year[
-        all_members_speeches_summary_by_year["member_name"] == member_name
-    ]
+def get_member_speeches_by_year(
+    aggregated_by_member_year, aggregated_by_year, member_name
+):
+    speech_summary = aggregated_by_member_year[
+        aggregated_by_member_year["member_name"] == member_name
+    ].copy()
+    return speech_summary.merge(aggregated_by_year, how="left", on="year")
 
 
 @st.cache_data(ttl=6000)
 def prepare_aggregated_data():
-    members_df = get_member_list()
-    member_positions_df = get_member_positions()
     all_members_speech_summary = get_all_member_speeches()
 
     column_names = [
@@ -85,148 +95,38 @@ def prepare_aggregated_data():
         "count_pri_questions",
         "count_sentences",
         "count_syllables",
+        "readability",
     ]
 
     # agg by member
     aggregated_by_member = aggregate_member_metrics(
-        all_members_speech_summary, calculate_readability, group_by_fields=["member_name"]
+        all_members_speech_summary,
+        calculate_readability_vectorised,
+        group_by_fields=["member_name"],
     )
 
-    # agg by year (average metrics)
-    agg_by_year_dict = {col: average_non_zero for col in column_names}
-    aggregated_by_year = (
-        all_members_speech_summary.groupby("year").agg(agg_by_year_dict).reset_index()
-    )
-    aggregated_by_year.columns = ["year"] + [f"avg_{col}" for col in column_names]
-    aggregated_by_year["year"] = (
-        aggregated_by_year["year"].astype(str).str.replace("[,.]", "", regex=True)
-    )
-    # agg by year (overall readability)
-    readability_cols = ["count_words", "count_sentences", "count_syllables"]
-    readability_dict = {col: sum for col in readability_cols}
-    aggregated_by_year_readability = (
-        all_members_speech_summary.groupby("year").agg(readability_dict).reset_index()
-    )
-    aggregated_by_year_readability.columns = ["year"] + readability_cols
-    aggregated_by_year_readability[
-        "overall_readability"
-    ] = aggregated_by_year_readability.apply(calculate_readability, axis=1)
-    aggregated_by_year_readability["year"] = (
-        aggregated_by_year_readability["year"]
-        .astype(str)
-        .str.replace("[,.]", "", regex=True)
-    )
-    aggregated_by_year = aggregated_by_year.merge(
-        aggregated_by_year_readability[["year", "overall_readability"]],
-        how="left",
-        on="year",
+    # agg by member and year
+    aggregated_by_member_year = aggregate_member_metrics(
+        all_members_speech_summary,
+        calculate_readability_vectorised,
+        group_by_fields=["member_name", "year"],
     )
+    aggregated_by_member_year["year"] = aggregated_by_member_year["year"].astype(str)
 
-    # primary questions
-    agg_questions_by_members = primary_question_topics()
+    # agg by year (baselines across members)
+    aggregated_by_year = cohort_baselines(
+        aggregated_by_member_year, group_by_fields=["year"], column_names=column_names
+    )
 
     return (
-        members_df,
-        member_positions_df,
         aggregated_by_member,
+        aggregated_by_member_year,
         aggregated_by_year,
-        agg_questions_by_members,
-    )
-
-
-(
-    members_df,
-    member_positions_df,
-    aggregated_by_member,
-    aggregated_by_year,
-    agg_questions_by_members,
-) = prepare_aggregated_data()
-member_names = sorted(members_df["member_name"].unique())
-
-
-# FRONTEND
-
-select_member = st.sidebar.selectbox(
-    label="Which member are you interested in?",
-    options=member_names,
-    index=None,
-    placeholder="Choose member name",
-)
-
-st.title("Performance by Members")
-st.warning("Under construction.")
-
-if not select_member:
-    st.error("Please select a member on the sidebar.")
-
-if select_member:
-    member_info, member_picture = st.columns([3, 1])
-    member_df = members_df[members_df["member_name"] == select_member]
-
-    with member_info:
-        st.header(select_member)
-        member_birth_year = member_df["member_birth_year"].iloc[0]
-
-        if member_birth_year:
-            member_birth_year_int = int(member_birth_year)
-            member_age_int = datetime.now().year - member_birth_year_int
-            st.markdown(
-                f"""
-                * Last Political Affiliation: {member_df['party'].iloc[0]}
-                * Latest Constituency: {member_df['constituency'].iloc[0]}{' (Inactive)' if member_df['is_active'].iloc[0] == False else ''}
-                * Birth Year: {member_birth_year_int} (_Age: {member_age_int}_)
-                """
-            )
-        else:
-            st.markdown("* Birth Year: _unknown_")
-
-        condition_earliest_sitting_in_dataset = (
-            str(member_df["earliest_sitting"].iloc[0]) > EARLIEST_SITTING
-        )
-        member_earliest_sitting = (
-            member_df["earliest_sitting"].iloc[0]
-            if condition_earliest_sitting_in_dataset
-            else str(member_df["earliest_sitting"].iloc[0]) + " _or before_"
-        )
-        member_latest_sitting = member_df["latest_sitting"].iloc[0]
-
-        if not condition_earliest_sitting_in_dataset:
-            st.info(
-                f"The earliest sitting is likely before this date, but the earliest date in the dataset is {EARLIEST_SITTING}, and therefore this is the earliest date which is displayed."
-            )
-
-        count_sittings_present = member_df["count_sittings_present"].iloc[0]
-        count_sittings_total = member_df["count_sittings_total"].iloc[0]
-
-        st.markdown(
-            f"""
-            * Earliest Sitting: {member_earliest_sitting}
-            * Latest Sitting: {member_latest_sitting}
-            * Attendance: {count_sittings_present/count_sittings_total*100:.1f}% (_{count_sittings_present} out of {count_sittings_total} sittings_)
-            """
-        )
-
-    with member_picture:
-        member_image_link = member_df["member_image_link"].iloc[0]
-        if member_image_link:
-            st.image(image=str(member_image_link), width=150)
-
-    st.divider()
-    st.subheader("Speeches")
-
-    speech_summary = get_member_speeches_by_year(select_member)
-    speech_summary["readability"] = speech_summary.apply(calculate_readability, axis=1)
-    speech_summary["year"] = (
-        speech_summary["year"].astype(str).str.replace("[,.]", "", regex=True)
     )
-    speech_summary = speech_summary.merge(aggregated_by_year, how="left", on="year")
 
-    if not condition_earliest_sitting_in_dataset:
-        st.warning(
-            f"As this member was elected before the earliest sitting ({EARLIEST_SITTING}), the information below reflects information from sittings on {EARLIEST_SITTING} and after."
-        )
 
-    not_eligible_to_ask_questions = (
+def is_not_eligible_to_ask_questions(member_positions_df, select_member):
+    return (
         # is a political appointee
         not member_positions_df.loc[
             (member_positions_df["member_name"] == select_member)
@@ -239,11 +139,36 @@ if select_member:
         ].empty
     )
 
+
+# SECTIONS, drawn as the data each needs finishes loading
+
+
+def display_appointee_notice(member_positions_df):
+    not_eligible_to_ask_questions = is_not_eligible_to_ask_questions(
+        member_positions_df, select_member
+    )
     if not_eligible_to_ask_questions:
         st.success(
             f"As this member has a political appointment (e.g. Minister, Parliamentary Secretary, Minister of State), they will not ask questions during parliamentary proceedings. Instead, they answer questions. If there are values for questions asked, this could either be before the member became a political appointee or a bug."
         )
 
+
+def display_member_metrics(aggregated, member_positions_df):
+    aggregated_by_member, aggregated_by_member_year, aggregated_by_year = aggregated
+    speech_summary = get_member_speeches_by_year(
+        aggregated_by_member_year, aggregated_by_year, select_member
+    )
+    not_eligible_to_ask_questions = is_not_eligible_to_ask_questions(
+        member_positions_df, select_member
+    )
+
+    member_scorecard = (
+        member_scorecards(aggregated_by_member, [select_member])
+        .set_index("member_name")
+        .reindex([select_member])
+        .iloc[0]
+    )
+
     metric1, metric2, metric3, metric4, metric5 = st.columns(5)
     with metric1:
         st.metric(
@@ -267,9 +192,11 @@ if select_member:
             help="Sittings Spoken in divided by Sittings Attended",
         )
         st.caption(
-            f"Percentile: {percentileofscore(aggregated_by_member['participation_rate'], member_participation_rate):.1f}"
+            f"Percentile: {member_scorecard['participation_rate_percentile']:.1f}"
+        )
+        st.caption(
+            f"Average: {member_scorecard['participation_rate_cohort_average']:.1f}%"
         )
-        st.caption(f"Average: {aggregated_by_member['participation_rate'].mean():.1f}%")
     with metric3:
         st.metric(
             label="Speeches Made",
@@ -284,9 +211,11 @@ if select_member:
             value=f"{member_topics_per_sitting:,.2f}",
         )
         st.caption(
-            f"Percentile: {percentileofscore(aggregated_by_member['topics_per_sitting'], member_topics_per_sitting):.1f}"
+            f"Percentile: {member_scorecard['topics_per_sitting_percentile']:.1f}"
+        )
+        st.caption(
+            f"Average: {member_scorecard['topics_per_sitting_cohort_average']:,.2f}"
         )
-        st.caption(f"Average: {aggregated_by_member['topics_per_sitting'].mean():,.2f}")
     with metric4:
         st.metric(
             label="Qns Asked",
@@ -304,10 +233,10 @@ if select_member:
             st.caption("N/A")
         else:
             st.caption(
-                f"Percentile: {percentileofscore(aggregated_by_member['questions_per_sitting'], member_questions_per_sitting):.1f}"
+                f"Percentile: {member_scorecard['questions_per_sitting_percentile']:.1f}"
             )
             st.caption(
-                f"Average: {aggregated_by_member[aggregated_by_member['questions_per_sitting'] != 0]['questions_per_sitting'].mean():,.2f}"
+                f"Average: {member_scorecard['questions_per_sitting_cohort_average']:,.2f}"
             )
     with metric5:
         st.metric(
@@ -323,16 +252,20 @@ if select_member:
             value=f"{millify(member_words_per_sitting, precision=1)}",
         )
         st.caption(
-            f"Percentile: {percentileofscore(aggregated_by_member['words_per_sitting'], member_words_per_sitting):.1f}"
+            f"Percentile: {member_scorecard['words_per_sitting_percentile']:.1f}"
         )
         st.caption(
-            f"Average: {millify(aggregated_by_member['words_per_sitting'].mean(), precision=1)}"
+            f"Average: {millify(member_scorecard['words_per_sitting_cohort_average'], precision=1)}"
         )
 
+
+def display_question_breakdown(question_matrix, member_positions_df):
+    not_eligible_to_ask_questions = is_not_eligible_to_ask_questions(
+        member_positions_df, select_member
+    )
     if not not_eligible_to_ask_questions:
-        agg_by_ministry_addressed = aggregate_by_ministry(agg_questions_by_members)
         questions_summary_with_relative_proportion = calculate_relative_proportion(
-            select_member, agg_questions_by_members, agg_by_ministry_addressed
+            question_matrix, select_member
         )
 
         st.divider()
@@ -367,47 +300,163 @@ if select_member:
 
         st.altair_chart(horizontal_chart, use_container_width=True)
 
-    st.divider()
-    st.write("Over the years:")
+
+def display_similar_members(similar_members):
+    similar_to_member = similar_members[similar_members["member_name"] == select_member]
+    if similar_to_member.empty:
+        st.caption("N/A")
+    else:
+        st.dataframe(
+            similar_to_member[["rank", "similar_member_name", "similarity"]],
+            column_config={
+                "rank": "#",
+                "similar_member_name": "Member Name",
+                "similarity": st.column_config.ProgressColumn(
+                    "Similarity", format="%.2f", min_value=0, max_value=1
+                ),
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+def display_yearly_charts(aggregated):
+    _, aggregated_by_member_year, aggregated_by_year = aggregated
+    speech_summary = get_member_speeches_by_year(
+        aggregated_by_member_year, aggregated_by_year, select_member
+    )
     col1, col2 = st.columns(2, gap="medium")
     with col1:
-        st.line_chart(
-            data=speech_summary,
-            x="year",
-            y=["count_topics", "avg_count_topics"],
-            height=200,
-        )
-        st.line_chart(
-            data=speech_summary,
-            x="year",
-            y=["count_pri_questions", "avg_count_pri_questions"],
-            height=200,
+        st.altair_chart(
+            chart_against_baseline(speech_summary, "count_topics", "Topics"),
+            use_container_width=True,
+        )
+        st.altair_chart(
+            chart_against_baseline(
+                speech_summary, "count_pri_questions", "Primary Questions"
+            ),
+            use_container_width=True,
         )
     with col2:
-        st.line_chart(
-            data=speech_summary,
-            x="year",
-            y=["count_speeches", "avg_count_speeches"],
-            height=200,
+        st.altair_chart(
+            chart_against_baseline(speech_summary, "count_speeches", "Speeches"),
+            use_container_width=True,
         )
-        st.line_chart(
-            data=speech_summary,
-            x="year",
-            y=["count_words", "avg_count_words"],
-            height=200,
+        st.altair_chart(
+            chart_against_baseline(speech_summary, "count_words", "Words"),
+            use_container_width=True,
         )
-    st.line_chart(
-        data=speech_summary,
-        x="year",
-        y=["readability", "overall_readability"],
-        height=200,
+    st.altair_chart(
+        chart_against_baseline(
+            speech_summary, "readability", "Readability", average="overall_readability"
+        ),
+        use_container_width=True,
+    )
+    st.caption(
+        "Dashed lines show the average across members (excluding zero values), "
+        "and the shaded bands the middle 50% of members."
     )
 
-    st.divider()
-    st.subheader("Positions")
-    positions_df = member_positions_df[
-        member_positions_df["member_name"] == select_member
-    ]
+
+def display_speech_distributions(speech_sketches):
+    if speech_sketches is None:
+        st.info(
+            "Speech distributions have not been built yet. Run `python -m sketches` to build them."
+        )
+        return
+    speech_sketches, sketches_version = speech_sketches
+    col1, col2 = st.columns(2, gap="medium")
+    for col, metric, title in [
+        (col1, "count_words", "Words per Speech"),
+        (col2, "readability", "Readability per Speech"),
+    ]:
+        distribution = pd.concat(
+            [
+                quantiles_by(
+                    speech_sketches,
+                    metric,
+                    ["year"],
+                    mask=speech_sketches.keys["member_name"] == select_member,
+                ).assign(group=select_member),
+                quantiles_by(speech_sketches, metric, ["year"]).assign(
+                    group="All members"
+                ),
+            ],
+            ignore_index=True,
+        )
+        distribution["year"] = distribution["year"].astype(int).astype(str)
+        base = alt.Chart(distribution).encode(
+            x=alt.X("year:O", title=None),
+            color=alt.Color("group:N", title=None, legend=alt.Legend(orient="bottom")),
+        )
+        band = base.mark_area(opacity=0.2).encode(
+            y=alt.Y("p25:Q", title=f"{title} (median)"), y2="p75:Q"
+        )
+        median = base.mark_line(point=True).encode(
+            y="p50:Q",
+            tooltip=[
+                alt.Tooltip("group:N", title=" "),
+                alt.Tooltip("year:O", title="Year"),
+                alt.Tooltip("p25:Q", title="25th percentile", format=",.1f"),
+                alt.Tooltip("p50:Q", title="Median", format=",.1f"),
+                alt.Tooltip("p75:Q", title="75th percentile", format=",.1f"),
+                alt.Tooltip("count_speeches:Q", title="Speeches"),
+            ],
+        )
+        with col:
+            st.altair_chart(
+                (band + median).properties(height=200), use_container_width=True
+            )
+    st.caption(
+        "Lines show the median speech, and the shaded bands the middle 50% of speeches, estimated from histogram sketches."
+        + (
+            f" Built from data version {sketches_version}."
+            if sketches_version != get_data_version()
+            else ""
+        )
+    )
+
+
+def display_distinctive_terms(term_stats):
+    if term_stats is None:
+        st.info(
+            "Term statistics have not been built yet. Run `python -m terms` to build them."
+        )
+        return
+    term_stats, term_stats_version = term_stats
+    terms = distinctive_terms(term_stats, select_member, n=15)
+    if terms.empty:
+        st.caption("N/A")
+        return
+    chart = (
+        alt.Chart(terms)
+        .mark_bar()
+        .encode(
+            x=alt.X("log_ratio:Q", title="Distinctiveness (log ratio)"),
+            y=alt.Y("term:N", sort="-x", title=None),
+            tooltip=[
+                alt.Tooltip("term:N", title="Term"),
+                alt.Tooltip("count:Q", title="Times used", format=","),
+                alt.Tooltip("member_rate:Q", title="Per 10,000 terms", format=".1f"),
+                alt.Tooltip(
+                    "chamber_rate:Q", title="Per 10,000 terms (others)", format=".1f"
+                ),
+            ],
+        )
+    )
+    st.altair_chart(chart, use_container_width=True)
+    st.caption(
+        "Words and phrases this member uses more often than other members, estimated from count-min sketches of every speech."
+        + (
+            f" Built from data version {term_stats_version}."
+            if term_stats_version != get_data_version()
+            else ""
+        )
+    )
+
+
+def display_positions(position_index):
+    positions_df = member_history(position_index, select_member)
     columns_to_display = [
         "member_position",
         "effective_from_date",
@@ -428,3 +477,259 @@ if select_member:
     if not appointments_df.empty:
         st.write("Political Appointments")
         st.dataframe(appointments_df, use_container_width=True, hide_index=True)
+
+    latest_sitting = members_df.loc[
+        members_df["member_name"] == select_member, "latest_sitting"
+    ].iloc[0]
+    held = member_positions_on(position_index, select_member, latest_sitting)
+    if not held.empty:
+        st.caption(
+            f"At their latest sitting ({latest_sitting}): "
+            + ", ".join(held["member_position"])
+        )
+
+
+def display_comparison(aggregated):
+    aggregated_by_member = aggregated[0]
+    if select_cohort_party == "All members":
+        cohort = None
+    else:
+        cohort = aggregated_by_member["member_name"].isin(
+            members_df[members_df["party"] == select_cohort_party]["member_name"]
+        )
+    comparison = member_scorecards(aggregated_by_member, compare_members, cohort)
+
+    column_config = {"member_name": st.column_config.TextColumn("Member Name")}
+    for metric, (label, value_format) in comparison_metrics.items():
+        column_config[metric] = st.column_config.NumberColumn(
+            label, format=value_format
+        )
+        column_config[f"{metric}_percentile"] = st.column_config.ProgressColumn(
+            f"{label} Percentile", format="%.0f", min_value=0, max_value=100
+        )
+    st.dataframe(
+        comparison[list(column_config.keys())],
+        column_config=column_config,
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def display_downloads(exports):
+    export_downloads(
+        exports, ["members", "members_by_year", "positions"], key="members_downloads"
+    )
+
+
+# FRONTEND
+
+st.title("Performance by Members")
+st.warning("Under construction.")
+
+# the layout below is drawn while the data loads, and filled in as each
+# loader finishes; loaders are only started once a section needs them
+data = load_concurrently({"members": get_member_list})
+sections = []
+
+members_df = data["members"].result()
+member_names = sorted(members_df["member_name"].unique())
+
+search_box()
+searched_member = search_selection("member")
+select_member = st.sidebar.selectbox(
+    label="Which member are you interested in?",
+    options=member_names,
+    index=(
+        member_names.index(searched_member) if searched_member in member_names else None
+    ),
+    placeholder="Choose member name",
+)
+
+if not select_member:
+    st.error("Please select a member on the sidebar.")
+
+if select_member:
+    data.update(
+        load_concurrently(
+            {
+                "positions": get_member_positions,
+                "position_index": get_position_index,
+                "aggregated": prepare_aggregated_data,
+                "question_matrix": get_question_matrix,
+                "speech_sketches": get_speech_sketches,
+                "term_stats": get_term_stats,
+            }
+        )
+    )
+
+    member_info, member_picture = st.columns([3, 1])
+    member_df = members_df[members_df["member_name"] == select_member]
+
+    with member_info:
+        st.header(select_member)
+        member_birth_year = member_df["member_birth_year"].iloc[0]
+
+        if member_birth_year:
+            member_birth_year_int = int(member_birth_year)
+            member_age_int = datetime.now().year - member_birth_year_int
+            st.markdown(
+                f"""
+                * Last Political Affiliation: {member_df['party'].iloc[0]}
+                * Latest Constituency: {member_df['constituency'].iloc[0]}{' (Inactive)' if member_df['is_active'].iloc[0] == False else ''}
+                * Birth Year: {member_birth_year_int} (_Age: {member_age_int}_)
+                """
+            )
+        else:
+            st.markdown("* Birth Year: _unknown_")
+
+        condition_earliest_sitting_in_dataset = (
+            str(member_df["earliest_sitting"].iloc[0]) > EARLIEST_SITTING
+        )
+        member_earliest_sitting = (
+            member_df["earliest_sitting"].iloc[0]
+            if condition_earliest_sitting_in_dataset
+            else str(member_df["earliest_sitting"].iloc[0]) + " _or before_"
+        )
+        member_latest_sitting = member_df["latest_sitting"].iloc[0]
+
+        if not condition_earliest_sitting_in_dataset:
+            st.info(
+                f"The earliest sitting is likely before this date, but the earliest date in the dataset is {EARLIEST_SITTING}, and therefore this is the earliest date which is displayed."
+            )
+
+        count_sittings_present = member_df["count_sittings_present"].iloc[0]
+        count_sittings_total = member_df["count_sittings_total"].iloc[0]
+
+        st.markdown(
+            f"""
+            * Earliest Sitting: {member_earliest_sitting}
+            * Latest Sitting: {member_latest_sitting}
+            * Attendance: {count_sittings_present/count_sittings_total*100:.1f}% (_{count_sittings_present} out of {count_sittings_total} sittings_)
+            """
+        )
+
+    with member_picture:
+        member_image_link = member_df["member_image_link"].iloc[0]
+        display_portrait(member_image_link, width=150)
+
+    st.divider()
+    st.subheader("Speeches")
+
+    if not condition_earliest_sitting_in_dataset:
+        st.warning(
+            f"As this member was elected before the earliest sitting ({EARLIEST_SITTING}), the information below reflects information from sittings on {EARLIEST_SITTING} and after."
+        )
+
+    sections.append(
+        Section(placeholder("appointments"), ("positions",), display_appointee_notice)
+    )
+    sections.append(
+        Section(
+            placeholder("speech metrics"),
+            ("aggregated", "positions"),
+            display_member_metrics,
+        )
+    )
+    sections.append(
+        Section(
+            placeholder("parliamentary questions"),
+            ("question_matrix", "positions"),
+            display_question_breakdown,
+        )
+    )
+
+    st.divider()
+    st.write("Similar members:")
+    similarity_basis = st.radio(
+        label="Based on:",
+        options=["Questions asked", "Questions asked and speaking style"],
+        horizontal=True,
+    )
+    speech_weight = 0.0 if similarity_basis == "Questions asked" else 0.5
+    data.update(
+        load_concurrently(
+            {
+                "similar_members": lambda: get_similar_members(
+                    get_data_version(), speech_weight=speech_weight
+                )
+            }
+        )
+    )
+    sections.append(
+        Section(
+            placeholder("similar members"),
+            ("similar_members",),
+            display_similar_members,
+        )
+    )
+
+    st.divider()
+    st.write("Over the years:")
+    sections.append(
+        Section(placeholder("yearly charts"), ("aggregated",), display_yearly_charts)
+    )
+    sections.append(
+        Section(
+            placeholder("speech distributions"),
+            ("speech_sketches",),
+            display_speech_distributions,
+        )
+    )
+
+    st.divider()
+    st.write("Distinctive words and phrases:")
+    sections.append(
+        Section(
+            placeholder("distinctive terms"), ("term_stats",), display_distinctive_terms
+        )
+    )
+
+    st.divider()
+    st.subheader("Positions")
+    sections.append(
+        Section(placeholder("positions"), ("position_index",), display_positions)
+    )
+
+
+# COMPARISON
+
+st.divider()
+st.subheader("Compare Members")
+
+comparison_metrics = {
+    "attendance": ("Attendance (%)", "%.1f%%"),
+    "participation_rate": ("Participation (%)", "%.1f%%"),
+    "topics_per_sitting": ("Topics/Sitting", "%.2f"),
+    "questions_per_sitting": ("Qns/Sitting", "%.2f"),
+    "words_per_sitting": ("Words/Sitting", "%.0f"),
+    "readability": ("Readability", "%.1f"),
+}
+
+select_compare, select_cohort = st.columns([3, 1])
+with select_compare:
+    compare_members = st.multiselect(
+        label="Which members would you like to compare?",
+        options=member_names,
+        default=[select_member] if select_member else None,
+        max_selections=36,
+        placeholder="Choose member names",
+    )
+with select_cohort:
+    select_cohort_party = st.selectbox(
+        label="Percentiles among:",
+        options=["All members", *sorted(members_df["party"].dropna().unique())],
+    )
+
+if compare_members:
+    if "aggregated" not in data:
+        data.update(load_concurrently({"aggregated": prepare_aggregated_data}))
+    sections.append(
+        Section(placeholder("comparison"), ("aggregated",), display_comparison)
+    )
+
+st.divider()
+with st.expander(label="Download data", expanded=False):
+    data.update(load_concurrently({"exports": lambda: get_exports(get_data_version())}))
+    sections.append(Section(placeholder("downloads"), ("exports",), display_downloads))
+
+render_when_ready(data, sections)
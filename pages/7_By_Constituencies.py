@@ -1,12 +1,22 @@
 import streamlit as st
-import pandas as pd
+import altair as alt
 from millify import millify
-from agg_data import get_member_list, get_member_positions, get_all_member_speeches
+from agg_data import (
+    get_all_member_speeches,
+    get_data_version,
+    get_member_list,
+    get_member_positions,
+)
+from explorer import member_explorer
 from members import (
     categorise_active_members_with_appointments,
     aggregate_member_metrics,
+    member_scorecards,
 )
-from utils import calculate_readability, EARLIEST_SITTING
+from portraits import display_portrait
+from positions import get_position_index, holders_on, member_term, position_history
+from search import search_box, search_selection
+from utils import calculate_readability_vectorised, EARLIEST_SITTING, PARTY_COLOURS
 
 # BACKEND
 
@@ -21,32 +31,18 @@ current_member_appointments = all_member_positions[
     (all_member_positions["type"] == "appointment")
     & (all_member_positions["is_latest_position"])
 ]
+position_index = get_position_index()
 
 # metrics by member:
 all_members_speech_summary = get_all_member_speeches()
 aggregated_by_member = aggregate_member_metrics(
-    all_members_speech_summary, calculate_readability, group_by_fields=["member_name"]
+    all_members_speech_summary,
+    calculate_readability_vectorised,
+    group_by_fields=["member_name"],
 )
-metrics_to_display = [
-    "member_name",
-    "participation_rate",
-    "topics_per_sitting",
-    "questions_per_sitting",
-    "words_per_sitting",
-    "readability",
-]
-aggregated_by_member_display = aggregated_by_member[metrics_to_display]
-aggregated_by_member_display["participation_rate"] = (
-    aggregated_by_member["participation_rate"].round(1).astype(str) + "%"
+aggregated_by_member_display = member_scorecards(aggregated_by_member).set_index(
+    "member_name"
 )
-for metric in metrics_to_display:
-    if metric not in [
-        "member_name",
-        "participation_rate",
-    ] and pd.api.types.is_numeric_dtype(aggregated_by_member_display[metric]):
-        aggregated_by_member_display[metric] = aggregated_by_member_display[
-            metric
-        ].round(2)
 
 
 # former members:
@@ -65,10 +61,16 @@ st.title("Performance by Constituency")
 
 st.warning("Under construction.")
 
+search_box()
+searched_constituency = search_selection("constituency")
 select_constituency = st.sidebar.selectbox(
     label="Which constituency are you interested in?",
     options=constituency_names,
-    index=None,
+    index=(
+        constituency_names.index(searched_constituency)
+        if searched_constituency in constituency_names
+        else None
+    ),
     placeholder="Choose constituency name",
 )
 
@@ -97,7 +99,7 @@ if select_constituency:
                     member_image_link = members_df[
                         members_df["member_name"] == member_name
                     ]["member_image_link"].iloc[0]
-                    st.image(member_image_link, width=100, caption=member_name)
+                    display_portrait(member_image_link, width=100, caption=member_name)
                 else:
                     st.empty()
 
@@ -119,22 +121,25 @@ if select_constituency:
     def display_metrics(member_name):
         columns = st.columns(5, gap="medium")
         metrics = [
-            ("participation_rate", "Participation (%)", "1"),
-            ("topics_per_sitting", "Topics/Sitting", "1"),
-            ("questions_per_sitting", "Qns/Sitting", "2"),
-            ("words_per_sitting", "Words/Sitting", "2"),
-            ("readability", "Readability", "1"),
+            ("participation_rate", "Participation (%)", "{:.1f}%"),
+            ("topics_per_sitting", "Topics/Sitting", "{:,.2f}"),
+            ("questions_per_sitting", "Qns/Sitting", "{:,.2f}"),
+            ("words_per_sitting", "Words/Sitting", None),
+            ("readability", "Readability", "{:.1f}"),
         ]
+        member_metrics = aggregated_by_member_display.loc[member_name]
         for i, col in enumerate(columns):
             with col:
-                value = aggregated_by_member_display[
-                    aggregated_by_member_display["member_name"] == member_name
-                ][metrics[i][0]].iloc[0]
-                if isinstance(value, (int, float)):
-                    value = millify(value, precision=metrics[i][2])
+                metric, label, value_format = metrics[i]
+                value = member_metrics[metric]
                 st.metric(
-                    label=metrics[i][1],
-                    value=value,
+                    label=label,
+                    value=(
+                        value_format.format(value)
+                        if value_format
+                        else millify(value, precision=1)
+                    ),
+                    help=f"Percentile: {member_metrics[f'{metric}_percentile']:.1f}",
                 )
 
     if active_members_with_appointments:
@@ -159,15 +164,72 @@ if select_constituency:
             )
             former_members = filter_former_members(select_constituency)["member_name"]
             for member_name in former_members:
-                if member_name in aggregated_by_member_display["member_name"].values:
-                    position_dates = all_member_positions[
-                        (all_member_positions["member_name"] == member_name)
-                        & (
-                            all_member_positions["member_position"]
-                            == select_constituency
-                        )
-                    ][["effective_from_date", "effective_to_date"]]
-                    earliest_date = position_dates["effective_from_date"].min()
-                    latest_date = position_dates["effective_to_date"].max()
+                if member_name in aggregated_by_member_display.index:
+                    earliest_date, latest_date = member_term(
+                        position_index, member_name, select_constituency
+                    )
                     st.write(f"**{member_name}** ({earliest_date} to {latest_date})")
                     display_metrics(member_name)
+
+    constituency_history = position_history(position_index, select_constituency)
+    if not constituency_history.empty:
+        st.subheader("Timeline")
+        timeline = constituency_history.merge(
+            members_df[["member_name", "party"]], how="left", on="member_name"
+        )
+        timeline["effective_to_date"] = timeline["effective_to_date"].fillna(
+            members_df["latest_sitting"].max()
+        )
+        chart = (
+            alt.Chart(timeline)
+            .mark_bar()
+            .encode(
+                x=alt.X("effective_from_date:T", title="Date"),
+                x2="effective_to_date:T",
+                y=alt.Y("member_name:N", sort="x", title=None),
+                color=alt.Color("party:N", title="Party").scale(
+                    alt.Scale(
+                        domain=list(PARTY_COLOURS.keys()),
+                        range=list(PARTY_COLOURS.values()),
+                    )
+                ),
+                tooltip=[
+                    alt.Tooltip("member_name", title="Member"),
+                    alt.Tooltip("party", title="Party"),
+                    alt.Tooltip("effective_from_date:T", title="From"),
+                    alt.Tooltip("effective_to_date:T", title="To"),
+                ],
+            )
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+        select_date = st.date_input(
+            label="Who represented this constituency on:",
+            value=members_df["latest_sitting"].max(),
+            min_value=timeline["effective_from_date"].min(),
+            max_value=members_df["latest_sitting"].max(),
+        )
+        holders = holders_on(position_index, select_constituency, select_date)
+        if holders.empty:
+            st.caption("No members held this constituency on that date.")
+        else:
+            st.caption(", ".join(sorted(holders["member_name"])))
+
+st.divider()
+st.subheader("Compare Constituencies")
+st.caption(
+    "Filter by parliament and party, switch to members or re-rank by clicking a column, without reloading the page."
+)
+member_explorer(
+    get_data_version(),
+    key="constituency_explorer",
+    metrics=[
+        "participation_rate",
+        "topics_per_sitting",
+        "questions_per_sitting",
+        "words_per_sitting",
+        "readability",
+    ],
+    highlighted=[select_constituency, *active_members] if select_constituency else None,
+    group_by="constituency",
+)
@@ -0,0 +1,152 @@
+import hashlib
+import io
+import os
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+import streamlit as st
+from PIL import Image, ImageOps
+
+PORTRAIT_CACHE_DIR = os.path.join("data", "portraits")
+
+# widths portraits are shown at: member lists and the member profile
+PORTRAIT_WIDTHS = (100, 150)
+
+PORTRAIT_TIMEOUT = 10
+PORTRAIT_MAX_BYTES = 10 * 1024 * 1024
+
+
+def _url_key_path(url: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, "urls", hashlib.sha256(url.encode()).hexdigest())
+
+
+def thumbnail_path(
+    content_hash: str, width: int, cache_dir: str = PORTRAIT_CACHE_DIR
+) -> str:
+    return os.path.join(cache_dir, content_hash[:2], f"{content_hash}-{width}.jpg")
+
+
+def _write_atomically(path: str, data: bytes):
+    # a temporary file of its own, so threads writing the same path never
+    # write into each other's file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as f:
+            f.write(data)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def resize_portrait(image_bytes: bytes, width: int) -> bytes:
+    """
+    Scales a portrait down to a width, keeping its aspect ratio, as a JPEG.
+    Portraits narrower than the width are re-encoded but not enlarged.
+    """
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_bytes))).convert("RGB")
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=85, optimize=True)
+    return output.getvalue()
+
+
+def cache_portrait(
+    url: str, cache_dir: str = PORTRAIT_CACHE_DIR, timeout: float = PORTRAIT_TIMEOUT
+) -> Optional[str]:
+    """
+    Downloads a portrait once and stores its thumbnails at every width in
+    PORTRAIT_WIDTHS, named by the hash of the downloaded image, so a portrait
+    linked from several URLs is only stored once.
+
+    Parameters:
+    - url (str): Link to the full-size portrait.
+    - cache_dir (str): Directory of the thumbnail cache.
+    - timeout (float): Seconds to wait for the image host.
+
+    Returns:
+    - Optional[str]: Hash of the portrait, or None if it could not be
+      downloaded or is not an image.
+    """
+    url_key_path = _url_key_path(url, cache_dir)
+    if os.path.exists(url_key_path):
+        with open(url_key_path) as f:
+            content_hash = f.read().strip()
+        if all(
+            os.path.exists(thumbnail_path(content_hash, width, cache_dir))
+            for width in PORTRAIT_WIDTHS
+        ):
+            return content_hash
+
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            image_bytes = response.read(PORTRAIT_MAX_BYTES + 1)
+        if len(image_bytes) > PORTRAIT_MAX_BYTES:
+            return None
+        content_hash = hashlib.sha256(image_bytes).hexdigest()
+        for width in PORTRAIT_WIDTHS:
+            path = thumbnail_path(content_hash, width, cache_dir)
+            if not os.path.exists(path):
+                _write_atomically(path, resize_portrait(image_bytes, width))
+        _write_atomically(url_key_path, content_hash.encode())
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # unreachable hosts, HTTP errors and bad URLs are OSError or
+        # ValueError, PIL raises OSError for data which is not an image, and
+        # a failed write is an OSError too; none of them stop a batch
+        return None
+    return content_hash
+
+
+@st.cache_data(ttl=6000, show_spinner=False)
+def get_portrait(
+    url: str, width: int, cache_dir: str = PORTRAIT_CACHE_DIR
+) -> Optional[str]:
+    """
+    Returns the path of a portrait's thumbnail, fetching it into the cache if
+    needed, or None if it is unavailable. Failures are retried once the
+    result expires.
+    """
+    if not url:
+        return None
+    content_hash = cache_portrait(url, cache_dir)
+    if content_hash is None:
+        return None
+    # the smallest thumbnail at least as wide as shown
+    thumbnail_width = min(
+        (w for w in PORTRAIT_WIDTHS if w >= width), default=max(PORTRAIT_WIDTHS)
+    )
+    return thumbnail_path(content_hash, thumbnail_width, cache_dir)
+
+
+def display_portrait(url: Optional[str], width: int, caption: Optional[str] = None):
+    """
+    Shows a member's portrait from the local thumbnail cache, or just the
+    caption when the portrait is unavailable.
+    """
+    path = get_portrait(str(url), width) if url else None
+    if path:
+        st.image(path, width=width, caption=caption)
+    elif caption:
+        st.write(caption)
+
+
+def prefetch_portraits(
+    urls: Iterable[str], cache_dir: str = PORTRAIT_CACHE_DIR, max_workers: int = 8
+) -> int:
+    """
+    Fills the thumbnail cache for many portraits at once.
+
+    Returns:
+    - int: The number of portraits available in the cache.
+    """
+    urls = sorted({url for url in urls if url})
+    with ThreadPoolExecutor(max_workers) as executor:
+        hashes = executor.map(lambda url: cache_portrait(url, cache_dir), urls)
+        return sum(content_hash is not None for content_hash in hashes)
@@ -0,0 +1,15 @@
+import argparse
+
+from agg_data import get_member_list
+from portraits import PORTRAIT_CACHE_DIR, prefetch_portraits
+
+parser = argparse.ArgumentParser(
+    description="Download every member's portrait into the local thumbnail cache."
+)
+parser.add_argument("--dir", default=PORTRAIT_CACHE_DIR)
+parser.add_argument("--workers", type=int, default=8)
+args = parser.parse_args()
+
+urls = get_member_list()["member_image_link"].dropna().astype(str)
+count_cached = prefetch_portraits(urls, args.dir, max_workers=args.workers)
+print(f"Cached {count_cached} of {urls.nunique()} portraits in {args.dir}.")
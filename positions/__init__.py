@@ -0,0 +1,164 @@
+import datetime
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agg_data import get_member_positions
+
+# effective_to_date is empty for positions which are still held
+OPEN_ENDED_DATE = np.datetime64("9999-12-31", "D")
+
+
+class IntervalIndex(NamedTuple):
+    """
+    Index over the positions of one key (a position or a member), as arrays
+    sorted by start date, in O(n) memory.
+
+    - starts (np.ndarray): Start dates (inclusive), as sorted datetime64[D].
+    - ends (np.ndarray): End dates (inclusive) of the same rows.
+    - max_ends (np.ndarray): Running maximum of `ends`, for binary search on
+      the first row which may still be active on a date.
+    - rows (np.ndarray): Row numbers of the key, ordered by start date.
+    """
+
+    starts: np.ndarray
+    ends: np.ndarray
+    max_ends: np.ndarray
+    rows: np.ndarray
+
+
+class PositionIndex(NamedTuple):
+    positions: pd.DataFrame
+    by_position: Dict[str, IntervalIndex]
+    by_member: Dict[str, IntervalIndex]
+
+
+def build_interval_index(
+    starts: np.ndarray, ends: np.ndarray, rows: np.ndarray
+) -> IntervalIndex:
+    """
+    Sorts a set of intervals by start date for `_stab`.
+
+    Parameters:
+    - starts (np.ndarray): Start dates (inclusive), as datetime64[D].
+    - ends (np.ndarray): End dates (inclusive), as datetime64[D].
+    - rows (np.ndarray): Row numbers of the intervals.
+
+    Returns:
+    - IntervalIndex: The index for these intervals.
+    """
+    order = np.argsort(starts, kind="stable")
+    starts, ends, rows = starts[order], ends[order], rows[order]
+    return IntervalIndex(starts, ends, np.maximum.accumulate(ends), rows)
+
+
+def _stab(interval_index: IntervalIndex, date) -> np.ndarray:
+    """
+    Returns the rows active on a date. Rows starting after the date, and rows
+    before the first one whose running maximum end reaches it, are skipped by
+    binary search; only the rows between are checked.
+    """
+    date = np.datetime64(pd.Timestamp(date).date(), "D")
+    last = np.searchsorted(interval_index.starts, date, side="right")
+    first = np.searchsorted(interval_index.max_ends[:last], date, side="left")
+    candidates = slice(first, last)
+    return interval_index.rows[candidates][interval_index.ends[candidates] >= date]
+
+
+def build_position_index(member_positions: pd.DataFrame) -> PositionIndex:
+    """
+    Indexes member positions by position and by member, so that the holders of
+    a position, or the positions of a member, on any date are found by binary search.
+
+    Parameters:
+    - member_positions (pd.DataFrame): Positions, e.g. from `get_member_positions`.
+
+    Returns:
+    - PositionIndex: The position index.
+    """
+    positions = member_positions.reset_index(drop=True)
+    starts = pd.to_datetime(positions["effective_from_date"]).to_numpy(
+        dtype="datetime64[D]"
+    )
+    ends = pd.to_datetime(positions["effective_to_date"]).to_numpy(
+        dtype="datetime64[D]"
+    )
+    ends = np.where(np.isnat(ends), OPEN_ENDED_DATE, ends)
+    # positions without a start date cannot be placed in time
+    has_start = ~np.isnat(starts)
+
+    def index_by(field):
+        indexes = {}
+        for key, rows in positions[has_start].groupby(field).indices.items():
+            rows = np.flatnonzero(has_start)[rows]
+            indexes[key] = build_interval_index(starts[rows], ends[rows], rows)
+        return indexes
+
+    return PositionIndex(
+        positions,
+        by_position=index_by("member_position"),
+        by_member=index_by("member_name"),
+    )
+
+
+def holders_on(position_index: PositionIndex, position: str, date) -> pd.DataFrame:
+    """
+    Returns the members who held a constituency or appointment on a date.
+    """
+    interval_index = position_index.by_position.get(position)
+    if interval_index is None:
+        return position_index.positions.iloc[:0]
+    return position_index.positions.iloc[_stab(interval_index, date)]
+
+
+def position_history(position_index: PositionIndex, position: str) -> pd.DataFrame:
+    """
+    Returns all holders of a constituency or appointment, ordered by start date.
+    """
+    interval_index = position_index.by_position.get(position)
+    if interval_index is None:
+        return position_index.positions.iloc[:0]
+    return position_index.positions.iloc[interval_index.rows]
+
+
+def member_positions_on(
+    position_index: PositionIndex, member_name: str, date
+) -> pd.DataFrame:
+    """
+    Returns the positions held by a member on a date.
+    """
+    interval_index = position_index.by_member.get(member_name)
+    if interval_index is None:
+        return position_index.positions.iloc[:0]
+    return position_index.positions.iloc[_stab(interval_index, date)]
+
+
+def member_history(position_index: PositionIndex, member_name: str) -> pd.DataFrame:
+    """
+    Returns all positions of a member, ordered by start date.
+    """
+    interval_index = position_index.by_member.get(member_name)
+    if interval_index is None:
+        return position_index.positions.iloc[:0]
+    return position_index.positions.iloc[interval_index.rows]
+
+
+def member_term(
+    position_index: PositionIndex, member_name: str, position: str
+) -> Tuple[datetime.date, datetime.date]:
+    """
+    Returns the earliest start and latest end date of a member in a position.
+    """
+    history = member_history(position_index, member_name)
+    history = history[history["member_position"] == position]
+    return (
+        history["effective_from_date"].min(),
+        history["effective_to_date"].max(),
+    )
+
+
+@st.cache_data(ttl=6000)
+def get_position_index() -> PositionIndex:
+    return build_position_index(get_member_positions())
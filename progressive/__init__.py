@@ -0,0 +1,106 @@
+import copy
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+class Section(NamedTuple):
+    """
+    A block of the page filled in once the data it needs has loaded.
+
+    - slot (DeltaGenerator): Placeholder the block is drawn into, from `placeholder`.
+    - needs (Tuple[str, ...]): Names of the loaders whose results are passed to render.
+    - render (Callable[..., None]): Draws the block, given the results in the order of needs.
+    """
+
+    slot: DeltaGenerator
+    needs: Tuple[str, ...]
+    render: Callable[..., None]
+
+
+def placeholder(label: str) -> DeltaGenerator:
+    """
+    Reserves a place on the page for a section, showing that it is loading.
+    """
+    slot = st.empty()
+    slot.caption(f"Loading {label}...")
+    return slot
+
+
+def load_concurrently(
+    loaders: Dict[str, Callable[[], Any]], max_workers: Optional[int] = None
+) -> Dict[str, Future]:
+    """
+    Starts every loader at once on a thread pool, and returns without waiting
+    for them, so the page can draw its layout while the data loads.
+
+    Each loader runs inside a placeholder of its own at the current position
+    on the page, so the spinners of cached functions show there (and are
+    cleared when they finish) instead of on the page's running cursor, which
+    the script thread is still drawing on.
+
+    Parameters:
+    - loaders (Dict[str, Callable[[], Any]]): Functions loading the page's data, by name.
+    - max_workers (int): Size of the thread pool, one thread per loader by default.
+
+    Returns:
+    - Dict[str, Future]: The pending result of each loader, by name.
+    """
+    ctx = get_script_run_ctx()
+    # each thread gets its own copy of the script run context: the context
+    # flags when a cached function is running, which must not leak into
+    # widgets the script thread creates meanwhile
+    executor = ThreadPoolExecutor(
+        max_workers or len(loaders),
+        initializer=lambda: add_script_run_ctx(
+            threading.current_thread(), copy.copy(ctx)
+        ),
+    )
+
+    def run(loader, slot):
+        with slot:
+            return loader()
+
+    futures = {
+        name: executor.submit(run, loader, st.empty()) for name, loader in loaders.items()
+    }
+    # the threads finish their loaders and exit on their own
+    executor.shutdown(wait=False)
+    return futures
+
+
+def render_when_ready(futures: Dict[str, Future], sections: List[Section]):
+    """
+    Fills each section as soon as all the loaders it needs have finished, in
+    the order they finish, so the first sections show without waiting for the
+    slowest loader. A section whose loader failed shows the error instead.
+    Only the loaders the sections need are waited on; the script run ends as
+    soon as the last section is filled.
+
+    Parameters:
+    - futures (Dict[str, Future]): Output of `load_concurrently`.
+    - sections (List[Section]): Sections of the page, each with a placeholder.
+    """
+    pending = list(sections)
+    needed = {name: futures[name] for section in sections for name in section.needs}
+    finished = set()
+
+    def render_ready():
+        for section in [s for s in pending if finished.issuperset(s.needs)]:
+            pending.remove(section)
+            failed = [futures[name].exception() for name in section.needs]
+            failed = [exception for exception in failed if exception is not None]
+            if failed:
+                section.slot.exception(failed[0])
+                continue
+            with section.slot.container():
+                section.render(*(futures[name].result() for name in section.needs))
+
+    render_ready()
+    for future in as_completed(set(needed.values())):
+        finished.update(name for name, f in needed.items() if f is future)
+        render_ready()
@@ -0,0 +1,140 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import sparse
+
+from agg_data import primary_question_topics
+
+
+class QuestionMatrix(NamedTuple):
+    """
+    Primary question counts as a sparse member x ministry matrix.
+
+    - member_names (np.ndarray): Member name of each row.
+    - ministries (np.ndarray): Ministry addressed of each column.
+    - counts (sparse.csr_matrix): Number of primary questions per member and ministry.
+    - member_totals (np.ndarray): Number of primary questions of each member.
+    - ministry_totals (np.ndarray): Number of primary questions to each ministry.
+    """
+
+    member_names: np.ndarray
+    ministries: np.ndarray
+    counts: sparse.csr_matrix
+    member_totals: np.ndarray
+    ministry_totals: np.ndarray
+
+
+def build_question_matrix(questions_by_member: pd.DataFrame) -> QuestionMatrix:
+    """
+    Builds the member x ministry matrix from rows of
+    (member_name, ministry_addressed, count_pri_questions).
+    """
+    questions_by_member = questions_by_member.dropna(
+        subset=["member_name", "ministry_addressed"]
+    )
+    member_codes, member_names = pd.factorize(
+        questions_by_member["member_name"], sort=True
+    )
+    ministry_codes, ministries = pd.factorize(
+        questions_by_member["ministry_addressed"], sort=True
+    )
+    # duplicate (member, ministry) rows are summed
+    counts = sparse.csr_matrix(
+        (
+            questions_by_member["count_pri_questions"].to_numpy(dtype=np.int64),
+            (member_codes, ministry_codes),
+        ),
+        shape=(len(member_names), len(ministries)),
+    )
+    return QuestionMatrix(
+        np.asarray(member_names),
+        np.asarray(ministries),
+        counts,
+        np.asarray(counts.sum(axis=1)).ravel(),
+        np.asarray(counts.sum(axis=0)).ravel(),
+    )
+
+
+@st.cache_data(ttl=6000)
+def get_question_matrix() -> QuestionMatrix:
+    return build_question_matrix(primary_question_topics())
+
+
+def ministry_totals(question_matrix: QuestionMatrix) -> pd.DataFrame:
+    """
+    Returns the number and proportion of all primary questions addressed to each ministry.
+    """
+    totals = question_matrix.ministry_totals
+    return pd.DataFrame(
+        {
+            "ministry_addressed": question_matrix.ministries,
+            "count_pri_questions": totals,
+            "proportion_of_questions": totals / max(totals.sum(), 1),
+        }
+    )
+
+
+def member_question_profile(
+    question_matrix: QuestionMatrix, member_name: str
+) -> pd.DataFrame:
+    """
+    Returns a member's actual and expected primary questions per ministry.
+
+    Returns:
+    - pd.DataFrame: One row per ministry, with 'count_pri_questions',
+      'expected_pri_questions' and 'share_of_ministry' (the member's share of
+      all questions to the ministry). Empty if the member asked no questions.
+    """
+    rows = np.flatnonzero(question_matrix.member_names == member_name)
+    if len(rows) == 0:
+        return pd.DataFrame(
+            columns=[
+                "ministry_addressed",
+                "count_pri_questions",
+                "expected_pri_questions",
+                "share_of_ministry",
+            ]
+        )
+
+    member_counts = question_matrix.counts[rows[0]].toarray().ravel()
+    totals = question_matrix.ministry_totals
+    return pd.DataFrame(
+        {
+            "ministry_addressed": question_matrix.ministries,
+            "count_pri_questions": member_counts,
+            "expected_pri_questions": question_matrix.member_totals[rows[0]]
+            * totals
+            / max(totals.sum(), 1),
+            "share_of_ministry": member_counts / np.maximum(totals, 1),
+        }
+    )
+
+
+def ministry_leaderboard(
+    question_matrix: QuestionMatrix, ministry: str, n: int = 10
+) -> pd.DataFrame:
+    """
+    Returns the members who addressed the most primary questions to a ministry,
+    with how many more (or fewer) than expected from their total questions.
+    """
+    columns = np.flatnonzero(question_matrix.ministries == ministry)
+    if len(columns) == 0:
+        return pd.DataFrame(
+            columns=["member_name", "count_pri_questions", "expected_pri_questions"]
+        )
+
+    column = columns[0]
+    counts = question_matrix.counts[:, column].toarray().ravel()
+    totals = question_matrix.ministry_totals
+    expected = question_matrix.member_totals * totals[column] / max(totals.sum(), 1)
+    leaderboard = pd.DataFrame(
+        {
+            "member_name": question_matrix.member_names,
+            "count_pri_questions": counts,
+            "expected_pri_questions": expected,
+        }
+    )
+    leaderboard = leaderboard[leaderboard["count_pri_questions"] > 0]
+    return leaderboard.nlargest(n, "count_pri_questions").reset_index(drop=True)
@@ -0,0 +1,296 @@
+import hashlib
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from agg_data import get_all_member_speeches, get_member_list, get_member_positions
+from members import (
+    aggregate_member_metrics,
+    categorise_active_members_with_appointments,
+    member_scorecards,
+)
+from questions import QuestionMatrix, get_question_matrix, member_question_profile
+from utils import EARLIEST_SITTING, calculate_readability_vectorised
+
+REPORTS_DIR = os.path.join("data", "reports")
+
+# metric, label and format, as on the By Members and By Constituencies pages
+REPORT_METRICS = [
+    ("attendance", "Attendance (%)", "{:.1f}%"),
+    ("participation_rate", "Participation (%)", "{:.1f}%"),
+    ("topics_per_sitting", "Topics/Sitting", "{:,.2f}"),
+    ("questions_per_sitting", "Qns/Sitting", "{:,.2f}"),
+    ("words_per_sitting", "Words/Sitting", "{:,.0f}"),
+    ("readability", "Readability", "{:.1f}"),
+]
+
+REPORT_STYLE = """
+body { font-family: sans-serif; max-width: 960px; margin: 2em auto; color: #31333f; }
+table { border-collapse: collapse; margin: 0.5em 0 1.5em; }
+th, td { padding: 4px 10px; border-bottom: 1px solid #e6e6e9; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.note { color: #808495; font-size: 0.9em; }
+"""
+
+
+class ReportData(NamedTuple):
+    """
+    Everything the reports are rendered from, loaded once and shared by the workers.
+    """
+
+    members: pd.DataFrame
+    positions: pd.DataFrame
+    scorecards: pd.DataFrame
+    metrics_by_parliament: pd.DataFrame
+    question_matrix: QuestionMatrix
+
+
+def load_report_data() -> ReportData:
+    all_members_speech_summary = get_all_member_speeches()
+    aggregated_by_member = aggregate_member_metrics(
+        all_members_speech_summary,
+        calculate_readability_vectorised,
+        group_by_fields=["member_name"],
+    )
+    metrics_by_parliament = aggregate_member_metrics(
+        all_members_speech_summary,
+        calculate_readability_vectorised,
+        group_by_fields=["member_name", "parliament"],
+    )
+    return ReportData(
+        members=get_member_list(),
+        positions=get_member_positions(),
+        scorecards=member_scorecards(aggregated_by_member).set_index("member_name"),
+        metrics_by_parliament=metrics_by_parliament,
+        question_matrix=get_question_matrix(),
+    )
+
+
+def report_filename(kind: str, name: str) -> str:
+    """
+    A readable file name for a report, with a short hash of the exact name so
+    that names which slugify alike (e.g. differing only in case or
+    punctuation) do not overwrite each other's reports.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    digest = hashlib.sha256(name.encode()).hexdigest()[:8]
+    return f"{kind}-{slug}-{digest}.html"
+
+
+def format_metrics(metrics: pd.DataFrame, index_label: str) -> str:
+    table = pd.DataFrame(index=metrics.index)
+    for metric, label, value_format in REPORT_METRICS:
+        table[label] = metrics[metric].map(
+            lambda value: "" if pd.isna(value) else value_format.format(value)
+        )
+    table.index.name = index_label
+    return table.reset_index().to_html(index=False, border=0)
+
+
+def format_scorecard(data: ReportData, member_names: List[str]) -> str:
+    """
+    Returns a table of members' overall metrics and their percentiles among all members.
+    """
+    scorecards = data.scorecards.reindex(member_names)
+    table = pd.DataFrame(index=scorecards.index)
+    for metric, label, value_format in REPORT_METRICS:
+        table[label] = [
+            ""
+            if pd.isna(value)
+            else f"{value_format.format(value)} (p{percentile:.0f})"
+            for value, percentile in zip(
+                scorecards[metric], scorecards[f"{metric}_percentile"]
+            )
+        ]
+    table.index.name = "Member Name"
+    return table.reset_index().to_html(index=False, border=0)
+
+
+def render_page(title: str, body: str) -> str:
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{html.escape(title)}</title><style>{REPORT_STYLE}</style></head>
+<body>
+<h1>{html.escape(title)}</h1>
+{body}
+<p class="note">Figures reflect sittings on {EARLIEST_SITTING} and after. Percentiles (p) are among all members.</p>
+</body>
+</html>
+"""
+
+
+def render_member_report(data: ReportData, member_name: str) -> str:
+    member = data.members[data.members["member_name"] == member_name].iloc[0]
+    details = [
+        f"Last Political Affiliation: {member['party']}",
+        f"Latest Constituency: {member['constituency']}"
+        + ("" if member["is_active"] else " (Inactive)"),
+        f"Sittings: {member['earliest_sitting']} to {member['latest_sitting']}",
+    ]
+    body = (
+        "<ul>" + "".join(f"<li>{html.escape(str(d))}</li>" for d in details) + "</ul>"
+    )
+
+    body += "<h2>Overall</h2>" + format_scorecard(data, [member_name])
+
+    by_parliament = data.metrics_by_parliament[
+        data.metrics_by_parliament["member_name"] == member_name
+    ].set_index("parliament")
+    if not by_parliament.empty:
+        body += "<h2>By Parliament</h2>" + format_metrics(by_parliament, "Parliament")
+
+    questions = member_question_profile(data.question_matrix, member_name)
+    questions = questions[questions["count_pri_questions"] > 0]
+    if not questions.empty:
+        questions = questions.sort_values("count_pri_questions", ascending=False)
+        body += "<h2>Parliamentary Questions</h2>" + questions.rename(
+            columns={
+                "ministry_addressed": "Ministry Addressed",
+                "count_pri_questions": "Questions",
+                "expected_pri_questions": "Relative Proportion",
+                "share_of_ministry": "Share of Ministry's Questions",
+            }
+        ).to_html(index=False, border=0, float_format="{:,.2f}".format)
+
+    positions = data.positions[data.positions["member_name"] == member_name]
+    if not positions.empty:
+        positions = positions[
+            ["member_position", "type", "effective_from_date", "effective_to_date"]
+        ].rename(
+            columns={
+                "member_position": "Position",
+                "type": "Type",
+                "effective_from_date": "From",
+                "effective_to_date": "To",
+            }
+        )
+        body += "<h2>Positions</h2>" + positions.to_html(
+            index=False, border=0, na_rep=""
+        )
+
+    return render_page(member_name, body)
+
+
+def render_constituency_report(data: ReportData, constituency: str) -> str:
+    members = data.members[data.members["constituency"] == constituency]
+    active_members = sorted(members[members["is_active"] == True]["member_name"])
+    former_members = sorted(members[members["is_active"] == False]["member_name"])
+
+    current_member_appointments = data.positions[
+        (data.positions["type"] == "appointment")
+        & (data.positions["is_latest_position"])
+    ]
+    (
+        active_members_with_appointments,
+        active_member_appointments,
+        active_members_without_appointments,
+    ) = categorise_active_members_with_appointments(
+        active_members, current_member_appointments
+    )
+
+    body = ""
+    if active_members_with_appointments:
+        body += "<h2>Appointment Holders</h2><ul>" + "".join(
+            f"<li>{html.escape(member)} ({html.escape(appointment)})</li>"
+            for member, appointment in zip(
+                active_members_with_appointments, active_member_appointments
+            )
+        )
+        body += "</ul>" + format_scorecard(data, active_members_with_appointments)
+    if active_members_without_appointments:
+        body += "<h2>Backbenchers</h2>" + format_scorecard(
+            data, active_members_without_appointments
+        )
+    if former_members:
+        body += "<h2>Former Members</h2>" + format_scorecard(data, former_members)
+
+    return render_page(constituency, body)
+
+
+RENDERERS = {
+    "member": render_member_report,
+    "constituency": render_constituency_report,
+}
+
+# set in each worker process by _init_worker, so the data is sent to each
+# worker once rather than with every report
+_report_data: Optional[ReportData] = None
+
+
+def _init_worker(data: ReportData):
+    global _report_data
+    _report_data = data
+
+
+def _write_report(task: Tuple[str, str, str]) -> str:
+    kind, name, output_dir = task
+    path = os.path.join(output_dir, report_filename(kind, name))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(RENDERERS[kind](_report_data, name))
+    return path
+
+
+def generate_reports(
+    output_dir: str = REPORTS_DIR,
+    max_workers: Optional[int] = None,
+    data: Optional[ReportData] = None,
+) -> Tuple[List[str], float]:
+    """
+    Renders a static HTML report for every member and constituency, from a
+    single load of the data shared by a pool of worker processes, along with
+    an index page linking them.
+
+    Parameters:
+    - output_dir (str): Directory the reports are written to.
+    - max_workers (int): Number of worker processes, one per CPU by default.
+    - data (ReportData): Data to render from, loaded with `load_report_data` by default.
+
+    Returns:
+    - Tuple[List[str], float]: Paths of the reports written, and the seconds
+      spent rendering them.
+    """
+    data = data or load_report_data()
+    os.makedirs(output_dir, exist_ok=True)
+
+    member_names = sorted(data.members["member_name"].unique())
+    constituencies = sorted(data.members["constituency"].dropna().unique())
+    tasks = [("member", name, output_dir) for name in member_names] + [
+        ("constituency", name, output_dir) for name in constituencies
+    ]
+
+    workers = max_workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(data,)
+    ) as executor:
+        paths = list(
+            executor.map(
+                _write_report, tasks, chunksize=max(1, len(tasks) // (workers * 4))
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    links = {
+        "Members": [(name, report_filename("member", name)) for name in member_names],
+        "Constituencies": [
+            (name, report_filename("constituency", name)) for name in constituencies
+        ],
+    }
+    index = "".join(
+        f"<h2>{heading}</h2><ul>"
+        + "".join(
+            f'<li><a href="{filename}">{html.escape(name)}</a></li>'
+            for name, filename in entries
+        )
+        + "</ul>"
+        for heading, entries in links.items()
+    )
+    with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(render_page("Singapore Parliament Speeches Reports", index))
+
+    return paths, elapsed
@@ -0,0 +1,16 @@
+import argparse
+
+from reports import REPORTS_DIR, generate_reports
+
+parser = argparse.ArgumentParser(
+    description="Render static HTML reports for every member and constituency."
+)
+parser.add_argument("--output-dir", default=REPORTS_DIR)
+parser.add_argument("--workers", type=int, default=None)
+args = parser.parse_args()
+
+paths, elapsed = generate_reports(args.output_dir, max_workers=args.workers)
+print(
+    f"Rendered {len(paths)} reports into {args.output_dir} in {elapsed:.1f}s"
+    f" ({len(paths) / elapsed:.1f} reports/sec)."
+)
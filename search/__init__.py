@@ -0,0 +1,240 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import streamlit as st
+
+from agg_data import get_data_version, get_member_list
+from bills import get_bill_titles
+from topics import get_topic_rollup
+
+# entry kinds in the order they are ranked, and the page each one opens
+SEARCH_KINDS = {
+    "member": ("Member", "pages/6_By_Members.py"),
+    "constituency": ("Constituency", "pages/7_By_Constituencies.py"),
+    "bill": ("Bill", "pages/1_Bills.py"),
+    "topic": ("Topic", "pages/4_Topics.py"),
+}
+# kinds matched by spelling as well as by prefix; bill and topic titles are
+# too many and too long for trigrams to tell apart
+FUZZY_KINDS = ("member", "constituency")
+MIN_FUZZY_SIMILARITY = 0.4
+# token prefixes are indexed up to this length; longer query tokens are
+# looked up by their first MAX_PREFIX_LENGTH characters and then verified
+MAX_PREFIX_LENGTH = 8
+
+HONORIFICS = set(
+    "mr mrs ms mdm madam miss dr prof professor assoc associate asst assistant"
+    " er sir encik puan haji hajah hajjah dato datuk sc pbm bbm".split()
+)
+
+
+class SearchIndex(NamedTuple):
+    """
+    Prefix and trigram index over search entries, with entry ids in rank
+    order so that postings lists are already sorted by rank.
+
+    - kinds (List[str]): The kind of each entry, a key of SEARCH_KINDS.
+    - labels (List[str]): The display label of each entry.
+    - tokens (List[Tuple[str, ...]]): The normalised tokens of each entry.
+    - prefixes (Dict[str, List[int]]): Entry ids for each token prefix.
+    - trigrams (Dict[str, List[int]]): Entry ids for each trigram, for FUZZY_KINDS only.
+    - trigram_counts (Dict[int, int]): Number of distinct trigrams of each fuzzy entry.
+    """
+
+    kinds: List[str]
+    labels: List[str]
+    tokens: List[Tuple[str, ...]]
+    prefixes: Dict[str, List[int]]
+    trigrams: Dict[str, List[int]]
+    trigram_counts: Dict[int, int]
+
+
+def normalise(text: str) -> Tuple[str, ...]:
+    """
+    Splits text into lowercase ASCII tokens without punctuation or honorifics,
+    so that e.g. "Dr. Tan See Leng" and "tan see-leng" share the same tokens.
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    text = re.sub(r"['’]", "", text.lower())
+    tokens = re.split(r"[^a-z0-9]+", text)
+    return tuple(token for token in tokens if token and token not in HONORIFICS)
+
+
+def _trigrams(tokens: Tuple[str, ...]) -> set:
+    padded = f" {' '.join(tokens)} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def build_search_index(entries: List[Tuple[str, str]]) -> SearchIndex:
+    """
+    Builds the search index.
+
+    Parameters:
+    - entries (List[Tuple[str, str]]): Kind and label of each entry; duplicates are dropped.
+
+    Returns:
+    - SearchIndex: The index.
+    """
+    kind_rank = {kind: rank for rank, kind in enumerate(SEARCH_KINDS)}
+    # within a kind, shorter labels rank first, as they are more likely the full match
+    entries = sorted(
+        set(entries), key=lambda entry: (kind_rank[entry[0]], len(entry[1]), entry[1])
+    )
+
+    kinds, labels, tokens = [], [], []
+    prefixes = defaultdict(list)
+    trigrams = defaultdict(list)
+    trigram_counts = {}
+    for entry_id, (kind, label) in enumerate(entries):
+        entry_tokens = normalise(label)
+        kinds.append(kind)
+        labels.append(label)
+        tokens.append(entry_tokens)
+
+        entry_prefixes = {
+            token[:length]
+            for token in entry_tokens
+            for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1)
+        }
+        for prefix in entry_prefixes:
+            prefixes[prefix].append(entry_id)
+
+        if kind in FUZZY_KINDS and entry_tokens:
+            entry_trigrams = _trigrams(entry_tokens)
+            trigram_counts[entry_id] = len(entry_trigrams)
+            for trigram in entry_trigrams:
+                trigrams[trigram].append(entry_id)
+
+    return SearchIndex(
+        kinds, labels, tokens, dict(prefixes), dict(trigrams), trigram_counts
+    )
+
+
+def search(index: SearchIndex, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+    """
+    Finds the entries where every query token is the prefix of some token of
+    the entry, in rank order. If there are fewer than `limit`, members and
+    constituencies with similar spelling follow, most similar first.
+
+    Parameters:
+    - index (SearchIndex): Output of `get_search_index`.
+    - query (str): The text typed so far.
+    - limit (int): Maximum number of results.
+
+    Returns:
+    - List[Tuple[str, str]]: Kind and label of each result.
+    """
+    query_tokens = normalise(query)
+    if not query_tokens:
+        return []
+
+    # walk the shortest postings list in rank order, checking the other tokens
+    # against each candidate's own tokens, and stop as soon as there are enough
+    postings = [
+        index.prefixes.get(token[:MAX_PREFIX_LENGTH], []) for token in query_tokens
+    ]
+    shortest = min(range(len(postings)), key=lambda i: len(postings[i]))
+    others = [
+        token
+        for i, token in enumerate(query_tokens)
+        if i != shortest or len(token) > MAX_PREFIX_LENGTH
+    ]
+    matches = []
+    for entry_id in postings[shortest]:
+        entry_tokens = index.tokens[entry_id]
+        if all(
+            any(entry_token.startswith(token) for entry_token in entry_tokens)
+            for token in others
+        ):
+            matches.append(entry_id)
+            if len(matches) == limit:
+                break
+
+    if len(matches) < limit:
+        query_trigrams = _trigrams(query_tokens)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for entry_id in index.trigrams.get(trigram, []):
+                shared[entry_id] += 1
+        similarity = {
+            entry_id: 2 * count / (len(query_trigrams) + index.trigram_counts[entry_id])
+            for entry_id, count in shared.items()
+        }
+        found = set(matches)
+        matches += sorted(
+            (
+                entry_id
+                for entry_id, score in similarity.items()
+                if score >= MIN_FUZZY_SIMILARITY and entry_id not in found
+            ),
+            key=lambda entry_id: (-similarity[entry_id], entry_id),
+        )[: limit - len(matches)]
+
+    return [(index.kinds[entry_id], index.labels[entry_id]) for entry_id in matches]
+
+
+def search_entries() -> List[Tuple[str, str]]:
+    members_df = get_member_list()
+    entries = [("member", name) for name in members_df["member_name"].dropna().unique()]
+    entries += [
+        ("constituency", constituency)
+        for constituency in members_df["constituency"].dropna().unique()
+        if constituency
+    ]
+    entries += [
+        ("bill", title) for title in get_bill_titles(get_data_version())["title"]
+    ]
+    entries += [
+        ("topic", title)
+        for title in get_topic_rollup()["topic_title"].dropna().unique()
+    ]
+    return entries
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_search_index(data_version: str) -> SearchIndex:
+    """
+    Builds the search index once per data version, shared by all sessions.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`; only used as part of the cache key.
+    """
+    return build_search_index(search_entries())
+
+
+def search_selection(kind: str) -> Optional[str]:
+    """
+    Returns the label of the last search result of this kind the user opened,
+    for pages to preselect it.
+    """
+    return st.session_state.get("search_selections", {}).get(kind)
+
+
+def search_box(limit: int = 8) -> None:
+    """
+    Draws a search box in the sidebar. Clicking a result opens its page with
+    the result selected (see `search_selection`).
+    """
+    with st.sidebar:
+        query = st.text_input(
+            label="Search",
+            placeholder="Member, constituency, bill or topic",
+            key="global_search",
+        )
+        if not query.strip():
+            return
+
+        results = search(get_search_index(get_data_version()), query, limit)
+        if not results:
+            st.caption("No matches.")
+        for i, (kind, label) in enumerate(results):
+            kind_label, page = SEARCH_KINDS[kind]
+            if st.button(
+                f"{label} · {kind_label}",
+                key=f"global_search_result_{i}",
+                use_container_width=True,
+            ):
+                st.session_state.setdefault("search_selections", {})[kind] = label
+                st.switch_page(page)
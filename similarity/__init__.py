@@ -0,0 +1,139 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agg_data import get_all_member_speeches
+from members import aggregate_member_metrics
+from questions import QuestionMatrix, get_question_matrix
+from utils import calculate_readability_vectorised
+
+SIMILARITY_METRICS = [
+    "participation_rate",
+    "topics_per_sitting",
+    "questions_per_sitting",
+    "words_per_sitting",
+    "readability",
+]
+SIMILAR_MEMBERS_COUNT = 10
+
+
+def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def member_vectors(
+    question_matrix: QuestionMatrix,
+    aggregated_by_member: pd.DataFrame,
+    speech_weight: float = 0.5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embeds each member as a unit vector made of their share of primary questions
+    to each ministry and their standardised speech metrics.
+
+    Parameters:
+    - question_matrix (QuestionMatrix): Output of `get_question_matrix`.
+    - aggregated_by_member (pd.DataFrame): Output of `aggregate_member_metrics` grouped by ["member_name"].
+    - speech_weight (float): Weight of the speech metrics against the question
+      shares, between 0 (questions only) and 1 (speech metrics only).
+
+    Returns:
+    - Tuple[np.ndarray, np.ndarray]: Member names, and a matrix with one unit vector per member.
+    """
+    member_names = np.asarray(sorted(aggregated_by_member["member_name"].unique()))
+
+    # ministry shares, for members in the same order as member_names
+    question_rows = pd.Series(
+        np.arange(len(question_matrix.member_names)),
+        index=question_matrix.member_names,
+    ).reindex(member_names)
+    has_questions = question_rows.notna().to_numpy()
+    question_shares = np.zeros(
+        (len(member_names), len(question_matrix.ministries)), dtype=float
+    )
+    question_shares[has_questions] = question_matrix.counts[
+        question_rows[has_questions].astype(int).to_numpy()
+    ].toarray()
+    question_shares = _normalise_rows(question_shares)
+
+    metrics = (
+        aggregated_by_member.groupby("member_name")[SIMILARITY_METRICS]
+        .mean()
+        .reindex(member_names)
+    )
+    standardised = ((metrics - metrics.mean()) / metrics.std()).fillna(0)
+    speech_metrics = _normalise_rows(standardised.to_numpy(dtype=float))
+
+    vectors = np.hstack(
+        [
+            np.sqrt(1 - speech_weight) * question_shares,
+            np.sqrt(speech_weight) * speech_metrics,
+        ]
+    )
+    return member_names, _normalise_rows(vectors)
+
+
+def top_k_similar(
+    member_names: np.ndarray, vectors: np.ndarray, k: int = SIMILAR_MEMBERS_COUNT
+) -> pd.DataFrame:
+    """
+    Finds the k most similar members of every member, by cosine similarity,
+    from a single matrix product.
+
+    Returns:
+    - pd.DataFrame: Columns 'member_name', 'similar_member_name', 'similarity'
+      and 'rank' (1 for the most similar), k rows per member. Members without
+      a vector have no rows, and are not similar to anyone.
+    """
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, -np.inf)
+    has_vector = vectors.any(axis=1)
+    similarity[:, ~has_vector] = -np.inf
+    similarity[~has_vector, :] = -np.inf
+
+    k = min(k, len(member_names) - 1)
+    if k <= 0:
+        return pd.DataFrame(
+            columns=["member_name", "similar_member_name", "similarity", "rank"]
+        )
+
+    top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    top_similarity = np.take_along_axis(similarity, top, axis=1)
+    order = np.argsort(-top_similarity, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_similarity = np.take_along_axis(top_similarity, order, axis=1)
+
+    similar = pd.DataFrame(
+        {
+            "member_name": np.repeat(member_names, k),
+            "similar_member_name": member_names[top.ravel()],
+            "similarity": top_similarity.ravel(),
+            "rank": np.tile(np.arange(1, k + 1), len(member_names)),
+        }
+    )
+    return similar[np.isfinite(similar["similarity"])].reset_index(drop=True)
+
+
+@st.cache_data(max_entries=10)
+def get_similar_members(
+    data_version: str,
+    speech_weight: float = 0.5,
+    k: int = SIMILAR_MEMBERS_COUNT,
+) -> pd.DataFrame:
+    """
+    Top-k similar members for every member, cached until the data version changes.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`; only used as part of the cache key.
+    - speech_weight (float): See `member_vectors`.
+    - k (int): Number of similar members per member.
+    """
+    aggregated_by_member = aggregate_member_metrics(
+        get_all_member_speeches(), calculate_readability_vectorised, group_by_fields=["member_name"]
+    )
+    member_names, vectors = member_vectors(
+        get_question_matrix(), aggregated_by_member, speech_weight
+    )
+    return top_k_similar(member_names, vectors, k)
@@ -0,0 +1,301 @@
+import os
+import tempfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import (
+    STREAM_BATCH_SIZE,
+    calculate_readability_vectorised,
+    project_id,
+    stream_query,
+)
+
+SPEECH_SKETCHES_PATH = os.path.join("data", "speech_sketches.npz")
+SKETCH_KEYS = ["member_name", "member_party", "year"]
+SKETCH_QUANTILES = [0.25, 0.5, 0.75]
+
+# bin edges shared by all sketches, so that sketches merge by adding counts;
+# speech lengths use log-spaced bins, for a bounded relative error
+SKETCH_EDGES = {
+    "count_words": np.unique(np.round(np.geomspace(1, 50000, 400))),
+    "readability": np.linspace(-100, 150, 501),
+}
+
+
+class SpeechSketches(NamedTuple):
+    """
+    Histogram sketches of per-speech metrics, one per member, party and year.
+
+    - keys (pd.DataFrame): The member, party and year of each sketch.
+    - counts (Dict[str, np.ndarray]): For each metric, an array of shape
+      (sketches, len(edges) + 1) counting speeches between consecutive
+      SKETCH_EDGES, with under- and overflow bins at either end.
+    """
+
+    keys: pd.DataFrame
+    counts: Dict[str, np.ndarray]
+
+
+def speech_metrics_query() -> str:
+    return f"""
+    select
+        member_name,
+        member_party,
+        extract(year from date) as year,
+        count_words,
+        count_sentences,
+        count_syllables
+    from `{project_id}.prod_mart.mart_speeches`
+    where member_name != '' and member_name is not null
+    """
+
+
+def build_speech_sketches(batches: Iterable[pd.DataFrame]) -> SpeechSketches:
+    """
+    Builds sketches in one streaming pass over batches of speeches, holding
+    only one batch and the bin counts in memory.
+
+    Parameters:
+    - batches (Iterable[pd.DataFrame]): Batches with the columns of `speech_metrics_query`.
+
+    Returns:
+    - SpeechSketches: The sketches.
+    """
+    group_ids: Dict[tuple, int] = {}
+    counts = {
+        metric: np.zeros((0, len(edges) + 1), dtype=np.uint32)
+        for metric, edges in SKETCH_EDGES.items()
+    }
+
+    for batch in batches:
+        batch = batch.dropna(subset=["member_name", "year"]).copy()
+        batch["member_party"] = batch["member_party"].fillna("")
+        batch["readability"] = calculate_readability_vectorised(batch)
+
+        batch_keys = list(zip(*(batch[key] for key in SKETCH_KEYS)))
+        for key in batch_keys:
+            group_ids.setdefault(key, len(group_ids))
+        rows = np.fromiter((group_ids[key] for key in batch_keys), dtype=np.int64)
+
+        for metric, edges in SKETCH_EDGES.items():
+            if len(group_ids) > len(counts[metric]):
+                counts[metric] = np.vstack(
+                    [
+                        counts[metric],
+                        np.zeros(
+                            (len(group_ids) - len(counts[metric]), len(edges) + 1),
+                            dtype=np.uint32,
+                        ),
+                    ]
+                )
+            values = batch[metric].to_numpy(dtype=float)
+            has_value = ~np.isnan(values)
+            bins = np.searchsorted(edges, values[has_value], side="right")
+            np.add.at(counts[metric], (rows[has_value], bins), 1)
+
+    keys = pd.DataFrame(list(group_ids), columns=SKETCH_KEYS)
+    return SpeechSketches(keys, counts)
+
+
+def sketch_quantiles(
+    counts: np.ndarray, edges: np.ndarray, quantiles: List[float]
+) -> np.ndarray:
+    """
+    Estimates quantiles from merged sketch counts, interpolating within bins.
+
+    Parameters:
+    - counts (np.ndarray): Array of shape (groups, len(edges) + 1), or a single row.
+    - edges (np.ndarray): The metric's bin edges.
+    - quantiles (List[float]): Quantiles to estimate, between 0 and 1.
+
+    Returns:
+    - np.ndarray: Array of shape (groups, len(quantiles)), NaN for empty groups.
+    """
+    counts = np.atleast_2d(counts).astype(float)
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1]
+    # lower and upper edge of every bin, with under- and overflow clamped to the ends
+    lower = np.concatenate([[edges[0]], edges])
+    upper = np.concatenate([edges, [edges[-1]]])
+
+    estimates = np.full((len(counts), len(quantiles)), np.nan)
+    for i, quantile in enumerate(quantiles):
+        target = quantile * totals
+        # first bin whose cumulative count reaches the target rank
+        bins = np.minimum(
+            (cumulative < target[:, None]).sum(axis=1), counts.shape[1] - 1
+        )
+        before = (
+            np.take_along_axis(cumulative, bins[:, None], axis=1).ravel()
+            - counts[np.arange(len(counts)), bins]
+        )
+        in_bin = counts[np.arange(len(counts)), bins]
+        fraction = np.divide(
+            target - before, in_bin, out=np.zeros_like(target), where=in_bin > 0
+        )
+        estimates[:, i] = np.where(
+            totals > 0, lower[bins] + fraction * (upper[bins] - lower[bins]), np.nan
+        )
+    return estimates
+
+
+def quantiles_by(
+    sketches: SpeechSketches,
+    metric: str,
+    group_by_fields: List[str],
+    quantiles: Optional[List[float]] = None,
+    mask: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """
+    Merges sketches by any combination of member, party and year, and estimates
+    quantiles of a per-speech metric for each group.
+
+    Parameters:
+    - sketches (SpeechSketches): The sketches from `get_speech_sketches`.
+    - metric (str): 'count_words' or 'readability'.
+    - group_by_fields (List[str]): Fields of SKETCH_KEYS to group by; empty for one overall group.
+    - quantiles (List[float]): Quantiles to estimate; defaults to SKETCH_QUANTILES.
+    - mask (pd.Series): Boolean mask over `sketches.keys`, selecting the sketches to merge.
+
+    Returns:
+    - pd.DataFrame: The group fields, 'count_speeches' and a 'p<NN>' column per quantile.
+    """
+    quantiles = SKETCH_QUANTILES if quantiles is None else quantiles
+    keys = sketches.keys if mask is None else sketches.keys[mask]
+    counts = sketches.counts[metric][keys.index.to_numpy()]
+
+    if group_by_fields:
+        group_codes, groups = pd.MultiIndex.from_frame(
+            keys[group_by_fields]
+        ).factorize()
+        groups = groups.to_frame(index=False, name=group_by_fields)
+    else:
+        group_codes, groups = np.zeros(len(keys), dtype=np.int64), pd.DataFrame(
+            index=[0]
+        )
+
+    merged = np.zeros((len(groups), counts.shape[1]), dtype=np.int64)
+    np.add.at(merged, group_codes, counts)
+
+    estimates = sketch_quantiles(merged, SKETCH_EDGES[metric], quantiles)
+    groups["count_speeches"] = merged.sum(axis=1)
+    for i, quantile in enumerate(quantiles):
+        groups[f"p{round(quantile * 100):02d}"] = estimates[:, i]
+    return groups
+
+
+def save_speech_sketches(
+    sketches: SpeechSketches, data_version: str, path: str
+) -> None:
+    """
+    Saves sketches with plain string and integer keys, so that loading them
+    does not need pickle. Written to a temporary file and moved into place,
+    so a reader never sees a partial file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            np.savez_compressed(
+                file,
+                data_version=np.array(data_version),
+                key_member_name=sketches.keys["member_name"].to_numpy(dtype=str),
+                key_member_party=sketches.keys["member_party"].to_numpy(dtype=str),
+                key_year=sketches.keys["year"].to_numpy(dtype=np.int64),
+                **{
+                    f"counts_{metric}": counts
+                    for metric, counts in sketches.counts.items()
+                },
+            )
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def stored_data_version(path: str) -> Optional[str]:
+    """
+    Returns the data version saved sketches were built from, or None if there
+    are none.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        return str(stored["data_version"])
+
+
+def load_speech_sketches(
+    path: str, data_version: Optional[str] = None
+) -> Optional[SpeechSketches]:
+    """
+    Loads saved sketches, or returns None if there are none (for the data
+    version, if given). The counts are read-only, as the sketches are shared
+    by sessions.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        if data_version is not None and str(stored["data_version"]) != data_version:
+            return None
+        try:
+            keys = pd.DataFrame({key: stored[f"key_{key}"] for key in SKETCH_KEYS})
+        except ValueError:
+            # saved with pickled keys by an earlier version, so rebuilt
+            return None
+        counts = {metric: stored[f"counts_{metric}"] for metric in SKETCH_EDGES}
+    for metric_counts in counts.values():
+        metric_counts.flags.writeable = False
+    return SpeechSketches(keys, counts)
+
+
+def write_speech_sketches(
+    data_version: str,
+    path: str = SPEECH_SKETCHES_PATH,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> SpeechSketches:
+    """
+    Builds the sketches with a streaming pass over `mart_speeches` and saves
+    them. Run from the command line (`python -m sketches`), as the pass reads
+    every speech.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`, stored with the sketches.
+    - path (str): File to save the sketches to.
+    - batch_size (int): Maximum number of speeches held in memory at once.
+
+    Returns:
+    - SpeechSketches: The sketches.
+    """
+    sketches = build_speech_sketches(
+        batch for batch, _ in stream_query(speech_metrics_query(), batch_size)
+    )
+    save_speech_sketches(sketches, data_version, path)
+    return sketches
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _read_speech_sketches(
+    path: str, modified: Optional[float]
+) -> Optional[Tuple[SpeechSketches, str]]:
+    sketches = load_speech_sketches(path)
+    return None if sketches is None else (sketches, stored_data_version(path))
+
+
+def get_speech_sketches(
+    path: str = SPEECH_SKETCHES_PATH,
+) -> Optional[Tuple[SpeechSketches, str]]:
+    """
+    Loads the sketches built by `python -m sketches`, once per file, shared by
+    all sessions without copying. Sketches of an earlier data version are
+    served until they are rebuilt.
+
+    Returns:
+    - Optional[Tuple[SpeechSketches, str]]: The sketches and the data version
+      they were built from, or None if they have not been built.
+    """
+    modified = os.path.getmtime(path) if os.path.exists(path) else None
+    return _read_speech_sketches(path, modified)
@@ -0,0 +1,35 @@
+import argparse
+
+from agg_data import get_data_version
+from sketches import SPEECH_SKETCHES_PATH, load_speech_sketches, write_speech_sketches
+from utils import STREAM_BATCH_SIZE, QueryBudgetExceeded
+
+parser = argparse.ArgumentParser(
+    description="Build the histogram sketches behind the speech distributions of each member."
+)
+parser.add_argument("--path", default=SPEECH_SKETCHES_PATH)
+parser.add_argument("--batch-size", type=int, default=STREAM_BATCH_SIZE)
+parser.add_argument(
+    "--force", action="store_true", help="rebuild sketches which already exist"
+)
+args = parser.parse_args()
+
+data_version = get_data_version()
+sketches = None if args.force else load_speech_sketches(args.path, data_version)
+if sketches is not None:
+    print(f"Speech sketches for {data_version} already exist in {args.path}.")
+else:
+    try:
+        sketches = write_speech_sketches(
+            data_version, args.path, batch_size=args.batch_size
+        )
+    except QueryBudgetExceeded as error:
+        parser.exit(
+            1,
+            f"{error}\nThe build reads every speech; raise max_bytes_per_query"
+            " in the query_budget secrets to run it.\n",
+        )
+    print(
+        f"Wrote speech sketches for {data_version} into {args.path}:"
+        f" {len(sketches.keys)} members, parties and years."
+    )
@@ -0,0 +1,277 @@
+import os
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from utils import project_id, stream_query
+
+SPEECH_INDEX_PATH = os.path.join("data", "speech_index.sqlite")
+INDEX_BATCH_SIZE = 5000
+RESULTS_PER_PAGE = 20
+
+SPEECH_INDEX_SCHEMA = """
+create table if not exists speeches (
+    speech_rowid integer primary key,
+    speech_id text unique not null,
+    date text not null,
+    parliament integer,
+    member_name text,
+    topic_id text,
+    topic_title text
+);
+create index if not exists speeches_date on speeches (date);
+create index if not exists speeches_member_name on speeches (member_name, date);
+create virtual table if not exists speeches_fts using fts5 (
+    text, topic_title, tokenize = 'porter unicode61'
+);
+create table if not exists index_state (key text primary key, value text);
+"""
+
+
+def speeches_query(since_date: Optional[str] = None) -> str:
+    # the latest date already indexed is fetched again, in case its sitting was restated
+    where_clause = f"where date >= '{since_date}'" if since_date else ""
+    return f"""
+    select
+        speech_id,
+        cast(date as string) as date,
+        parliament,
+        member_name,
+        topic_id,
+        topic_title,
+        text
+    from `{project_id}.prod_mart.mart_speeches`
+    {where_clause}
+    """
+
+
+def connect_speech_index(path: str = SPEECH_INDEX_PATH) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    connection.executescript(SPEECH_INDEX_SCHEMA)
+    return connection
+
+
+def open_speech_index(path: str = SPEECH_INDEX_PATH) -> sqlite3.Connection:
+    """
+    Opens the speech index read-only, for pages; only `python -m speeches`
+    writes to it.
+    """
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def get_index_state(connection: sqlite3.Connection, key: str) -> Optional[str]:
+    row = connection.execute(
+        "select value from index_state where key = ?", (key,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def index_speeches(connection: sqlite3.Connection, speeches: List[dict]) -> None:
+    """
+    Adds a batch of speeches to the index, replacing speeches already indexed
+    under the same speech_id.
+
+    Parameters:
+    - connection (sqlite3.Connection): Connection to the speech index.
+    - speeches (List[dict]): Rows with the columns selected by `speeches_query`.
+    """
+    speech_ids = [speech["speech_id"] for speech in speeches]
+    placeholders = ", ".join("?" * len(speech_ids))
+    connection.execute(
+        f"""
+        delete from speeches_fts where rowid in (
+            select speech_rowid from speeches where speech_id in ({placeholders})
+        )
+        """,
+        speech_ids,
+    )
+    connection.execute(
+        f"delete from speeches where speech_id in ({placeholders})", speech_ids
+    )
+    connection.executemany(
+        """
+        insert into speeches (speech_id, date, parliament, member_name, topic_id, topic_title)
+        values (:speech_id, :date, :parliament, :member_name, :topic_id, :topic_title)
+        """,
+        speeches,
+    )
+    rowids = dict(
+        connection.execute(
+            f"select speech_id, speech_rowid from speeches where speech_id in ({placeholders})",
+            speech_ids,
+        ).fetchall()
+    )
+    connection.executemany(
+        "insert into speeches_fts (rowid, text, topic_title) values (?, ?, ?)",
+        [
+            (
+                rowids[speech["speech_id"]],
+                speech["text"] or "",
+                speech["topic_title"] or "",
+            )
+            for speech in speeches
+        ],
+    )
+
+
+def update_speech_index(
+    path: str = SPEECH_INDEX_PATH, batch_size: int = INDEX_BATCH_SIZE
+) -> int:
+    """
+    Pulls speeches from `mart_speeches` into the local full-text index. Only
+    speeches from the latest indexed date onwards are fetched, so repeated runs
+    only add new sittings.
+
+    Parameters:
+    - path (str): Path of the SQLite index file.
+    - batch_size (int): Number of speeches fetched and inserted at a time.
+
+    Returns:
+    - int: The number of speeches indexed.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    connection = connect_speech_index(path)
+    try:
+        latest_date = get_index_state(connection, "latest_date")
+        count_indexed = 0
+        for batch, _ in stream_query(speeches_query(latest_date), batch_size):
+            if batch.empty:
+                continue
+            index_speeches(connection, batch.to_dict("records"))
+            count_indexed += len(batch)
+            latest_date = max(latest_date or "", batch["date"].max())
+
+        if latest_date:
+            connection.execute(
+                "insert or replace into index_state (key, value) values ('latest_date', ?)",
+                (latest_date,),
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+    return count_indexed
+
+
+def to_match_expression(query: str, topic: Optional[str] = None) -> str:
+    """
+    Turns free text into an FTS5 query matching all of its words, so that user
+    input cannot produce FTS5 syntax errors.
+    """
+    terms = [f'"{term}"' for term in re.findall(r"\w+", query)]
+    if topic:
+        terms += [f'topic_title : "{term}"' for term in re.findall(r"\w+", topic)]
+    return " AND ".join(terms)
+
+
+def search_speeches(
+    query: str,
+    member_names: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    parliaments: Optional[List[int]] = None,
+    topic: Optional[str] = None,
+    after: Optional[Tuple[float, int]] = None,
+    limit: int = RESULTS_PER_PAGE,
+    path: str = SPEECH_INDEX_PATH,
+) -> Tuple[pd.DataFrame, Optional[Tuple[float, int]]]:
+    """
+    Searches the speech index, ranking results by BM25 relevance.
+
+    Pages are fetched with a keyset cursor on (score, rowid) rather than an
+    offset, so later pages cost the same as the first.
+
+    Parameters:
+    - query (str): Words to search for; all must appear in the speech or its topic title.
+    - member_names (List[str]): Only return speeches by these members.
+    - start_date (str): Only return speeches on or after this date (YYYY-MM-DD).
+    - end_date (str): Only return speeches on or before this date (YYYY-MM-DD).
+    - parliaments (List[int]): Only return speeches from these parliaments.
+    - topic (str): Words which must appear in the topic title.
+    - after (Tuple[float, int]): Cursor returned with the previous page.
+    - limit (int): Number of results per page.
+    - path (str): Path of the SQLite index file.
+
+    Returns:
+    - Tuple[pd.DataFrame, Optional[Tuple[float, int]]]: The results, with a
+      highlighted 'snippet', and the cursor for the next page (None on the last page).
+    """
+    match_expression = to_match_expression(query, topic)
+    if not match_expression:
+        return pd.DataFrame(), None
+
+    filters = []
+    parameters = [match_expression]
+    if member_names:
+        filters.append(f"s.member_name in ({', '.join('?' * len(member_names))})")
+        parameters += member_names
+    if parliaments:
+        filters.append(f"s.parliament in ({', '.join('?' * len(parliaments))})")
+        parameters += parliaments
+    if start_date:
+        filters.append("s.date >= ?")
+        parameters.append(str(start_date))
+    if end_date:
+        filters.append("s.date <= ?")
+        parameters.append(str(end_date))
+    if after:
+        filters.append("(m.score > ? or (m.score = ? and s.speech_rowid > ?))")
+        parameters += [after[0], after[0], after[1]]
+
+    connection = open_speech_index(path)
+    try:
+        results = pd.read_sql_query(
+            f"""
+            select m.score, s.*
+            from (
+                select rowid, bm25(speeches_fts) as score
+                from speeches_fts
+                where speeches_fts match ?
+            ) as m
+            join speeches as s on s.speech_rowid = m.rowid
+            {'where ' + ' and '.join(filters) if filters else ''}
+            order by m.score, s.speech_rowid
+            limit {int(limit)}
+            """,
+            connection,
+            params=parameters,
+        )
+        # snippets are only built for the rows on this page
+        snippets = dict(
+            connection.execute(
+                f"""
+                select rowid, snippet(speeches_fts, 0, '**', '**', '...', 32)
+                from speeches_fts
+                where speeches_fts match ?
+                and rowid in ({', '.join('?' * len(results))})
+                """,
+                [match_expression, *results["speech_rowid"].tolist()],
+            ).fetchall()
+        )
+    finally:
+        connection.close()
+
+    results["snippet"] = results["speech_rowid"].map(snippets)
+    next_cursor = None
+    if len(results) == limit:
+        last = results.iloc[-1]
+        next_cursor = (float(last["score"]), int(last["speech_rowid"]))
+    return results, next_cursor
+
+
+def latest_indexed_date(path: str = SPEECH_INDEX_PATH) -> Optional[str]:
+    """
+    Returns the latest date in the speech index, or None if it has not been
+    built. The index is built and updated from the command line
+    (`python -m speeches`), as that pulls speeches from `mart_speeches`.
+    """
+    if not os.path.exists(path):
+        return None
+    connection = open_speech_index(path)
+    try:
+        return get_index_state(connection, "latest_date")
+    finally:
+        connection.close()
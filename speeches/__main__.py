@@ -0,0 +1,13 @@
+import argparse
+
+from speeches import INDEX_BATCH_SIZE, SPEECH_INDEX_PATH, update_speech_index
+
+parser = argparse.ArgumentParser(
+    description="Build or update the local full-text index of speeches."
+)
+parser.add_argument("--path", default=SPEECH_INDEX_PATH)
+parser.add_argument("--batch-size", type=int, default=INDEX_BATCH_SIZE)
+args = parser.parse_args()
+
+count_indexed = update_speech_index(args.path, batch_size=args.batch_size)
+print(f"Indexed {count_indexed} speeches into {args.path}.")
@@ -0,0 +1,290 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from agg_data import (
+    SYNCED_DATA_DIR,
+    all_member_speeches_query,
+    member_list_query,
+    member_positions_query,
+)
+from topics import add_periods, topic_rollup_query
+from utils import guarded_query
+
+SYNC_STATE_PATH = os.path.join(SYNCED_DATA_DIR, "state.json")
+
+# months before the latest synced month which are fetched again, as a hansard
+# release can restate the counts of months already synced
+SYNC_LOOKBACK_MONTHS = 3
+
+# number of past syncs kept in the log
+SYNC_LOG_SIZE = 100
+
+# The deltas fetch fewer rows, but BigQuery bills the columns read from every
+# row a query scans, and only skips rows by partition or cluster pruning. The
+# member list, positions and speech metrics tables are not partitioned, so
+# their deltas are billed like a full fetch; they are small, and what a sync
+# saves there is transfer and local rewrite time. The topic rollup is fetched
+# from mart_speeches by date, so it is pruned wherever that table is
+# partitioned or clustered on date. Each sync logs the bytes billed per dataset.
+
+
+def fetch_delta(query: str) -> Tuple[pd.DataFrame, dict]:
+    """
+    Runs a query, returning its rows along with what the query cost.
+
+    Parameters:
+    - query (str): The query to run.
+
+    Returns:
+    - Tuple[pd.DataFrame, dict]: The rows, and the rows fetched and bytes
+      processed and billed for them.
+    """
+    query_job = guarded_query(query)
+    rows = query_job.result()
+    column_names = [field.name for field in rows.schema]
+    delta = pd.DataFrame([dict(row) for row in rows], columns=column_names)
+    return delta, {
+        "rows": len(delta),
+        "bytes_processed": query_job.total_bytes_processed or 0,
+        "bytes_billed": query_job.total_bytes_billed or 0,
+    }
+
+
+def read_dataset(name: str, sync_dir: str) -> Optional[pd.DataFrame]:
+    path = os.path.join(sync_dir, f"{name}.parquet")
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def _write_atomically(path: str, write):
+    # written to a temporary file first, so the app never reads a partial file,
+    # and an interrupted write leaves the previous file as it was
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", suffix=".tmp"
+    )
+    os.close(file_descriptor)
+    try:
+        write(temporary_path)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def write_dataset(dataset: pd.DataFrame, name: str, sync_dir: str):
+    _write_atomically(
+        os.path.join(sync_dir, f"{name}.parquet"),
+        lambda path: dataset.to_parquet(path, index=False),
+    )
+
+
+def read_sync_state(path: str = SYNC_STATE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"high_water_marks": {}, "syncs": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def year_month_lookback(year_month: int, months: int) -> int:
+    """
+    Returns the year-month (as yyyymm) a number of months before another.
+    """
+    month_index = (year_month // 100) * 12 + (year_month % 100 - 1) - months
+    return (month_index // 12) * 100 + month_index % 12 + 1
+
+
+def sync_member_speeches(
+    speeches: Optional[pd.DataFrame], latest_year_month: Optional[int] = None
+) -> Tuple[pd.DataFrame, dict, Optional[int]]:
+    """
+    Brings the member x month speech metrics up to date. Months from
+    SYNC_LOOKBACK_MONTHS before the latest synced month onwards are fetched
+    and replace the synced rows for those months, so restated months are
+    picked up; earlier months are kept as they are.
+
+    Parameters:
+    - speeches (pd.DataFrame): The synced metrics, None if never synced.
+    - latest_year_month (int): The latest synced year-month, from the sync
+      state; taken from `speeches` if not given.
+
+    Returns:
+    - Tuple[pd.DataFrame, dict, Optional[int]]: The updated metrics, the cost
+      of the delta and the year-month the delta was fetched from (None for a
+      full fetch).
+    """
+    since_year_month = None
+    if speeches is not None and not speeches.empty:
+        if latest_year_month is None:
+            latest_year_month = int((speeches["year"] * 100 + speeches["month"]).max())
+        since_year_month = year_month_lookback(latest_year_month, SYNC_LOOKBACK_MONTHS)
+
+    if since_year_month is None:
+        return (*fetch_delta(all_member_speeches_query()), None)
+
+    delta, cost = fetch_delta(
+        all_member_speeches_query(f"year * 100 + month >= {since_year_month}")
+    )
+    kept = speeches[speeches["year"] * 100 + speeches["month"] < since_year_month]
+    return pd.concat([kept, delta], ignore_index=True), cost, since_year_month
+
+
+def sync_member_list(
+    members: Optional[pd.DataFrame], latest_sitting: Optional[str] = None
+) -> Tuple[pd.DataFrame, dict, Optional[str]]:
+    """
+    Brings the member list up to date. Only members who sat on or after the
+    latest synced sitting can have changed; their rows are fetched and replace
+    the synced rows for the same members.
+
+    Parameters:
+    - members (pd.DataFrame): The synced member list, None if never synced.
+    - latest_sitting (str): The latest synced sitting, from the sync state;
+      taken from `members` if not given.
+
+    Returns:
+    - Tuple[pd.DataFrame, dict, Optional[str]]: The updated member list, the
+      cost of the delta and the sitting date the delta was fetched from (None
+      for a full fetch).
+    """
+    if members is None or members.empty:
+        return (*fetch_delta(member_list_query()), None)
+
+    since_sitting = latest_sitting or str(members["latest_sitting"].max())
+    delta, cost = fetch_delta(member_list_query(f"latest_sitting >= '{since_sitting}'"))
+    kept = members[~members["member_name"].isin(delta["member_name"])]
+    members = pd.concat([kept, delta], ignore_index=True)
+
+    # is_active is relative to the latest sitting of all members, so it is
+    # recomputed rather than taken from the partial delta
+    members["is_active"] = members["latest_sitting"] == members["latest_sitting"].max()
+    return members, cost, since_sitting
+
+
+def sync_member_positions(
+    positions: Optional[pd.DataFrame], since_sitting: Optional[str]
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    Brings the member positions up to date. Every position of a member with a
+    position starting, ending or still open on or after `since_sitting` is
+    fetched, and replaces the synced positions of the same members, so ended
+    positions and changes to is_latest_position are picked up.
+
+    Parameters:
+    - positions (pd.DataFrame): The synced positions, None if never synced.
+    - since_sitting (str): The latest sitting date as of the previous sync.
+
+    Returns:
+    - Tuple[pd.DataFrame, dict]: The updated positions and the cost of the delta.
+    """
+    if positions is None or since_sitting is None:
+        return fetch_delta(member_positions_query())
+
+    changed_positions = member_positions_query(
+        f"effective_from_date >= '{since_sitting}'"
+        " or effective_to_date is null"
+        f" or effective_to_date >= '{since_sitting}'"
+    )
+    delta, cost = fetch_delta(
+        member_positions_query(
+            f"member_name in (select member_name from ({changed_positions}))"
+        )
+    )
+    kept = positions[~positions["member_name"].isin(delta["member_name"])]
+    return pd.concat([kept, delta], ignore_index=True), cost
+
+
+def sync_topic_rollup(
+    rollup: Optional[pd.DataFrame], since_year_month: Optional[int]
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    Brings the topic x member x month rollup up to date, fetching the same
+    months as the speech metrics and replacing the synced rows for them.
+
+    Parameters:
+    - rollup (pd.DataFrame): The synced rollup, None if never synced.
+    - since_year_month (int): The year-month the speech metrics were fetched
+      from (None for a full fetch).
+
+    Returns:
+    - Tuple[pd.DataFrame, dict]: The updated rollup and the cost of the delta.
+    """
+    if rollup is None or since_year_month is None:
+        delta, cost = fetch_delta(topic_rollup_query())
+        return add_periods(delta), cost
+
+    delta, cost = fetch_delta(topic_rollup_query(since_year_month))
+    kept = rollup[rollup["year"] * 100 + rollup["month"] < since_year_month]
+    return pd.concat([kept, add_periods(delta)], ignore_index=True), cost
+
+
+def sync_datasets(sync_dir: str = SYNCED_DATA_DIR, full: bool = False) -> dict:
+    """
+    Brings the locally synced member list, positions, speech metrics and topic
+    rollup up to date with BigQuery, fetching only rows which may have changed since the
+    previous sync, and logs the rows and bytes each dataset cost.
+
+    Parameters:
+    - sync_dir (str): Directory holding the synced datasets and sync state.
+    - full (bool): Fetch every dataset in full, discarding the synced copies.
+
+    Returns:
+    - dict: The log entry of this sync.
+    """
+    os.makedirs(sync_dir, exist_ok=True)
+    state_path = os.path.join(sync_dir, "state.json")
+    state = read_sync_state(state_path)
+
+    high_water_marks = {} if full else state.get("high_water_marks", {})
+
+    def synced(name):
+        return None if full else read_dataset(name, sync_dir)
+
+    members, members_cost, since_sitting = sync_member_list(
+        synced("member_list"), high_water_marks.get("latest_sitting")
+    )
+    positions, positions_cost = sync_member_positions(
+        synced("member_positions"), since_sitting
+    )
+    speeches, speeches_cost, since_year_month = sync_member_speeches(
+        synced("member_speeches"), high_water_marks.get("latest_year_month")
+    )
+    topic_rollup, topic_rollup_cost = sync_topic_rollup(
+        synced("topic_rollup"), since_year_month
+    )
+
+    # the member list goes last: its latest sitting is the high-water mark of
+    # the positions, so it must only move once the positions are written
+    write_dataset(positions, "member_positions", sync_dir)
+    write_dataset(speeches, "member_speeches", sync_dir)
+    write_dataset(topic_rollup, "topic_rollup", sync_dir)
+    write_dataset(members, "member_list", sync_dir)
+
+    entry = {
+        "synced_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "full": since_sitting is None and since_year_month is None,
+        "since_sitting": since_sitting,
+        "since_year_month": since_year_month,
+        "datasets": {
+            "member_list": {**members_cost, "total_rows": len(members)},
+            "member_positions": {**positions_cost, "total_rows": len(positions)},
+            "member_speeches": {**speeches_cost, "total_rows": len(speeches)},
+            "topic_rollup": {**topic_rollup_cost, "total_rows": len(topic_rollup)},
+        },
+    }
+    speech_periods = speeches["year"] * 100 + speeches["month"]
+    state["high_water_marks"] = {
+        "latest_sitting": str(members["latest_sitting"].max()),
+        "latest_year_month": int(speech_periods.max()) if len(speeches) else None,
+    }
+    state["syncs"] = (state["syncs"] + [entry])[-SYNC_LOG_SIZE:]
+
+    def write_state(path):
+        with open(path, "w") as f:
+            json.dump(state, f, indent=2)
+
+    _write_atomically(state_path, write_state)
+    return entry
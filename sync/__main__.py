@@ -0,0 +1,17 @@
+import argparse
+
+from sync import SYNCED_DATA_DIR, sync_datasets
+
+parser = argparse.ArgumentParser(
+    description="Sync the member list, positions, speech metrics and topic rollup into local copies, fetching only what changed."
+)
+parser.add_argument("--dir", default=SYNCED_DATA_DIR)
+parser.add_argument("--full", action="store_true", help="Fetch every dataset in full.")
+args = parser.parse_args()
+
+entry = sync_datasets(args.dir, full=args.full)
+for name, cost in entry["datasets"].items():
+    print(
+        f"{name}: fetched {cost['rows']} of {cost['total_rows']} rows,"
+        f" {cost['bytes_processed']} bytes processed, {cost['bytes_billed']} bytes billed."
+    )
@@ -0,0 +1,193 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from utils import highlight_rows, metric_column_config
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def sort_and_filter(
+    df: pd.DataFrame,
+    sort_by: str,
+    ascending: bool = True,
+    filters: Optional[Dict[str, List[str]]] = None,
+    tie_breaker: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Filters a table on exact column values and sorts it, keeping the row order
+    deterministic so that pages are stable between reruns.
+
+    Parameters:
+    - df (pd.DataFrame): The table to query.
+    - sort_by (str): Column to sort by.
+    - ascending (bool): Sort direction.
+    - filters (Dict[str, List[str]]): Mapping of column to allowed values. Empty lists are ignored.
+    - tie_breaker (str): Column used to order rows with equal `sort_by` values.
+
+    Returns:
+    - pd.DataFrame: The filtered and sorted table, with a fresh index.
+    """
+    mask = pd.Series(True, index=df.index)
+    for column, values in (filters or {}).items():
+        if values:
+            mask &= df[column].isin(values)
+
+    sort_columns = [sort_by]
+    if tie_breaker and tie_breaker != sort_by:
+        sort_columns.append(tie_breaker)
+
+    return (
+        df[mask]
+        .sort_values(
+            sort_columns, ascending=ascending, kind="stable", na_position="last"
+        )
+        .reset_index(drop=True)
+    )
+
+
+def get_page(
+    df: pd.DataFrame, page: int, page_size: int = DEFAULT_PAGE_SIZE
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Slices one page out of an already sorted table.
+
+    Parameters:
+    - df (pd.DataFrame): The sorted table.
+    - page (int): 1-based page number; clamped to the available pages.
+    - page_size (int): Number of rows per page.
+
+    Returns:
+    - Tuple[pd.DataFrame, int]: The rows on the page, and the total number of pages.
+    """
+    total_pages = max(1, math.ceil(len(df) / page_size))
+    page = min(max(1, page), total_pages)
+    start = (page - 1) * page_size
+    return df.iloc[start : start + page_size], total_pages
+
+
+def find_member_page(
+    df: pd.DataFrame,
+    member_names: Iterable[str],
+    name_column: str = "Member Name",
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Optional[int]:
+    """
+    Finds the page of a sorted table containing the first of the given members.
+
+    Parameters:
+    - df (pd.DataFrame): The sorted table.
+    - member_names (Iterable[str]): Members to look for.
+    - name_column (str): Column holding member names.
+    - page_size (int): Number of rows per page.
+
+    Returns:
+    - Optional[int]: 1-based page number, or None if none of the members are in the table.
+    """
+    positions = df.index[df[name_column].isin(list(member_names))]
+    if len(positions) == 0:
+        return None
+    return int(positions[0]) // page_size + 1
+
+
+def paginated_member_table(
+    df: pd.DataFrame,
+    key: str,
+    default_sort: str,
+    default_ascending: bool = True,
+    filter_columns: Tuple[str, ...] = ("Party", "Constituency"),
+    highlighted: Iterable[str] = (),
+    name_column: str = "Member Name",
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> None:
+    """
+    Displays a member table with sorting, filtering and pagination done on the
+    server, so only the visible page is sent to the browser.
+
+    When the highlighted members change, the table jumps to the page holding
+    the first highlighted member.
+
+    Parameters:
+    - df (pd.DataFrame): The full table, with display column names.
+    - key (str): Unique prefix for the widget keys of this table.
+    - default_sort (str): Column to sort by initially.
+    - default_ascending (bool): Initial sort direction.
+    - filter_columns (Tuple[str, ...]): Columns offered as multiselect filters.
+    - highlighted (Iterable[str]): Member names to highlight.
+    - name_column (str): Column holding member names.
+    - page_size (int): Number of rows per page.
+    """
+    highlighted = [member for member in highlighted if member]
+    columns = list(df.columns)
+
+    sort_col, order_col, *filter_cols = st.columns(2 + len(filter_columns))
+    with sort_col:
+        sort_by = st.selectbox(
+            label="Sort by",
+            options=columns,
+            index=columns.index(default_sort),
+            key=f"{key}_sort_by",
+        )
+    with order_col:
+        ascending = (
+            st.radio(
+                label="Order",
+                options=["Ascending", "Descending"],
+                index=0 if default_ascending else 1,
+                key=f"{key}_order",
+            )
+            == "Ascending"
+        )
+    filters = {}
+    for column, filter_col in zip(filter_columns, filter_cols):
+        with filter_col:
+            filters[column] = st.multiselect(
+                label=column,
+                options=sorted(df[column].dropna().unique()),
+                key=f"{key}_filter_{column}",
+            )
+
+    ordered = sort_and_filter(
+        df, sort_by, ascending=ascending, filters=filters, tie_breaker=name_column
+    )
+
+    page_key = f"{key}_page"
+    highlighted_key = f"{key}_highlighted"
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    if st.session_state.get(highlighted_key) != highlighted:
+        st.session_state[highlighted_key] = highlighted
+        member_page = find_member_page(ordered, highlighted, name_column, page_size)
+        if member_page:
+            st.session_state[page_key] = member_page
+
+    page_df, total_pages = get_page(ordered, st.session_state[page_key], page_size)
+    st.session_state[page_key] = min(st.session_state[page_key], total_pages)
+
+    st.dataframe(
+        highlight_rows(page_df, page_df[name_column].isin(highlighted)),
+        column_config=metric_column_config(page_df.columns),
+        hide_index=True,
+        use_container_width=False,
+    )
+
+    page_col, caption_col = st.columns([1, 3])
+    with page_col:
+        st.number_input(
+            label="Page",
+            min_value=1,
+            max_value=total_pages,
+            step=1,
+            key=page_key,
+        )
+    with caption_col:
+        if len(ordered) == 0:
+            st.caption("No members match the selected filters.")
+        else:
+            start = (st.session_state[page_key] - 1) * page_size
+            st.caption(
+                f"Showing {start + 1}-{start + len(page_df)} of {len(ordered)} members "
+                f"(page {st.session_state[page_key]} of {total_pages})."
+            )
@@ -0,0 +1,406 @@
+import os
+import re
+import tempfile
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import STREAM_BATCH_SIZE, project_id, stream_query
+
+TERM_STATS_PATH = os.path.join("data", "term_stats.npz")
+# groups are kept per member and per year, rather than per member x year, so
+# that the sketches stay in the tens of MB; the chamber is the sum of the years
+GROUP_KINDS = ["member", "year"]
+
+# count-min sketch dimensions: estimates overcount by at most
+# e / SKETCH_WIDTH of a group's terms, with probability 1 - exp(-SKETCH_DEPTH)
+SKETCH_DEPTH = 4
+SKETCH_WIDTH = 4096
+# terms tracked exactly enough to rank, per group (Misra-Gries summary)
+HEAVY_HITTERS = 300
+
+STOPWORDS = set(
+    """
+    a about above after again against all also am an and any are as at be because
+    been before being below between both but by can could did do does doing down
+    during each few for from further had has have having he her here hers herself
+    him himself his how i if in into is it its itself just let me more most my
+    myself no nor not now of off on once only or other our ours ourselves out over
+    own same she should so some such than that the their theirs them themselves
+    then there these they this those through to too under until up very was we
+    were what when where which while who whom why will with would you your yours
+    yourself yourselves may might must shall us one two also well whether however
+    therefore thus yes sir madam speaker deputy mr mrs ms mdm dr member members
+    hon honourable minister ministers thank
+    """.split()
+)
+
+
+class TermStats(NamedTuple):
+    """
+    Mergeable term and bigram frequency summaries, one per member and per year.
+
+    - keys (pd.DataFrame): The 'kind' ('member' or 'year') and 'key' of each group.
+    - sketches (np.ndarray): Count-min sketches of shape (groups, SKETCH_DEPTH, SKETCH_WIDTH).
+    - totals (np.ndarray): Number of terms counted in each group.
+    - heavy_hitters (pd.DataFrame): 'group', 'term' and 'count' of each group's most
+      frequent terms; counts are lower bounds, and sketch estimates upper bounds.
+    """
+
+    keys: pd.DataFrame
+    sketches: np.ndarray
+    totals: np.ndarray
+    heavy_hitters: pd.DataFrame
+
+
+def speech_text_query() -> str:
+    return f"""
+    select
+        member_name,
+        extract(year from date) as year,
+        text
+    from `{project_id}.prod_mart.mart_speeches`
+    where member_name != '' and member_name is not null and text is not null
+    """
+
+
+def speech_terms(text: str) -> List[str]:
+    """
+    Words and two-word phrases of a speech, lowercased, without stopwords.
+    Phrases are only formed from words next to each other in the speech.
+    """
+    words = re.findall(r"[a-z][a-z'-]*[a-z]", text.lower())
+    kept = [len(word) > 2 and word not in STOPWORDS for word in words]
+    terms = [word for word, keep in zip(words, kept) if keep]
+    terms += [
+        f"{words[i]} {words[i + 1]}"
+        for i in range(len(words) - 1)
+        if kept[i] and kept[i + 1]
+    ]
+    return terms
+
+
+def sketch_columns(terms: List[str]) -> np.ndarray:
+    """
+    Column of each term in each row of a count-min sketch, of shape
+    (SKETCH_DEPTH, len(terms)). Uses CRC32 rather than `hash`, which differs
+    between processes, so that stored sketches stay comparable.
+    """
+    encoded = [term.encode() for term in terms]
+    h1 = np.fromiter((zlib.crc32(term) for term in encoded), np.uint64, len(terms))
+    h2 = np.fromiter(
+        (zlib.crc32(term, 0x5BD1E995) | 1 for term in encoded), np.uint64, len(terms)
+    )
+    rows = np.arange(SKETCH_DEPTH, dtype=np.uint64)[:, None]
+    return ((h1 + rows * h2) % SKETCH_WIDTH).astype(np.int64)
+
+
+def merge_heavy_hitters(
+    heavy_hitters: Dict[str, int], counts: Dict[str, int], capacity: int = HEAVY_HITTERS
+) -> Dict[str, int]:
+    """
+    Adds counts to a Misra-Gries summary, keeping at most `capacity` terms. Any
+    term with more than 1 / (capacity + 1) of the group's terms is kept.
+    """
+    merged = Counter(heavy_hitters)
+    merged.update(counts)
+    if len(merged) <= capacity:
+        return dict(merged)
+    threshold = sorted(merged.values(), reverse=True)[capacity]
+    return {
+        term: count - threshold for term, count in merged.items() if count > threshold
+    }
+
+
+def build_term_stats(batches: Iterable[pd.DataFrame]) -> TermStats:
+    """
+    Builds term statistics in one streaming pass over batches of speeches,
+    holding only one batch, the sketches and the heavy hitters in memory.
+
+    Parameters:
+    - batches (Iterable[pd.DataFrame]): Batches with the columns of `speech_text_query`.
+
+    Returns:
+    - TermStats: The term statistics.
+    """
+    group_ids: Dict[Tuple[str, str], int] = {}
+    sketches = np.zeros((0, SKETCH_DEPTH, SKETCH_WIDTH), dtype=np.uint32)
+    totals: List[int] = []
+    heavy_hitters: List[Dict[str, int]] = []
+
+    for batch in batches:
+        batch_counts = defaultdict(Counter)
+        for member_name, year, text in zip(
+            batch["member_name"], batch["year"], batch["text"]
+        ):
+            if not member_name or pd.isna(year) or not text:
+                continue
+            terms = speech_terms(text)
+            batch_counts[("member", member_name)].update(terms)
+            batch_counts[("year", str(int(year)))].update(terms)
+
+        for group in batch_counts:
+            if group not in group_ids:
+                group_ids[group] = len(group_ids)
+                totals.append(0)
+                heavy_hitters.append({})
+        if len(group_ids) > len(sketches):
+            sketches = np.concatenate(
+                [
+                    sketches,
+                    np.zeros(
+                        (len(group_ids) - len(sketches), SKETCH_DEPTH, SKETCH_WIDTH),
+                        dtype=np.uint32,
+                    ),
+                ]
+            )
+
+        # every distinct term of the batch is hashed once, not once per group
+        batch_terms = {}
+        for counts in batch_counts.values():
+            for term in counts:
+                batch_terms.setdefault(term, len(batch_terms))
+        batch_columns = sketch_columns(list(batch_terms))
+
+        for group, counts in batch_counts.items():
+            group_id = group_ids[group]
+            columns = batch_columns[
+                :,
+                np.fromiter(
+                    map(batch_terms.__getitem__, counts), np.int64, len(counts)
+                ),
+            ]
+            values = np.fromiter(counts.values(), np.uint32, len(counts))
+            for row in range(SKETCH_DEPTH):
+                np.add.at(sketches[group_id, row], columns[row], values)
+            totals[group_id] += int(values.sum())
+            heavy_hitters[group_id] = merge_heavy_hitters(
+                heavy_hitters[group_id], counts
+            )
+
+    keys = pd.DataFrame(list(group_ids), columns=["kind", "key"])
+    heavy_hitters_df = pd.DataFrame(
+        [
+            (group_id, term, count)
+            for group_id, group_heavy_hitters in enumerate(heavy_hitters)
+            for term, count in group_heavy_hitters.items()
+        ],
+        columns=["group", "term", "count"],
+    )
+    return TermStats(keys, sketches, np.array(totals, dtype=np.int64), heavy_hitters_df)
+
+
+def estimate_counts(sketch: np.ndarray, terms: List[str]) -> np.ndarray:
+    """
+    Estimates the counts of terms from a count-min sketch, or from the sum of
+    several groups' sketches.
+    """
+    if not terms:
+        return np.zeros(0, dtype=np.int64)
+    columns = sketch_columns(terms)
+    return (
+        sketch[np.arange(SKETCH_DEPTH)[:, None], columns].min(axis=0).astype(np.int64)
+    )
+
+
+def group_index(stats: TermStats, kind: str, key: str) -> Optional[int]:
+    matches = stats.keys.index[
+        (stats.keys["kind"] == kind) & (stats.keys["key"] == key)
+    ]
+    return int(matches[0]) if len(matches) else None
+
+
+def top_terms(stats: TermStats, kind: str, key: str, n: int = 20) -> pd.DataFrame:
+    """
+    The most frequent terms of a member or year.
+
+    Parameters:
+    - stats (TermStats): The statistics from `get_term_stats`.
+    - kind (str): 'member' or 'year'.
+    - key (str): The member name, or the year as a string.
+    - n (int): Number of terms.
+
+    Returns:
+    - pd.DataFrame: 'term' and estimated 'count', most frequent first.
+    """
+    group = group_index(stats, kind, key)
+    if group is None:
+        return pd.DataFrame(columns=["term", "count"])
+    terms = stats.heavy_hitters.loc[
+        stats.heavy_hitters["group"] == group, "term"
+    ].tolist()
+    top = pd.DataFrame(
+        {"term": terms, "count": estimate_counts(stats.sketches[group], terms)}
+    )
+    return top.sort_values(["count", "term"], ascending=[False, True]).head(n)
+
+
+def distinctive_terms(
+    stats: TermStats, member_name: str, n: int = 20, min_count: int = 5
+) -> pd.DataFrame:
+    """
+    The terms a member uses most often relative to the rest of the chamber,
+    ranked by the log ratio of their rates (per 10,000 terms).
+
+    Parameters:
+    - stats (TermStats): The statistics from `get_term_stats`.
+    - member_name (str): The member.
+    - n (int): Number of terms.
+    - min_count (int): Only consider terms the member used at least this often.
+
+    Returns:
+    - pd.DataFrame: 'term', 'count', 'member_rate', 'chamber_rate' and 'log_ratio',
+      most distinctive first.
+    """
+    columns = ["term", "count", "member_rate", "chamber_rate", "log_ratio"]
+    group = group_index(stats, "member", member_name)
+    if group is None:
+        return pd.DataFrame(columns=columns)
+
+    terms = stats.heavy_hitters.loc[
+        stats.heavy_hitters["group"] == group, "term"
+    ].tolist()
+    is_year = (stats.keys["kind"] == "year").to_numpy()
+    chamber_sketch = stats.sketches[is_year].sum(axis=0, dtype=np.uint64)
+    chamber_total = stats.totals[is_year].sum()
+    member_total = stats.totals[group]
+
+    member_counts = estimate_counts(stats.sketches[group], terms)
+    # both are overestimates, so the rest of the chamber is floored at zero
+    rest_counts = np.maximum(estimate_counts(chamber_sketch, terms) - member_counts, 0)
+    rest_total = max(chamber_total - member_total, 1)
+
+    distinctive = pd.DataFrame(
+        {
+            "term": terms,
+            "count": member_counts,
+            "member_rate": member_counts / max(member_total, 1) * 10000,
+            "chamber_rate": rest_counts / rest_total * 10000,
+            "log_ratio": np.log((member_counts + 0.5) / max(member_total, 1))
+            - np.log((rest_counts + 0.5) / rest_total),
+        },
+        columns=columns,
+    )
+    distinctive = distinctive[distinctive["count"] >= min_count]
+    return distinctive.sort_values("log_ratio", ascending=False).head(n)
+
+
+def save_term_stats(stats: TermStats, data_version: str, path: str) -> None:
+    """
+    Writes term statistics to a temporary file and moves it into place, so a
+    page never loads a partly written file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            np.savez_compressed(
+                file,
+                data_version=np.array(data_version),
+                key_kind=stats.keys["kind"].to_numpy(dtype=str),
+                key_key=stats.keys["key"].to_numpy(dtype=str),
+                sketches=stats.sketches,
+                totals=stats.totals,
+                heavy_hitter_group=stats.heavy_hitters["group"].to_numpy(
+                    dtype=np.int64
+                ),
+                heavy_hitter_term=stats.heavy_hitters["term"].to_numpy(dtype=str),
+                heavy_hitter_count=stats.heavy_hitters["count"].to_numpy(
+                    dtype=np.int64
+                ),
+            )
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def stored_data_version(path: str) -> Optional[str]:
+    """
+    Returns the data version saved statistics were built from, or None if
+    there are none.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        return str(stored["data_version"])
+
+
+def load_term_stats(
+    path: str, data_version: Optional[str] = None
+) -> Optional[TermStats]:
+    """
+    Loads term statistics, or returns None if there are none (for the data
+    version, if given). The arrays are read-only, as the statistics are shared
+    by sessions.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        if data_version is not None and str(stored["data_version"]) != data_version:
+            return None
+        keys = pd.DataFrame({"kind": stored["key_kind"], "key": stored["key_key"]})
+        heavy_hitters = pd.DataFrame(
+            {
+                "group": stored["heavy_hitter_group"],
+                "term": stored["heavy_hitter_term"],
+                "count": stored["heavy_hitter_count"],
+            }
+        )
+        sketches = stored["sketches"]
+        totals = stored["totals"]
+    sketches.flags.writeable = False
+    totals.flags.writeable = False
+    return TermStats(keys, sketches, totals, heavy_hitters)
+
+
+def write_term_stats(
+    data_version: str,
+    path: str = TERM_STATS_PATH,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> TermStats:
+    """
+    Builds the term statistics with a streaming pass over `mart_speeches` and
+    saves them. Run from the command line (`python -m terms`), as the pass
+    reads the text of every speech.
+
+    Parameters:
+    - data_version (str): Output of `get_data_version`, stored with the statistics.
+    - path (str): File to save the statistics to.
+    - batch_size (int): Maximum number of speeches held in memory at once.
+
+    Returns:
+    - TermStats: The term statistics.
+    """
+    stats = build_term_stats(
+        batch for batch, _ in stream_query(speech_text_query(), batch_size)
+    )
+    save_term_stats(stats, data_version, path)
+    return stats
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _read_term_stats(
+    path: str, modified: Optional[float]
+) -> Optional[Tuple[TermStats, str]]:
+    stats = load_term_stats(path)
+    return None if stats is None else (stats, stored_data_version(path))
+
+
+def get_term_stats(path: str = TERM_STATS_PATH) -> Optional[Tuple[TermStats, str]]:
+    """
+    Loads the term statistics built by `python -m terms`, once per file,
+    shared by all sessions without copying. Statistics of an earlier data
+    version are served until they are rebuilt.
+
+    Returns:
+    - Optional[Tuple[TermStats, str]]: The statistics and the data version they
+      were built from, or None if they have not been built.
+    """
+    modified = os.path.getmtime(path) if os.path.exists(path) else None
+    return _read_term_stats(path, modified)
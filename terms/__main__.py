@@ -0,0 +1,33 @@
+import argparse
+
+from agg_data import get_data_version
+from terms import TERM_STATS_PATH, load_term_stats, write_term_stats
+from utils import STREAM_BATCH_SIZE, QueryBudgetExceeded
+
+parser = argparse.ArgumentParser(
+    description="Build the term statistics behind the distinctive terms of each member."
+)
+parser.add_argument("--path", default=TERM_STATS_PATH)
+parser.add_argument("--batch-size", type=int, default=STREAM_BATCH_SIZE)
+parser.add_argument(
+    "--force", action="store_true", help="rebuild statistics which already exist"
+)
+args = parser.parse_args()
+
+data_version = get_data_version()
+stats = None if args.force else load_term_stats(args.path, data_version)
+if stats is not None:
+    print(f"Term statistics for {data_version} already exist in {args.path}.")
+else:
+    try:
+        stats = write_term_stats(data_version, args.path, batch_size=args.batch_size)
+    except QueryBudgetExceeded as error:
+        parser.exit(
+            1,
+            f"{error}\nThe build reads the text of every speech; raise"
+            " max_bytes_per_query in the query_budget secrets to run it.\n",
+        )
+    print(
+        f"Wrote term statistics for {data_version} into {args.path}:"
+        f" {len(stats.keys)} groups, {len(stats.heavy_hitters)} heavy hitters."
+    )
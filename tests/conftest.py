@@ -0,0 +1,16 @@
+import os
+import sys
+from unittest import mock
+
+import streamlit as st
+from google.cloud import bigquery
+from google.oauth2 import service_account
+
+# the modules under test create a BigQuery client from the Streamlit secrets
+# when imported; the tests never reach BigQuery, so both are replaced
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+mock.patch.object(st, "secrets", {"gcp_service_account": {}}).start()
+mock.patch.object(
+    service_account.Credentials, "from_service_account_info", lambda info: None
+).start()
+mock.patch.object(bigquery, "Client", mock.MagicMock).start()
@@ -0,0 +1,83 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import api
+
+
+@pytest.fixture
+def server(monkeypatch):
+    loads = []
+    monkeypatch.setitem(
+        api.DATASETS,
+        "members",
+        lambda: loads.append("members") or pd.DataFrame({"member_name": ["A", "B"]}),
+    )
+    monkeypatch.setattr(api, "current_data_version", lambda: "2024-01-01-5")
+    api.load_dataset.cache_clear()
+    api.encode_dataset.cache_clear()
+
+    httpd = api.ThreadingHTTPServer(("127.0.0.1", 0), api.DataRequestHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", loads
+    httpd.shutdown()
+    api.load_dataset.cache_clear()
+    api.encode_dataset.cache_clear()
+
+
+def get(url, **headers):
+    try:
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+    return response.status, response.headers, response.read()
+
+
+def test_matching_etag_is_answered_without_encoding(server):
+    url, loads = server
+    etag = api.dataset_etag("members", "2024-01-01-5", api.JSON_MEDIA_TYPE)
+
+    status, headers, body = get(f"{url}/members", **{"If-None-Match": etag})
+
+    assert (status, headers["ETag"], body) == (304, etag, b"")
+    assert loads == []
+    assert api.encode_dataset.cache_info().currsize == 0
+
+
+def test_stale_etag_gets_the_dataset(server):
+    url, loads = server
+
+    status, headers, body = get(f"{url}/members", **{"If-None-Match": '"stale"'})
+
+    assert status == 200
+    assert headers["ETag"] == api.dataset_etag(
+        "members", "2024-01-01-5", api.JSON_MEDIA_TYPE
+    )
+    assert body == b'[{"member_name":"A"},{"member_name":"B"}]'
+    assert loads == ["members"]
+
+
+def test_weak_etag_matches(server):
+    url, _ = server
+    etag = api.dataset_etag("members", "2024-01-01-5", api.JSON_MEDIA_TYPE)
+
+    status, _, _ = get(f"{url}/members", **{"If-None-Match": f'"other", W/{etag}'})
+
+    assert status == 304
+
+
+def test_failed_load_is_a_json_error(server, monkeypatch):
+    url, _ = server
+
+    def fail():
+        raise RuntimeError("BigQuery unavailable")
+
+    monkeypatch.setitem(api.DATASETS, "positions", fail)
+    status, headers, body = get(f"{url}/positions")
+
+    assert status == 500
+    assert headers["Content-Type"] == api.JSON_MEDIA_TYPE
+    assert body == b'{"error": "Could not load dataset: positions"}'
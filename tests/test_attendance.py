@@ -0,0 +1,66 @@
+import datetime
+
+import pandas as pd
+
+from attendance import (
+    attendance_in_range,
+    build_attendance_bitsets,
+    co_attendance,
+    longest_absence_streaks,
+)
+
+SITTINGS = [datetime.date(2024, 1, day) for day in (2, 9, 16, 23)]
+
+
+def bitsets(rows):
+    return build_attendance_bitsets(
+        SITTINGS, [pd.DataFrame(rows, columns=["date", "member_name", "is_present"])]
+    )
+
+
+def test_attendance_on_dates_without_a_sitting_is_dropped():
+    attendance = attendance_in_range(
+        bitsets(
+            [
+                (datetime.date(2024, 1, 2), "A", True),
+                # between sittings, and after the last sitting
+                (datetime.date(2024, 1, 10), "A", False),
+                (datetime.date(2024, 2, 1), "A", False),
+            ]
+        )
+    )
+    assert attendance.to_dict("records") == [
+        {"member_name": "A", "count_sittings_attended": 1, "count_sittings_total": 1}
+    ]
+
+
+def test_co_attendance_in_a_period():
+    both = bitsets(
+        [(date, member, True) for date in SITTINGS for member in ("A", "B")]
+        + [(SITTINGS[3], "C", True)]
+    )
+    assert co_attendance(both, "A", "B") == (4, 4)
+    assert co_attendance(both, "A", "B", SITTINGS[1], SITTINGS[2]) == (2, 2)
+    assert co_attendance(both, "A", "C", SITTINGS[0], SITTINGS[2]) == (0, 0)
+
+
+def test_longest_absence_streaks_of_some_members():
+    attendance = bitsets(
+        [
+            (SITTINGS[0], "A", False),
+            (SITTINGS[1], "A", True),
+            (SITTINGS[2], "A", False),
+            (SITTINGS[3], "A", False),
+            # B was only a member for the last two sittings
+            (SITTINGS[2], "B", True),
+            (SITTINGS[3], "B", False),
+            (SITTINGS[0], "C", False),
+        ]
+    )
+    streaks = longest_absence_streaks(attendance, ["B", "A", "D"])
+
+    assert streaks["member_name"].tolist() == ["B", "A"]
+    assert streaks["longest_absence"].tolist() == [1, 2]
+    assert streaks.loc[1, "absence_from"] == pd.Timestamp(SITTINGS[2])
+    within = longest_absence_streaks(attendance, ["A"], SITTINGS[0], SITTINGS[1])
+    assert within["longest_absence"].tolist() == [1]
@@ -0,0 +1,53 @@
+import datetime
+
+import pytest
+
+import bills
+from bills import bills_query, get_bills_page
+
+
+@pytest.fixture
+def bill_rows(monkeypatch):
+    rows = []
+    monkeypatch.setattr(
+        bills, "run_parameterised_query", lambda query, parameters: rows
+    )
+    get_bills_page.clear()
+    yield rows
+    get_bills_page.clear()
+
+
+def bill(number, first_reading_date):
+    return {
+        "bill_number": number,
+        "title": f"Bill {number}",
+        "first_reading_date": first_reading_date,
+    }
+
+
+def test_cursor_keeps_the_date_type(bill_rows):
+    bill_rows += [
+        bill("2/2024", datetime.date(2024, 2, 1)),
+        bill("1/2024", datetime.date(2024, 1, 1)),
+    ]
+    _, cursor = get_bills_page("v1", limit=1)
+
+    assert cursor == (datetime.date(2024, 2, 1), "2/2024")
+    query, parameters = bills_query(after=cursor)
+    assert ("after_date", "DATE", datetime.date(2024, 2, 1)) in parameters
+
+
+def test_cursor_after_a_bill_without_first_reading_date(bill_rows):
+    bill_rows += [bill("9/2024", None), bill("8/2024", None)]
+    _, cursor = get_bills_page("v1", limit=1)
+
+    assert cursor == (None, "9/2024")
+    query, parameters = bills_query(after=cursor)
+    assert "first_reading_date is null and bill_number < @after_bill_number" in query
+    assert [name for name, _, _ in parameters] == ["limit", "after_bill_number"]
+
+
+def test_bills_without_first_reading_date_come_last():
+    query, _ = bills_query(after=(datetime.date(2024, 1, 1), "1/2024"))
+    assert "or first_reading_date is null" in query
+    assert "order by first_reading_date desc nulls last" in query
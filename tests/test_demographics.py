@@ -0,0 +1,41 @@
+import datetime
+
+import pandas as pd
+
+from demographics import assign_demographics, pivot_cube
+from members import MEMBER_COUNT_COLUMNS
+
+
+def test_members_with_unknown_details_are_still_counted():
+    speech_summary = pd.DataFrame(
+        {
+            "member_name": ["A", "B", "C"],
+            "member_party": ["P", None, "Q"],
+            "parliament": [14, 14, 14],
+            "year": [2024, 2024, 2024],
+            "month": [1, 1, 1],
+            **{column: [1, 1, 1] for column in MEMBER_COUNT_COLUMNS},
+        }
+    )
+    members = pd.DataFrame(
+        {
+            "member_name": ["A", "B", "C"],
+            "member_birth_year": [1970, None, 1980],
+            "earliest_sitting": [
+                datetime.date(2016, 1, 1),
+                datetime.date(2020, 1, 1),
+                None,
+            ],
+        }
+    )
+    positions = pd.DataFrame(
+        columns=["member_name", "type", "effective_from_date", "effective_to_date"]
+    )
+
+    labelled = assign_demographics(speech_summary, members, positions)
+    assert labelled["tenure_group"].tolist()[2] == "Unknown"
+    assert labelled["member_party"].tolist()[1] == "Unknown"
+
+    for field in ["member_party", "tenure_group", "age_group"]:
+        pivoted = pivot_cube(labelled, [field])
+        assert pivoted["count_sittings_total"].sum() == 3
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import exports
+from exports import (
+    MANIFEST_FILE,
+    get_exports,
+    mismatched_exports,
+    update_exports,
+    version_dir,
+    write_exports,
+)
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    tables = {
+        "members": pd.DataFrame({"member_name": ["A", "B"], "attendance": [90, 80]})
+    }
+    monkeypatch.setattr(exports, "export_tables", lambda: tables)
+    exports._read_exports.clear()
+    yield tables
+    exports._read_exports.clear()
+
+
+def test_rewrites_files_which_do_not_match_the_manifest(tmp_path, tables):
+    exports_dir = str(tmp_path)
+    manifest = write_exports("v1", exports_dir)
+    assert update_exports("v1", exports_dir) == (manifest, False)
+
+    path = os.path.join(version_dir("v1", exports_dir), "members.csv")
+    with open(path, "a") as file:
+        file.write("C,70\n")
+    assert mismatched_exports(manifest, exports_dir) == ["members.csv"]
+    assert get_exports("v1", exports_dir) is None
+
+    manifest, written = update_exports("v1", exports_dir)
+    assert written
+    assert mismatched_exports(manifest, exports_dir) == []
+
+
+def test_pages_never_write_exports(tmp_path, monkeypatch, tables):
+    def export_tables():
+        raise AssertionError("a page must not compute the exports")
+
+    monkeypatch.setattr(exports, "export_tables", export_tables)
+    assert get_exports("v1", str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_only_exports_of_older_versions_are_removed(tmp_path, tables):
+    exports_dir = str(tmp_path)
+    write_exports("v1", exports_dir)
+    (tmp_path / "notes").mkdir()
+    # another process writing a newer version, without its manifest yet
+    (tmp_path / "v3").mkdir()
+    newer = tmp_path / "v4"
+    newer.mkdir()
+    (newer / MANIFEST_FILE).write_text(
+        json.dumps({"data_version": "v4", "created_at": "9999-01-01T00:00:00+00:00"})
+    )
+
+    write_exports("v2", exports_dir)
+    assert sorted(os.listdir(exports_dir)) == ["notes", "v2", "v3", "v4"]
+    assert not [name for name in os.listdir(tmp_path / "v2") if name.endswith(".tmp")]
+
+
+def test_earlier_exports_are_served_until_the_new_version_is_written(tmp_path, tables):
+    exports_dir = str(tmp_path)
+    write_exports("v1", exports_dir)
+    assert get_exports("v2", exports_dir)["data_version"] == "v1"
+
+    write_exports("v2", exports_dir)
+    assert get_exports("v2", exports_dir)["data_version"] == "v2"
+
+
+def test_earlier_exports_which_do_not_match_are_skipped(tmp_path, tables):
+    exports_dir = str(tmp_path)
+    write_exports("v1", exports_dir)
+    with open(os.path.join(version_dir("v1", exports_dir), "members.csv"), "a") as file:
+        file.write("C,70\n")
+
+    assert get_exports("v2", exports_dir) is None
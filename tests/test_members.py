@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from members import aggregate_member_metrics
+from utils import calculate_readability, calculate_readability_vectorised
+
+
+def counts(rows):
+    return pd.DataFrame(
+        rows, columns=["count_words", "count_sentences", "count_syllables"]
+    )
+
+
+def test_vectorised_readability_matches_scalar():
+    rng = np.random.default_rng(0)
+    df = counts(rng.integers(0, 5000, size=(500, 3)))
+    # rows without words or without sentences
+    df.loc[:20, "count_words"] = 0
+    df.loc[20:40, "count_sentences"] = 0
+
+    expected = df.apply(calculate_readability, axis=1)
+    pd.testing.assert_series_equal(
+        calculate_readability_vectorised(df), expected, check_names=False
+    )
+
+
+def test_vectorised_readability_is_nan_without_words_or_sentences():
+    df = counts([[0, 10, 10], [100, 0, 150], [0, 0, 0], [100, 5, 150]])
+    readability = calculate_readability_vectorised(df)
+    assert readability.iloc[:3].isna().all()
+    assert readability.iloc[3] == 206.835 - 1.015 * 100 / 5 - 84.6 * 150 / 100
+
+
+def test_aggregate_member_metrics_readability():
+    summary = pd.DataFrame(
+        {
+            "member_name": ["A", "A", "B", "C"],
+            "count_sittings_total": [2, 2, 2, 2],
+            "count_sittings_attended": [2, 1, 2, 0],
+            "count_sittings_spoken": [1, 1, 0, 0],
+            "count_topics": [1, 1, 0, 0],
+            "count_pri_questions": [1, 0, 0, 0],
+            "count_speeches": [1, 1, 0, 0],
+            "count_words": [100, 200, 0, 0],
+            "count_sentences": [5, 10, 0, 0],
+            "count_syllables": [150, 250, 0, 0],
+        }
+    )
+    aggregated = aggregate_member_metrics(
+        summary, calculate_readability_vectorised, ["member_name"]
+    ).set_index("member_name")
+
+    # C attended no sittings, so is left out
+    assert list(aggregated.index) == ["A", "B"]
+    assert aggregated.loc["A", "readability"] == calculate_readability(
+        {"count_words": 300, "count_sentences": 15, "count_syllables": 400}
+    )
+    assert np.isnan(aggregated.loc["B", "readability"])
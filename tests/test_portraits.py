@@ -0,0 +1,97 @@
+import functools
+import http.server
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+import portraits
+from portraits import PORTRAIT_WIDTHS, cache_portrait, prefetch_portraits
+
+
+@pytest.fixture
+def image_host(tmp_path):
+    """
+    A local stand-in for the portrait host, serving a directory of images and
+    recording the paths requested.
+    """
+    root = tmp_path / "host"
+    root.mkdir()
+    Image.new("RGB", (400, 600), "red").save(root / "portrait.png")
+    Image.new("RGB", (400, 600), "red").save(root / "same_portrait.png")
+    Image.new("RGB", (80, 120), "blue").save(root / "small.jpg")
+    (root / "not_an_image.jpg").write_text("not an image")
+
+    requests = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            requests.append(self.path)
+
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(Handler, directory=str(root))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", requests
+    server.shutdown()
+
+
+def cached_files(cache_dir):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), cache_dir)
+        for directory, _, names in os.walk(cache_dir)
+        for name in names
+    )
+
+
+def test_prefetch_stores_each_portrait_once(image_host, tmp_path):
+    base, _ = image_host
+    cache_dir = str(tmp_path / "cache")
+    urls = [
+        f"{base}/portrait.png",
+        f"{base}/same_portrait.png",
+        f"{base}/small.jpg",
+        f"{base}/not_an_image.jpg",
+        f"{base}/missing.png",
+    ]
+
+    assert prefetch_portraits(urls, cache_dir) == 3
+
+    files = cached_files(cache_dir)
+    thumbnails = [name for name in files if name.endswith(".jpg")]
+    # the two identical portraits share their thumbnails
+    assert len(thumbnails) == 2 * len(PORTRAIT_WIDTHS)
+    assert not [name for name in files if name.endswith(".tmp")]
+    widths = {Image.open(os.path.join(cache_dir, name)).width for name in thumbnails}
+    assert widths == {80, *PORTRAIT_WIDTHS}
+
+
+def test_cached_portrait_is_not_downloaded_again(image_host, tmp_path):
+    base, requests = image_host
+    cache_dir = str(tmp_path / "cache")
+
+    content_hash = cache_portrait(f"{base}/portrait.png", cache_dir)
+    assert cache_portrait(f"{base}/portrait.png", cache_dir) == content_hash
+    assert requests.count("/portrait.png") == 1
+
+
+def test_failed_write_does_not_stop_the_batch(image_host, tmp_path, monkeypatch):
+    base, _ = image_host
+    cache_dir = str(tmp_path / "cache")
+    failing_key = portraits._url_key_path(f"{base}/small.jpg", cache_dir)
+    write_atomically = portraits._write_atomically
+
+    def fail_for_one_url(path, data):
+        if path == failing_key:
+            raise OSError("disk full")
+        write_atomically(path, data)
+
+    monkeypatch.setattr(portraits, "_write_atomically", fail_for_one_url)
+
+    urls = [f"{base}/portrait.png", f"{base}/small.jpg"]
+    assert prefetch_portraits(urls, cache_dir) == 1
+
+
+def test_unreachable_host(tmp_path):
+    assert cache_portrait("http://127.0.0.1:9/portrait.png", str(tmp_path), 1) is None
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from positions import (
+    build_position_index,
+    holders_on,
+    member_history,
+    member_positions_on,
+    member_term,
+)
+
+
+def position(member_name, member_position, effective_from_date, effective_to_date):
+    return {
+        "member_name": member_name,
+        "member_position": member_position,
+        "type": "constituency",
+        "effective_from_date": effective_from_date,
+        "effective_to_date": effective_to_date,
+        "is_latest_position": effective_to_date is None,
+    }
+
+
+def row_filter(positions, date, **equal):
+    """
+    The filter the pages used before the index: rows active on a date.
+    """
+    date = pd.Timestamp(date)
+    rows = positions[
+        (pd.to_datetime(positions["effective_from_date"]) <= date)
+        & (
+            positions["effective_to_date"].isna()
+            | (pd.to_datetime(positions["effective_to_date"]) >= date)
+        )
+    ]
+    for field, value in equal.items():
+        rows = rows[rows[field] == value]
+    return sorted(rows.index)
+
+
+def test_open_ended_and_same_day_boundaries():
+    positions = pd.DataFrame(
+        [
+            position("A", "X", "2020-01-01", "2020-06-30"),
+            # starts the day the previous term ends
+            position("B", "X", "2020-06-30", None),
+            # a single day
+            position("C", "Y", "2021-03-01", "2021-03-01"),
+            # cannot be placed in time, as the row filter never matches it
+            position("D", "Y", None, None),
+        ]
+    )
+    index = build_position_index(positions)
+
+    def holders(position_name, date):
+        return sorted(holders_on(index, position_name, date)["member_name"])
+
+    assert holders("X", "2019-12-31") == []
+    assert holders("X", "2020-01-01") == ["A"]
+    assert holders("X", "2020-06-30") == ["A", "B"]
+    assert holders("X", "2020-07-01") == ["B"]
+    assert holders("X", "2099-01-01") == ["B"]
+    assert holders("Y", "2021-02-28") == []
+    assert holders("Y", "2021-03-01") == ["C"]
+    assert holders("Y", "2021-03-02") == []
+    assert holders("Z", "2021-03-01") == []
+
+
+def test_overlapping_appointments():
+    positions = pd.DataFrame(
+        [
+            # a long appointment starting first, then shorter ones inside it
+            position("A", "Minister", "2010-01-01", "2020-12-31"),
+            position("A", "Whip", "2012-01-01", "2013-01-01"),
+            position("A", "Chair", "2014-01-01", None),
+            position("A", "Deputy", "2011-01-01", "2011-06-30"),
+        ]
+    )
+    index = build_position_index(positions)
+
+    def held(date):
+        return sorted(member_positions_on(index, "A", date)["member_position"])
+
+    assert held("2011-03-01") == ["Deputy", "Minister"]
+    assert held("2012-06-01") == ["Minister", "Whip"]
+    assert held("2013-06-01") == ["Minister"]
+    assert held("2021-01-01") == ["Chair"]
+    assert member_history(index, "A")["member_position"].tolist() == [
+        "Minister",
+        "Deputy",
+        "Whip",
+        "Chair",
+    ]
+
+
+def random_positions(seed=0, count_positions=400):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp("2000-01-01") + pd.to_timedelta(
+        rng.integers(0, 8000, count_positions), unit="D"
+    )
+    lengths = pd.to_timedelta(rng.integers(0, 3000, count_positions), unit="D")
+    ends = pd.Series(starts + lengths).dt.strftime("%Y-%m-%d")
+    ends[rng.random(count_positions) < 0.2] = None
+    return pd.DataFrame(
+        [
+            position(member_name, member_position, start, end)
+            for member_name, member_position, start, end in zip(
+                rng.choice(list("ABCDEFGH"), count_positions),
+                rng.choice(["X", "Y", "Z", "Minister", "Whip"], count_positions),
+                starts.strftime("%Y-%m-%d"),
+                ends,
+            )
+        ]
+    )
+
+
+def test_lookups_match_the_row_filter_on_random_dates():
+    positions = random_positions()
+    index = build_position_index(positions)
+    rng = np.random.default_rng(1)
+    dates = pd.Timestamp("1999-06-01") + pd.to_timedelta(
+        rng.integers(0, 12000, 100), unit="D"
+    )
+    # boundaries themselves, where off-by-one errors show
+    dates = dates.append(
+        pd.DatetimeIndex(positions["effective_from_date"][:30])
+    ).append(pd.DatetimeIndex(positions["effective_to_date"].dropna()[:30]))
+
+    for date in dates:
+        for position_name in ["X", "Y", "Z", "Minister", "Whip"]:
+            assert sorted(holders_on(index, position_name, date).index) == row_filter(
+                positions, date, member_position=position_name
+            )
+        for member_name in "ABCDEFGH":
+            assert sorted(
+                member_positions_on(index, member_name, date).index
+            ) == row_filter(positions, date, member_name=member_name)
+
+
+def test_member_term_matches_the_row_filter():
+    positions = random_positions().dropna(subset=["effective_to_date"])
+    index = build_position_index(positions)
+
+    for (member_name, position_name), rows in positions.groupby(
+        ["member_name", "member_position"]
+    ):
+        assert member_term(index, member_name, position_name) == (
+            rows["effective_from_date"].min(),
+            rows["effective_to_date"].max(),
+        )
@@ -0,0 +1,34 @@
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+def page():
+    import threading
+    from concurrent.futures import Future
+
+    import streamlit as st
+
+    from progressive import Section, load_concurrently, placeholder, render_when_ready
+
+    started = st.session_state.setdefault("started", [])
+    # a slow loader nothing on the page needs
+    unneeded = Future()
+    threading.Timer(5, unneeded.set_result, [None]).start()
+    data = {"unneeded": unneeded}
+    data.update(load_concurrently({"needed": lambda: started.append("needed") or 42}))
+    render_when_ready(
+        data,
+        [Section(placeholder("answer"), ("needed",), lambda value: st.markdown(value))],
+    )
+
+
+def test_only_needed_loaders_are_waited_on():
+    at = AppTest.from_function(page, default_timeout=10)
+    started_at = time.monotonic()
+    at.run()
+
+    assert time.monotonic() - started_at < 4
+    assert not at.exception
+    assert [markdown.value for markdown in at.markdown] == ["42"]
+    assert at.session_state["started"] == ["needed"]
@@ -0,0 +1,158 @@
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from google.cloud import bigquery
+
+import utils
+from utils import (
+    QueryBudgetExceeded,
+    run_query,
+    guarded_query,
+    merge_query_costs,
+    run_parameterised_query,
+    save_query_costs,
+)
+
+
+class FakeBigQuery:
+    """
+    Local stand-in for `bigquery.Client` that records the job configuration
+    of each query run.
+    """
+
+    def __init__(self, estimated_bytes=1000):
+        self.estimated_bytes = estimated_bytes
+        self.job_configs = []
+
+    def query(self, query, job_config=None):
+        if job_config is not None and job_config.dry_run:
+            return SimpleNamespace(total_bytes_processed=self.estimated_bytes)
+        self.job_configs.append(job_config)
+        return SimpleNamespace(
+            result=lambda: [{"query": query}], total_bytes_billed=self.estimated_bytes
+        )
+
+
+@pytest.fixture(autouse=True)
+def isolated_ledger(monkeypatch, tmp_path):
+    # the query cost ledger is written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(utils, "_query_costs", {})
+    monkeypatch.setattr(utils, "_unsaved_costs", {})
+    monkeypatch.setattr(utils, "_hourly_usage", [])
+    monkeypatch.setattr(utils, "_stale_results", OrderedDict())
+
+
+def test_keeps_the_lower_maximum_bytes_billed():
+    fake = FakeBigQuery()
+    job_config = bigquery.QueryJobConfig(maximum_bytes_billed=5000)
+    guarded_query("select 1", job_config=job_config, bigquery_client=fake)
+
+    assert fake.job_configs[0].maximum_bytes_billed == 5000
+    assert fake.job_configs[0] is not job_config
+
+
+def test_caps_maximum_bytes_billed_at_the_query_budget():
+    fake = FakeBigQuery()
+    job_config = bigquery.QueryJobConfig(
+        maximum_bytes_billed=utils.MAX_BYTES_PER_QUERY * 2
+    )
+    guarded_query("select 1", job_config=job_config, bigquery_client=fake)
+    guarded_query("select 2", bigquery_client=fake)
+
+    assert [config.maximum_bytes_billed for config in fake.job_configs] == [
+        utils.MAX_BYTES_PER_QUERY
+    ] * 2
+    assert job_config.maximum_bytes_billed == utils.MAX_BYTES_PER_QUERY * 2
+
+
+def test_ledger_is_only_written_when_saved(tmp_path):
+    fake = FakeBigQuery()
+    guarded_query("select 1", bigquery_client=fake)
+    assert not (tmp_path / utils.QUERY_COSTS_PATH).exists()
+
+    save_query_costs()
+    ledger = json.loads((tmp_path / utils.QUERY_COSTS_PATH).read_text())
+    assert ledger["select 1"]["runs"] == 1
+    assert ledger["select 1"]["bytes_billed"] == 1000
+
+
+def test_saving_adds_to_counts_written_by_other_processes(tmp_path):
+    path = tmp_path / utils.QUERY_COSTS_PATH
+    path.parent.mkdir()
+    path.write_text(
+        json.dumps(
+            {
+                "select 1": {
+                    "estimated_bytes": 900,
+                    "runs": 3,
+                    "bytes_billed": 2700,
+                    "refused": 1,
+                    "served_stale": 0,
+                    "last_run": "2024-01-01T00:00:00",
+                },
+                "select 2": {"estimated_bytes": 10, "runs": 1, "bytes_billed": 10},
+            }
+        )
+    )
+    fake = FakeBigQuery()
+    guarded_query("select 1", bigquery_client=fake)
+    save_query_costs()
+    # nothing new to add, so saving again changes nothing
+    save_query_costs()
+
+    ledger = json.loads(path.read_text())
+    assert ledger["select 1"]["runs"] == 4
+    assert ledger["select 1"]["bytes_billed"] == 3700
+    assert ledger["select 1"]["refused"] == 1
+    assert ledger["select 1"]["estimated_bytes"] == 1000
+    assert ledger["select 1"]["last_run"] > "2024-01-01T00:00:00"
+    assert ledger["select 2"]["runs"] == 1
+
+
+def test_merge_keeps_the_ledger_estimate_when_none_was_made():
+    ledger = {"q": {"estimated_bytes": 5, "runs": 1, "bytes_billed": 5}}
+    change = {
+        "estimated_bytes": None,
+        "runs": 0,
+        "bytes_billed": 0,
+        "refused": 0,
+        "served_stale": 1,
+        "last_run": None,
+    }
+    merged = merge_query_costs(ledger, {"q": change})
+
+    assert merged["q"]["estimated_bytes"] == 5
+    assert merged["q"]["served_stale"] == 1
+    assert merged["q"]["runs"] == 1
+
+
+def test_stale_results_are_bounded(monkeypatch):
+    monkeypatch.setattr(utils, "client", FakeBigQuery())
+    monkeypatch.setattr(utils, "STALE_RESULTS_MAX_ROWS", 2)
+    utils._run_query.clear()
+    for i in range(4):
+        run_query(f"select {i}")
+    utils._run_query.clear()
+
+    assert list(utils._stale_results) == ["select 2", "select 3"]
+
+
+def test_parameterised_queries_over_budget_serve_their_last_result(monkeypatch):
+    fake = FakeBigQuery()
+    monkeypatch.setattr(utils, "client", fake)
+    parameters = (("limit", "INT64", 10),)
+    rows = run_parameterised_query("select @limit", parameters)
+
+    monkeypatch.setattr(utils, "MAX_BYTES_PER_QUERY", 500)
+    assert run_parameterised_query("select @limit", parameters) == rows
+    with pytest.raises(QueryBudgetExceeded):
+        run_parameterised_query("select @limit", (("limit", "INT64", 20),))
+    [cost] = [
+        cost
+        for key, cost in utils._query_costs.items()
+        if key.startswith("select @limit") and '"10"' in key
+    ]
+    assert cost["served_stale"] == 1
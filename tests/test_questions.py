@@ -0,0 +1,44 @@
+import pandas as pd
+
+from questions import (
+    build_question_matrix,
+    member_question_profile,
+    ministry_leaderboard,
+    ministry_totals,
+)
+
+
+def question_matrix():
+    return build_question_matrix(
+        pd.DataFrame(
+            {
+                "member_name": ["A", "A", "B", "B", None],
+                "ministry_addressed": ["Health", "Transport"] + ["Health"] * 3,
+                "count_pri_questions": [3, 1, 2, 2, 9],
+            }
+        )
+    )
+
+
+def test_totals_are_kept_with_the_matrix():
+    matrix = question_matrix()
+    assert matrix.member_totals.tolist() == [4, 4]
+    assert matrix.ministry_totals.tolist() == [7, 1]
+    assert ministry_totals(matrix)["proportion_of_questions"].tolist() == [7 / 8, 1 / 8]
+
+
+def test_member_question_profile():
+    profile = member_question_profile(question_matrix(), "A").set_index(
+        "ministry_addressed"
+    )
+    assert profile["count_pri_questions"].tolist() == [3, 1]
+    assert profile["expected_pri_questions"].tolist() == [3.5, 0.5]
+    assert profile["share_of_ministry"].tolist() == [3 / 7, 1.0]
+    assert member_question_profile(question_matrix(), "C").empty
+
+
+def test_ministry_leaderboard():
+    leaderboard = ministry_leaderboard(question_matrix(), "Transport")
+    assert leaderboard.to_dict("records") == [
+        {"member_name": "A", "count_pri_questions": 1, "expected_pri_questions": 0.5}
+    ]
@@ -0,0 +1,15 @@
+from reports import report_filename
+
+
+def test_names_which_slugify_alike_get_different_files():
+    names = ["Tan Chuan-Jin", "Tan Chuan Jin", "tan chuan jin", "Tan Chuan-Jin."]
+    filenames = {report_filename("member", name) for name in names}
+
+    assert len(filenames) == len(names)
+    assert all(name.startswith("member-tan-chuan-jin-") for name in filenames)
+
+
+def test_filename_is_stable():
+    assert report_filename("constituency", "Aljunied") == report_filename(
+        "constituency", "Aljunied"
+    )
@@ -0,0 +1,96 @@
+from search import MAX_PREFIX_LENGTH, build_search_index, normalise, search
+
+ENTRIES = [
+    ("member", "Tan See Leng"),
+    ("member", "Tan Chuan-Jin"),
+    ("member", "Dr. Koh Poh Koon"),
+    ("member", "Leong Mun Wai"),
+    ("constituency", "Tanjong Pagar"),
+    ("constituency", "Marine Parade"),
+    ("bill", "Tan Tock Seng Hospital Bill"),
+    ("bill", "Public Transport Council (Amendment) Bill"),
+    ("topic", "Transport Fares"),
+    ("topic", "Tanjong Pagar Terminal"),
+    # duplicates from the member list are dropped
+    ("member", "Tan See Leng"),
+]
+
+
+def labels(results):
+    return [label for _, label in results]
+
+
+def test_normalise_drops_punctuation_accents_and_honorifics():
+    assert normalise("Dr. Tan See-Leng") == ("tan", "see", "leng")
+    assert normalise("Mdm Halimah's") == ("halimahs",)
+    assert normalise("Café  Ng") == ("cafe", "ng")
+    assert normalise("Mr. Dr.") == ()
+
+
+def test_build_search_index_ranks_by_kind_then_length():
+    index = build_search_index(ENTRIES)
+
+    assert len(index.labels) == len(ENTRIES) - 1
+    assert index.kinds == sorted(
+        index.kinds, key=["member", "constituency", "bill", "topic"].index
+    )
+    # postings are in rank order, so the walk in `search` can stop early
+    for entry_ids in index.prefixes.values():
+        assert entry_ids == sorted(entry_ids)
+    # bill and topic titles are not in the trigram index
+    fuzzy_ids = {entry_id for ids in index.trigrams.values() for entry_id in ids}
+    assert {index.kinds[entry_id] for entry_id in fuzzy_ids} == {
+        "member",
+        "constituency",
+    }
+
+
+def test_every_query_token_must_prefix_some_entry_token():
+    index = build_search_index(ENTRIES)
+
+    assert labels(search(index, "tan")) == [
+        "Tan See Leng",
+        "Tan Chuan-Jin",
+        "Tanjong Pagar",
+        "Tan Tock Seng Hospital Bill",
+        "Tanjong Pagar Terminal",
+    ]
+    assert labels(search(index, "tan se")) == [
+        "Tan See Leng",
+        "Tan Tock Seng Hospital Bill",
+    ]
+    # in any order, and ignoring honorifics in the query
+    assert labels(search(index, "Dr leng tan"))[0] == "Tan See Leng"
+    assert labels(search(index, "transport")) == [
+        "Public Transport Council (Amendment) Bill",
+        "Transport Fares",
+    ]
+    assert labels(search(index, "tan", limit=2)) == ["Tan See Leng", "Tan Chuan-Jin"]
+
+
+def test_query_tokens_longer_than_the_indexed_prefixes_are_verified():
+    index = build_search_index(ENTRIES)
+    assert len("terminal") == MAX_PREFIX_LENGTH
+
+    assert labels(search(index, "terminals")) == []
+    assert labels(search(index, "transporting")) == []
+    assert labels(search(index, "terminal")) == ["Tanjong Pagar Terminal"]
+
+
+def test_empty_queries_find_nothing():
+    index = build_search_index(ENTRIES)
+
+    for query in ["", "   ", "!?", "Mr.", "Dr Mdm"]:
+        assert search(index, query) == []
+    assert search(build_search_index([]), "tan") == []
+
+
+def test_misspelt_members_and_constituencies_follow_prefix_matches():
+    index = build_search_index(ENTRIES)
+
+    assert labels(search(index, "leong mun wei")) == ["Leong Mun Wai"]
+    assert labels(search(index, "marin parade")) == ["Marine Parade"]
+    # misspelt bill titles are not matched by spelling
+    assert labels(search(index, "hospitl")) == []
+    results = search(index, "koh poh kon")
+    assert results == [("member", "Dr. Koh Poh Koon")]
@@ -0,0 +1,18 @@
+import numpy as np
+
+from similarity import top_k_similar
+
+
+def test_members_without_a_vector_have_no_similar_members():
+    member_names = np.array(["A", "B", "C", "D"])
+    vectors = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 0.0], [0.0, 1.0]])
+
+    similar = top_k_similar(member_names, vectors, k=3)
+
+    assert "C" not in set(similar["member_name"])
+    assert "C" not in set(similar["similar_member_name"])
+    assert similar[similar["member_name"] == "B"]["similar_member_name"].tolist() == [
+        "D",
+        "A",
+    ]
+    assert similar[similar["member_name"] == "A"]["rank"].tolist() == [1, 2]
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import sketches as sketches_module
+from sketches import (
+    build_speech_sketches,
+    get_speech_sketches,
+    load_speech_sketches,
+    quantiles_by,
+    save_speech_sketches,
+)
+
+
+def speeches():
+    return pd.DataFrame(
+        {
+            "member_name": ["A", "B", "A"],
+            "member_party": ["P", None, "P"],
+            "year": [2020, 2021, 2021],
+            "count_words": [100, 200, 300],
+            "count_sentences": [5, 10, 15],
+            "count_syllables": [150, 300, 450],
+        }
+    )
+
+
+def test_saved_sketches_load_without_pickle(tmp_path):
+    path = str(tmp_path / "sketches.npz")
+    sketches = build_speech_sketches([speeches()])
+    save_speech_sketches(sketches, "v1", path)
+
+    assert os.listdir(tmp_path) == ["sketches.npz"]
+    loaded = load_speech_sketches(path, "v1")
+    assert loaded.keys.astype(str).equals(sketches.keys.astype(str))
+    for metric, counts in sketches.counts.items():
+        np.testing.assert_array_equal(loaded.counts[metric], counts)
+    assert load_speech_sketches(path, "v2") is None
+
+
+def test_sketches_with_pickled_keys_are_rebuilt(tmp_path):
+    path = str(tmp_path / "sketches.npz")
+    np.savez_compressed(
+        path,
+        data_version=np.array("v1"),
+        key_member_name=np.array(["A"], dtype=object),
+    )
+    assert load_speech_sketches(path, "v1") is None
+
+
+def test_quantiles_by_default_quantiles():
+    sketches = build_speech_sketches([speeches()])
+    by_member = quantiles_by(sketches, "count_words", ["member_name"])
+    assert list(by_member.columns) == [
+        "member_name",
+        "count_speeches",
+        "p25",
+        "p50",
+        "p75",
+    ]
+    assert by_member["count_speeches"].tolist() == [2, 1]
+
+
+def test_loaded_counts_are_read_only(tmp_path):
+    path = str(tmp_path / "sketches.npz")
+    save_speech_sketches(build_speech_sketches([speeches()]), "v1", path)
+
+    loaded = load_speech_sketches(path)
+    assert not any(counts.flags.writeable for counts in loaded.counts.values())
+
+
+def test_pages_serve_the_last_built_sketches(tmp_path, monkeypatch):
+    def stream_query(*args, **kwargs):
+        raise AssertionError("the page must not scan mart_speeches")
+
+    monkeypatch.setattr(sketches_module, "stream_query", stream_query)
+    sketches_module._read_speech_sketches.clear()
+    path = str(tmp_path / "sketches.npz")
+    assert get_speech_sketches(path) is None
+
+    save_speech_sketches(build_speech_sketches([speeches()]), "v1", path)
+    loaded, data_version = get_speech_sketches(path)
+    assert data_version == "v1"
+    assert len(loaded.keys) == 3
@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+import speeches
+from speeches import latest_indexed_date, search_speeches, update_speech_index
+
+
+def speech(number, member_name, date, text, topic_title="Housing"):
+    return {
+        "speech_id": f"speech-{number}",
+        "date": date,
+        "parliament": 14,
+        "member_name": member_name,
+        "topic_id": "topic-1",
+        "topic_title": topic_title,
+        "text": text,
+    }
+
+
+SPEECHES = [
+    speech(1, "A", "2021-01-05", "housing grants"),
+    speech(2, "B", "2021-02-01", "housing housing housing grants for couples"),
+    speech(3, "A", "2021-03-01", "transport fares", topic_title="Transport"),
+    *[
+        speech(4 + i, "C", f"2021-04-{i + 1:02d}", "housing and more housing")
+        for i in range(7)
+    ],
+]
+
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    def stream_query(query, batch_size):
+        rows = pd.DataFrame(SPEECHES)
+        for start in range(0, len(rows), batch_size):
+            yield rows.iloc[start : start + batch_size], None
+
+    monkeypatch.setattr(speeches, "stream_query", stream_query)
+    path = str(tmp_path / "speech_index.sqlite")
+    update_speech_index(path, batch_size=4)
+    return path
+
+
+def test_index_is_built_from_batches(index_path):
+    assert latest_indexed_date(index_path) == "2021-04-07"
+    results, _ = search_speeches("fares", path=index_path)
+    assert results["speech_id"].tolist() == ["speech-3"]
+
+
+def test_missing_index_is_not_built_by_pages(tmp_path):
+    assert latest_indexed_date(str(tmp_path / "speech_index.sqlite")) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_results_are_in_bm25_order(index_path):
+    results, _ = search_speeches("housing", limit=20, path=index_path)
+
+    assert results["score"].is_monotonic_increasing
+    # bm25 scores are negative, the most relevant lowest
+    assert results["speech_id"].iloc[0] == "speech-2"
+    assert "speech-3" not in results["speech_id"].tolist()
+
+
+def test_pages_have_no_gaps_or_duplicates(index_path):
+    everything, _ = search_speeches("housing", limit=20, path=index_path)
+    paged, cursor = [], None
+    while True:
+        page, cursor = search_speeches(
+            "housing", after=cursor, limit=3, path=index_path
+        )
+        paged += page["speech_id"].tolist()
+        if cursor is None:
+            break
+
+    assert paged == everything["speech_id"].tolist()
+    assert len(paged) == len(set(paged)) == 9
+
+
+def test_member_and_date_filters(index_path):
+    by_member, _ = search_speeches("housing", member_names=["A", "B"], path=index_path)
+    assert sorted(by_member["speech_id"]) == ["speech-1", "speech-2"]
+
+    in_range, _ = search_speeches(
+        "housing", start_date="2021-02-01", end_date="2021-04-02", path=index_path
+    )
+    assert sorted(in_range["speech_id"]) == ["speech-2", "speech-4", "speech-5"]
+
+
+def test_reindexing_replaces_speeches(index_path):
+    update_speech_index(index_path, batch_size=4)
+    results, _ = search_speeches("housing", limit=20, path=index_path)
+    assert len(results) == 9
@@ -0,0 +1,168 @@
+from types import SimpleNamespace
+
+import pytest
+
+import utils
+from utils import stream_query
+
+
+class FakeRow(tuple):
+    def values(self):
+        return self
+
+
+class FakePage(list):
+    @property
+    def num_items(self):
+        return len(self)
+
+
+class FakeRowIterator:
+    """
+    Pages through a result like `google.cloud.bigquery.table.RowIterator`,
+    fetching each page only when it is iterated to.
+    """
+
+    def __init__(self, backend, rows, page_size, page_token):
+        self.backend = backend
+        self.rows = rows
+        self.page_size = page_size
+        self.start = int(page_token or 0)
+        self.next_page_token = page_token
+        self.schema = [SimpleNamespace(name=name) for name in backend.columns]
+
+    @property
+    def pages(self):
+        start = self.start
+        while start < len(self.rows):
+            page = self.rows[start : start + self.page_size]
+            start += len(page)
+            self.backend.pages_fetched += 1
+            self.next_page_token = str(start) if start < len(self.rows) else None
+            yield FakePage(page)
+
+
+class FakeBigQuery:
+    """
+    Local stand-in for `bigquery.Client`. Every query gets a new destination
+    table, as BigQuery's anonymous result tables do.
+    """
+
+    def __init__(self, columns, rows, max_page_size=None):
+        self.columns = columns
+        self.rows = [FakeRow(row) for row in rows]
+        self.max_page_size = max_page_size
+        self.results = {}
+        self.queries_run = 0
+        self.pages_fetched = 0
+
+    def query(self, query, job_config=None):
+        if job_config is not None and job_config.dry_run:
+            return SimpleNamespace(total_bytes_processed=1000)
+        self.queries_run += 1
+        destination = f"anonymous.result_{self.queries_run}"
+        self.results[destination] = list(self.rows)
+        return SimpleNamespace(
+            destination=destination, result=lambda: None, total_bytes_billed=1000
+        )
+
+    def list_rows(self, destination, page_size=None, page_token=None):
+        if destination not in self.results:
+            raise KeyError(f"Not found: {destination}")
+        if self.max_page_size:
+            page_size = min(page_size, self.max_page_size)
+        return FakeRowIterator(self, self.results[destination], page_size, page_token)
+
+
+@pytest.fixture(autouse=True)
+def isolated_ledger(monkeypatch, tmp_path):
+    # the query cost ledger is written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(utils, "_query_costs", {})
+    monkeypatch.setattr(utils, "_unsaved_costs", {})
+    monkeypatch.setattr(utils, "_hourly_usage", [])
+
+
+def backend(count_rows=25, **kwargs):
+    return FakeBigQuery(
+        ["id", "name"], [(i, f"speech {i}") for i in range(count_rows)], **kwargs
+    )
+
+
+def test_streams_every_row_in_batches():
+    fake = backend()
+    batches = [batch for batch, _ in stream_query("select", 10, bigquery_client=fake)]
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert list(batches[0].columns) == ["id", "name"]
+    assert [i for batch in batches for i in batch["id"]] == list(range(25))
+
+
+def test_batches_never_exceed_batch_size_when_pages_are_smaller():
+    fake = backend(max_page_size=4)
+    batches = [batch for batch, _ in stream_query("select", 10, bigquery_client=fake)]
+
+    assert max(len(batch) for batch in batches) <= 10
+    assert sum(len(batch) for batch in batches) == 25
+
+
+def test_pages_are_fetched_as_batches_are_consumed():
+    fake = backend()
+    stream = stream_query("select", 10, bigquery_client=fake)
+
+    next(stream)
+    assert fake.pages_fetched == 1
+    next(stream)
+    assert fake.pages_fetched == 2
+
+
+def test_resumes_from_the_same_result_without_rerunning_the_query():
+    fake = backend()
+    stream = stream_query("select", 10, bigquery_client=fake)
+    first, position = next(stream)
+    stream.close()
+
+    # the result of a later run lands in another table, and must not be read
+    fake.query("select")
+    resumed = list(
+        stream_query("select", 10, resume_from=position, bigquery_client=fake)
+    )
+
+    assert fake.queries_run == 2
+    assert position.destination == "anonymous.result_1"
+    assert [i for batch, _ in resumed for i in batch["id"]] == list(range(10, 25))
+    assert resumed[-1][1].page_token is None
+
+
+def test_resuming_after_the_last_batch_yields_nothing():
+    fake = backend()
+    *_, (_, last_position) = stream_query("select", 10, bigquery_client=fake)
+
+    assert last_position.page_token is None
+    resumed = stream_query("select", resume_from=last_position, bigquery_client=fake)
+    assert list(resumed) == []
+
+
+def test_empty_result():
+    fake = backend(count_rows=0)
+    assert list(stream_query("select", 10, bigquery_client=fake)) == []
+
+
+def test_resuming_mid_stream_neither_repeats_nor_skips_rows():
+    fake = backend(max_page_size=4)
+    stream = stream_query("select", 10, bigquery_client=fake)
+    ids = []
+    for _ in range(2):
+        batch, position = next(stream)
+        ids += batch["id"].tolist()
+    stream.close()
+
+    # resume one batch at a time, as a consumer restarting after each would
+    while position.page_token is not None:
+        stream = stream_query("select", 10, resume_from=position, bigquery_client=fake)
+        batch, position = next(stream)
+        stream.close()
+        ids += batch["id"].tolist()
+
+    assert ids == list(range(25))
+    assert fake.queries_run == 1
@@ -0,0 +1,262 @@
+import json
+import os
+import re
+
+import pandas as pd
+import pytest
+
+import sync
+from sync import read_dataset, sync_datasets, year_month_lookback
+
+
+class FakeWarehouse:
+    """
+    Local stand-in for the tables `sync` queries, answering each query with the
+    rows its where clause selects. Only the filters the sync builds are understood.
+    """
+
+    def __init__(self):
+        self.members = pd.DataFrame(
+            {
+                "member_name": ["A", "B"],
+                "member_birth_year": [1970, 1980],
+                "member_image_link": ["a.jpg", "b.jpg"],
+                "constituency": ["X", "Y"],
+                "party": ["P", "Q"],
+                "earliest_sitting": ["2020-01-06", "2020-01-06"],
+                "latest_sitting": ["2023-12-04", "2024-02-05"],
+                "count_sittings_present": [10, 20],
+                "count_sittings_total": [12, 20],
+                "is_active": [False, True],
+            }
+        )
+        self.positions = pd.DataFrame(
+            {
+                "member_name": ["A", "B"],
+                "member_position": ["Minister", "Speaker"],
+                "type": ["ministry", "parliament"],
+                "effective_from_date": ["2020-01-06", "2020-01-06"],
+                "effective_to_date": ["2023-01-01", None],
+                "is_latest_position": [True, True],
+            }
+        )
+        self.speeches = pd.DataFrame(
+            [
+                speech_metrics("A", 2023, 1, 5),
+                speech_metrics("A", 2023, 11, 6),
+                speech_metrics("B", 2024, 1, 7),
+                speech_metrics("B", 2024, 2, 8),
+            ]
+        )
+        self.topics = pd.DataFrame(
+            [
+                topic_counts("Housing", "A", 2023, 1, 2),
+                topic_counts("Housing", None, 2023, 1, 2),
+                topic_counts("Transport", "B", 2024, 2, 3),
+                topic_counts("Transport", None, 2024, 2, 3),
+            ]
+        )
+        self.queries = []
+
+    def fetch_delta(self, query):
+        self.queries.append(query)
+        if "dim_members" in query:
+            rows = self.members
+            since = re.search(r"latest_sitting >= '([\d-]+)'", query)
+            if since:
+                rows = rows[rows["latest_sitting"] >= since.group(1)]
+        elif "fact_member_positions" in query:
+            rows = self.positions
+            since = re.search(r"effective_from_date >= '([\d-]+)'", query)
+            if since:
+                date = since.group(1)
+                changed = rows[
+                    (rows["effective_from_date"] >= date)
+                    | rows["effective_to_date"].isna()
+                    | (rows["effective_to_date"] >= date)
+                ]
+                rows = rows[rows["member_name"].isin(changed["member_name"])]
+        elif "agg_speech_metrics_by_member" in query:
+            rows = self.speeches
+            since = re.search(r"year \* 100 \+ month >= (\d+)", query)
+            if since:
+                rows = rows[rows["year"] * 100 + rows["month"] >= int(since.group(1))]
+        elif "mart_speeches" in query:
+            rows = self.topics
+            since = re.search(r"date >= date\((\d+), (\d+), 1\)", query)
+            if since:
+                year_month = int(since.group(1)) * 100 + int(since.group(2))
+                rows = rows[rows["year"] * 100 + rows["month"] >= year_month]
+        else:
+            raise AssertionError(f"unexpected query: {query}")
+        rows = rows.reset_index(drop=True).copy()
+        return rows, {"rows": len(rows), "bytes_processed": 100, "bytes_billed": 100}
+
+
+def speech_metrics(member_name, year, month, count_speeches):
+    return {
+        "parliament": 14,
+        "year": year,
+        "month": month,
+        "member_name": member_name,
+        "member_party": "P",
+        "member_constituency": "X",
+        "count_sittings_total": 4,
+        "count_sittings_attended": 4,
+        "count_sittings_spoken": 2,
+        "count_topics": 2,
+        "count_pri_questions": 1,
+        "count_speeches": count_speeches,
+        "count_words": 1000,
+        "count_sentences": 50,
+        "count_syllables": 1500,
+    }
+
+
+def topic_counts(topic_title, member_name, year, month, count_speeches):
+    return {
+        "topic_title": topic_title,
+        "member_name": member_name,
+        "year": year,
+        "month": month,
+        "all_members": member_name is None,
+        "count_topics": 1,
+        "count_speeches": count_speeches,
+    }
+
+
+@pytest.fixture
+def warehouse(monkeypatch):
+    warehouse = FakeWarehouse()
+    monkeypatch.setattr(sync, "fetch_delta", warehouse.fetch_delta)
+    return warehouse
+
+
+def read_state(sync_dir):
+    with open(os.path.join(sync_dir, "state.json")) as f:
+        return json.load(f)
+
+
+def speech_counts(sync_dir):
+    speeches = read_dataset("member_speeches", sync_dir)
+    return sorted(
+        zip(
+            speeches["member_name"],
+            speeches["year"] * 100 + speeches["month"],
+            speeches["count_speeches"],
+        )
+    )
+
+
+def test_year_month_lookback():
+    assert year_month_lookback(202402, 3) == 202311
+    assert year_month_lookback(202412, 12) == 202312
+    assert year_month_lookback(202401, 1) == 202312
+
+
+def test_first_sync_fetches_everything(tmp_path, warehouse):
+    sync_dir = str(tmp_path)
+    entry = sync_datasets(sync_dir)
+
+    assert entry["full"]
+    assert all(
+        "latest_sitting >=" not in query and "month >=" not in query
+        for query in warehouse.queries
+    )
+    assert len(read_dataset("member_list", sync_dir)) == 2
+    assert len(read_dataset("member_positions", sync_dir)) == 2
+    assert len(read_dataset("topic_rollup", sync_dir)) == 4
+    assert read_state(sync_dir)["high_water_marks"] == {
+        "latest_sitting": "2024-02-05",
+        "latest_year_month": 202402,
+    }
+
+
+def test_incremental_sync_fetches_from_the_high_water_marks(tmp_path, warehouse):
+    sync_dir = str(tmp_path)
+    sync_datasets(sync_dir)
+    warehouse.queries.clear()
+    warehouse.speeches = pd.concat(
+        [warehouse.speeches, pd.DataFrame([speech_metrics("B", 2024, 3, 9)])],
+        ignore_index=True,
+    )
+    warehouse.members.loc[1, "latest_sitting"] = "2024-03-04"
+
+    entry = sync_datasets(sync_dir)
+
+    assert not entry["full"]
+    assert entry["since_sitting"] == "2024-02-05"
+    # SYNC_LOOKBACK_MONTHS before the latest synced month
+    assert entry["since_year_month"] == 202311
+    assert entry["datasets"]["member_speeches"]["rows"] == 4
+    assert entry["datasets"]["member_list"]["rows"] == 1
+    assert speech_counts(sync_dir) == [
+        ("A", 202301, 5),
+        ("A", 202311, 6),
+        ("B", 202401, 7),
+        ("B", 202402, 8),
+        ("B", 202403, 9),
+    ]
+    members = read_dataset("member_list", sync_dir)
+    assert sorted(members["member_name"]) == ["A", "B"]
+    assert members.set_index("member_name")["is_active"].to_dict() == {
+        "A": False,
+        "B": True,
+    }
+    assert read_state(sync_dir)["high_water_marks"]["latest_year_month"] == 202403
+
+
+def test_restated_months_replace_synced_rows(tmp_path, warehouse):
+    sync_dir = str(tmp_path)
+    sync_datasets(sync_dir)
+    speeches = warehouse.speeches
+    # restated within the lookback, and outside it
+    speeches.loc[speeches["month"] == 11, "count_speeches"] = 60
+    speeches.loc[
+        (speeches["year"] == 2023) & (speeches["month"] == 1), "count_speeches"
+    ] = 50
+    warehouse.topics.loc[2:3, "count_speeches"] = 30
+
+    sync_datasets(sync_dir)
+
+    assert speech_counts(sync_dir) == [
+        ("A", 202301, 5),
+        ("A", 202311, 60),
+        ("B", 202401, 7),
+        ("B", 202402, 8),
+    ]
+    rollup = read_dataset("topic_rollup", sync_dir)
+    assert len(rollup) == 4
+    assert rollup.loc[
+        rollup["topic_title"] == "Transport", "count_speeches"
+    ].tolist() == [
+        30,
+        30,
+    ]
+
+
+def test_interrupted_write_keeps_the_previous_files(tmp_path, warehouse, monkeypatch):
+    sync_dir = str(tmp_path)
+    sync_datasets(sync_dir)
+    state = read_state(sync_dir)
+    warehouse.speeches.loc[3, "count_speeches"] = 80
+    warehouse.members.loc[1, "latest_sitting"] = "2024-03-04"
+
+    to_parquet = pd.DataFrame.to_parquet
+
+    def interrupted_to_parquet(self, path, *args, **kwargs):
+        if "topic_title" in self.columns:
+            with open(path, "wb") as f:
+                f.write(b"partial")
+            raise OSError("disk full")
+        return to_parquet(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", interrupted_to_parquet)
+    with pytest.raises(OSError):
+        sync_datasets(sync_dir)
+
+    assert len(read_dataset("topic_rollup", sync_dir)) == 4
+    assert not [name for name in os.listdir(sync_dir) if name.endswith(".tmp")]
+    # the member list and high-water marks only move once everything is written
+    assert read_dataset("member_list", sync_dir)["latest_sitting"].max() == "2024-02-05"
+    assert read_state(sync_dir) == state
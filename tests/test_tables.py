@@ -0,0 +1,101 @@
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from tables import find_member_page, get_page, sort_and_filter
+
+
+def member_table(count_rows=45):
+    return pd.DataFrame(
+        {
+            "Member Name": [f"Member {i:02d}" for i in range(count_rows)],
+            "Party": ["P" if i % 9 else "Q" for i in range(count_rows)],
+            "Constituency": [f"C{i % 3}" for i in range(count_rows)],
+            "Speeches": [i % 7 for i in range(count_rows)],
+        }
+    )
+
+
+def test_get_page_clamps_to_the_available_pages():
+    df = member_table()
+
+    page_df, total_pages = get_page(df, 1, page_size=20)
+    assert total_pages == 3
+    assert page_df["Member Name"].tolist() == df["Member Name"][:20].tolist()
+    # the last page is partial
+    page_df, _ = get_page(df, 3, page_size=20)
+    assert page_df["Member Name"].tolist() == df["Member Name"][40:].tolist()
+    # out of range on either side
+    assert get_page(df, 0, page_size=20)[0].equals(get_page(df, 1, page_size=20)[0])
+    assert get_page(df, 9, page_size=20)[0].equals(get_page(df, 3, page_size=20)[0])
+    # exactly full pages
+    assert get_page(df[:40], 2, page_size=20)[1] == 2
+
+
+def test_empty_table_has_one_empty_page():
+    df = member_table(0)
+
+    page_df, total_pages = get_page(df, 3)
+    assert total_pages == 1
+    assert page_df.empty
+    assert find_member_page(df, ["Member 01"]) is None
+
+
+def test_sort_and_filter_is_stable_and_pages_without_gaps():
+    df = member_table()
+    df.loc[5, "Speeches"] = None
+
+    ordered = sort_and_filter(
+        df,
+        "Speeches",
+        ascending=False,
+        filters={"Party": ["P"], "Constituency": []},
+        tie_breaker="Member Name",
+    )
+    assert set(ordered["Party"]) == {"P"}
+    assert ordered["Member Name"].iloc[-1] == "Member 05"
+    assert ordered.index.tolist() == list(range(len(ordered)))
+    pages = [get_page(ordered, page, page_size=7)[0] for page in range(1, 7)]
+    assert pd.concat(pages)["Member Name"].tolist() == ordered["Member Name"].tolist()
+    assert find_member_page(ordered, ["Member 05"], page_size=7) == 6
+
+
+def page():
+    import pandas as pd
+
+    from tables import paginated_member_table
+
+    df = pd.DataFrame(
+        {
+            "Member Name": [f"Member {i:02d}" for i in range(45)],
+            "Party": ["P" if i % 9 else "Q" for i in range(45)],
+            "Constituency": [f"C{i % 3}" for i in range(45)],
+            "Speeches": [i % 7 for i in range(45)],
+        }
+    )
+    paginated_member_table(df, key="members", default_sort="Member Name")
+
+
+def test_page_index_is_clamped_when_filters_shrink_the_table():
+    at = AppTest.from_function(page).run()
+    assert not at.exception
+    at.number_input(key="members_page").set_value(3).run()
+    assert at.dataframe[0].value["Member Name"].iloc[0] == "Member 40"
+
+    # five members in party Q fit on one page
+    at.multiselect(key="members_filter_Party").set_value(["Q"]).run()
+    assert not at.exception
+    assert at.session_state["members_page"] == 1
+    assert at.dataframe[0].value["Member Name"].tolist() == [
+        "Member 00",
+        "Member 09",
+        "Member 18",
+        "Member 27",
+        "Member 36",
+    ]
+
+    # and nothing at all
+    at.multiselect(key="members_filter_Constituency").set_value(["C1"]).run()
+    assert not at.exception
+    assert at.session_state["members_page"] == 1
+    assert at.dataframe[0].value.empty
+    assert at.caption[-1].value == "No members match the selected filters."
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import terms
+from terms import (
+    build_term_stats,
+    distinctive_terms,
+    get_term_stats,
+    load_term_stats,
+    save_term_stats,
+)
+
+
+def speeches():
+    return pd.DataFrame(
+        {
+            "member_name": ["A", "B", "A"],
+            "year": [2020, 2021, 2021],
+            "text": [
+                "Housing grants for young couples.",
+                "Public transport fares.",
+                "Housing grants again, housing grants always.",
+            ],
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    terms._read_term_stats.clear()
+    yield
+    terms._read_term_stats.clear()
+
+
+def test_saved_statistics_load_read_only(tmp_path):
+    path = str(tmp_path / "term_stats.npz")
+    stats = build_term_stats([speeches()])
+    save_term_stats(stats, "v1", path)
+
+    loaded = load_term_stats(path, "v1")
+    assert np.array_equal(loaded.sketches, stats.sketches)
+    assert not loaded.sketches.flags.writeable
+    assert not loaded.totals.flags.writeable
+    assert load_term_stats(path, "v2") is None
+    assert list(tmp_path.iterdir()) == [tmp_path / "term_stats.npz"]
+    assert not distinctive_terms(loaded, "A", min_count=1).empty
+
+
+def test_statistics_are_not_built_at_page_time(tmp_path, monkeypatch):
+    def stream_query(*args, **kwargs):
+        raise AssertionError("the page must not scan mart_speeches")
+
+    monkeypatch.setattr(terms, "stream_query", stream_query)
+    assert get_term_stats(str(tmp_path / "term_stats.npz")) is None
+
+
+def test_statistics_of_an_earlier_version_are_served(tmp_path):
+    path = str(tmp_path / "term_stats.npz")
+    assert get_term_stats(path) is None
+
+    save_term_stats(build_term_stats([speeches()]), "v1", path)
+    stats, data_version = get_term_stats(path)
+    assert data_version == "v1"
+    assert list(stats.keys["key"]) == ["A", "2020", "B", "2021"]
@@ -0,0 +1,100 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from time_index import (
+    build_time_index,
+    month_range,
+    range_totals,
+    to_month_number,
+    trailing_months,
+)
+
+KEY_FIELDS = ["member_name", "member_party"]
+COUNT_COLUMNS = ["count_sittings_total", "count_speeches"]
+
+
+def speech_summary(seed=0, count_rows=300):
+    rng = np.random.default_rng(seed)
+    summary = pd.DataFrame(
+        {
+            "member_name": rng.choice(["A", "B", "C", "D"], count_rows),
+            "member_party": rng.choice(["P", "Q"], count_rows),
+            # months from 2019 to 2023, with some never sat in
+            "year": rng.integers(2019, 2024, count_rows),
+            "month": rng.choice([1, 2, 3, 5, 7, 8, 11, 12], count_rows),
+            "count_sittings_total": rng.integers(0, 10, count_rows).astype(float),
+            "count_speeches": rng.integers(0, 50, count_rows),
+        }
+    )
+    summary.loc[::17, "count_sittings_total"] = np.nan
+    return summary
+
+
+def brute_force_totals(summary, start_date, end_date):
+    month_numbers = to_month_number(summary["year"], summary["month"])
+    in_range = month_numbers.between(
+        to_month_number(start_date.year, start_date.month),
+        to_month_number(end_date.year, end_date.month),
+    )
+    totals = summary[in_range].groupby(KEY_FIELDS)[COUNT_COLUMNS].sum().astype(np.int64)
+    groups = summary[KEY_FIELDS].drop_duplicates().set_index(KEY_FIELDS).index
+    return totals.reindex(groups, fill_value=0).sort_index()
+
+
+def random_date(rng):
+    # from before the first month indexed to after the last
+    return datetime.date(int(rng.integers(2017, 2026)), int(rng.integers(1, 13)), 15)
+
+
+def test_range_totals_match_groupby_over_random_ranges():
+    summary = speech_summary()
+    index = build_time_index(summary, KEY_FIELDS, COUNT_COLUMNS)
+    rng = np.random.default_rng(1)
+
+    for _ in range(200):
+        start_date, end_date = random_date(rng), random_date(rng)
+        totals = (
+            range_totals(index, start_date, end_date)
+            .set_index(KEY_FIELDS)[COUNT_COLUMNS]
+            .sort_index()
+        )
+        pd.testing.assert_frame_equal(
+            totals, brute_force_totals(summary, start_date, end_date), check_names=False
+        )
+
+
+def test_ranges_outside_the_indexed_months_are_empty():
+    summary = speech_summary()
+    index = build_time_index(summary, KEY_FIELDS, COUNT_COLUMNS)
+
+    for start_date, end_date in [
+        (datetime.date(2010, 1, 1), datetime.date(2018, 12, 31)),
+        (datetime.date(2024, 1, 1), datetime.date(2030, 1, 1)),
+        # ends before it starts
+        (datetime.date(2022, 6, 1), datetime.date(2021, 6, 1)),
+    ]:
+        totals = range_totals(index, start_date, end_date)
+        assert (totals[COUNT_COLUMNS] == 0).all().all()
+        assert len(totals) == len(summary[KEY_FIELDS].drop_duplicates())
+
+
+def test_range_covering_everything_sums_every_row():
+    summary = speech_summary()
+    index = build_time_index(summary, KEY_FIELDS, COUNT_COLUMNS)
+
+    totals = range_totals(index, datetime.date(2000, 1, 1), datetime.date(2100, 1, 1))
+    assert totals["count_speeches"].sum() == summary["count_speeches"].sum()
+
+
+def test_month_range_and_trailing_months():
+    summary = speech_summary()
+    index = build_time_index(summary, KEY_FIELDS, COUNT_COLUMNS)
+
+    assert month_range(index) == (datetime.date(2019, 1, 1), datetime.date(2023, 12, 1))
+    assert trailing_months(index, 12) == (
+        datetime.date(2023, 1, 1),
+        datetime.date(2023, 12, 1),
+    )
+    assert trailing_months(index, 1000)[0] == datetime.date(2019, 1, 1)
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from topics import add_periods, top_topics, topic_timeline
+
+
+def rollup():
+    # two members spoke in the same debate on Rail in January, so the chamber
+    # debated it once, not twice
+    return add_periods(
+        pd.DataFrame(
+            [
+                ("Rail", "A", 2024, 1, False, 1, 3),
+                ("Rail", "B", 2024, 1, False, 1, 1),
+                ("Rail", None, 2024, 1, True, 1, 4),
+                ("Rail", "A", 2024, 2, False, 2, 2),
+                ("Rail", None, 2024, 2, True, 2, 2),
+                ("Housing", "B", 2024, 2, False, 1, 5),
+                ("Housing", None, 2024, 2, True, 1, 5),
+            ],
+            columns=[
+                "topic_title",
+                "member_name",
+                "year",
+                "month",
+                "all_members",
+                "count_topics",
+                "count_speeches",
+            ],
+        )
+    )
+
+
+def test_top_topics_counts_each_debate_once_for_the_chamber():
+    top = top_topics(rollup(), pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 2, 1))
+    assert top.set_index("topic_title").loc["Rail"].tolist() == [6, 3]
+    assert top["topic_title"].tolist() == ["Rail", "Housing"]
+
+
+def test_top_topics_for_a_member():
+    top = top_topics(
+        rollup(), pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 2, 1), member_name="B"
+    )
+    assert top.set_index("topic_title")["count_speeches"].to_dict() == {
+        "Housing": 5,
+        "Rail": 1,
+    }
+
+
+def test_topic_timeline():
+    timeline = topic_timeline(rollup(), ["Rail"])
+    assert timeline["count_topics"].tolist() == [1, 2]
+    assert topic_timeline(rollup(), ["Rail"], "A")["count_speeches"].tolist() == [3, 2]
@@ -0,0 +1,146 @@
+import datetime
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agg_data import get_all_member_speeches
+from members import MEMBER_COUNT_COLUMNS, calculate_member_metrics
+from utils import calculate_readability_vectorised
+
+
+class TimeIndex(NamedTuple):
+    """
+    Cumulative (prefix-sum) counts over consecutive months.
+
+    - keys (pd.DataFrame): One row per group, e.g. member, party and constituency.
+    - first_month (int): Month number (year * 12 + month - 1) of the first month indexed.
+    - cumulative (np.ndarray): Array of shape (groups, months + 1, counts), where
+      `cumulative[:, m]` holds the counts summed over the first `m` months.
+    - columns (List[str]): Names of the counts, in the order of the last axis.
+    """
+
+    keys: pd.DataFrame
+    first_month: int
+    cumulative: np.ndarray
+    columns: List[str]
+
+
+def to_month_number(year, month):
+    return year * 12 + month - 1
+
+
+def build_time_index(
+    speech_summary: pd.DataFrame,
+    key_fields: List[str],
+    count_columns: List[str] = MEMBER_COUNT_COLUMNS,
+) -> TimeIndex:
+    """
+    Builds a prefix-sum index over month for every additive count, so that the
+    totals for any range of months are the difference of two slices.
+
+    Parameters:
+    - speech_summary (pd.DataFrame): Counts at year x month grain, e.g. from `get_all_member_speeches`.
+    - key_fields (List[str]): Fields identifying a group, e.g. ["member_name"].
+    - count_columns (List[str]): Additive counts to index.
+
+    Returns:
+    - TimeIndex: The prefix-sum index.
+    """
+    # Rows with missing keys are left out, as they are by groupby
+    speech_summary = speech_summary.dropna(subset=key_fields)
+    month_numbers = to_month_number(
+        speech_summary["year"].astype(int).to_numpy(),
+        speech_summary["month"].astype(int).to_numpy(),
+    )
+    first_month = int(month_numbers.min())
+    month_positions = month_numbers - first_month
+    count_months = int(month_positions.max()) + 1
+
+    group_codes, keys = pd.MultiIndex.from_frame(speech_summary[key_fields]).factorize()
+    keys = keys.to_frame(index=False, name=key_fields)
+
+    counts = np.zeros((len(keys), count_months, len(count_columns)), dtype=np.int64)
+    np.add.at(
+        counts,
+        (group_codes, month_positions),
+        speech_summary[count_columns].fillna(0).to_numpy(dtype=np.int64),
+    )
+
+    cumulative = np.zeros(
+        (len(keys), count_months + 1, len(count_columns)), dtype=np.int64
+    )
+    np.cumsum(counts, axis=1, out=cumulative[:, 1:])
+
+    return TimeIndex(keys, first_month, cumulative, list(count_columns))
+
+
+def month_range(time_index: TimeIndex):
+    """
+    Returns the first day of the first month and the first day of the last month indexed.
+    """
+    last_month = time_index.first_month + time_index.cumulative.shape[1] - 2
+    return (
+        datetime.date(time_index.first_month // 12, time_index.first_month % 12 + 1, 1),
+        datetime.date(last_month // 12, last_month % 12 + 1, 1),
+    )
+
+
+def trailing_months(time_index: TimeIndex, count_months: int):
+    """
+    Returns the first days of the first and last of the latest `count_months` months indexed.
+    """
+    earliest_month, latest_month = month_range(time_index)
+    start = max(
+        to_month_number(latest_month.year, latest_month.month) - count_months + 1,
+        time_index.first_month,
+    )
+    return datetime.date(start // 12, start % 12 + 1, 1), latest_month
+
+
+def range_totals(
+    time_index: TimeIndex, start_date: datetime.date, end_date: datetime.date
+) -> pd.DataFrame:
+    """
+    Sums every count over the months from `start_date` to `end_date` (inclusive,
+    at month granularity) for all groups, in O(groups).
+
+    Parameters:
+    - time_index (TimeIndex): The prefix-sum index.
+    - start_date (datetime.date): Any date in the first month of the range.
+    - end_date (datetime.date): Any date in the last month of the range.
+
+    Returns:
+    - pd.DataFrame: The key fields and summed counts for each group.
+    """
+    count_months = time_index.cumulative.shape[1] - 1
+    start = to_month_number(start_date.year, start_date.month) - time_index.first_month
+    end = to_month_number(end_date.year, end_date.month) - time_index.first_month + 1
+    start = min(max(start, 0), count_months)
+    end = min(max(end, start), count_months)
+
+    totals = time_index.cumulative[:, end] - time_index.cumulative[:, start]
+    return pd.concat(
+        [time_index.keys, pd.DataFrame(totals, columns=time_index.columns)], axis=1
+    )
+
+
+def range_member_metrics(
+    time_index: TimeIndex, start_date: datetime.date, end_date: datetime.date
+) -> pd.DataFrame:
+    """
+    Calculates attendance, participation, per-sitting and readability metrics
+    over a date range, as `aggregate_member_metrics` does over whole parliaments.
+    """
+    return calculate_member_metrics(
+        range_totals(time_index, start_date, end_date), calculate_readability_vectorised
+    )
+
+
+@st.cache_data(ttl=6000)
+def get_member_time_index() -> TimeIndex:
+    return build_time_index(
+        get_all_member_speeches(),
+        key_fields=["member_name", "member_party", "member_constituency"],
+    )
@@ -0,0 +1,115 @@
+from typing import List, Optional
+
+import pandas as pd
+
+from agg_data import read_synced_dataset
+from utils import project_id
+
+ROLLUP_KEYS = ["topic_title", "member_name", "year", "month", "all_members"]
+ROLLUP_COLUMNS = ROLLUP_KEYS + ["count_topics", "count_speeches", "period"]
+
+
+def topic_rollup_query(since_year_month: Optional[int] = None) -> str:
+    """
+    Counts speeches and distinct debates (topic_id) per topic, member and
+    month, plus rows with `all_members` set and no member which count them for
+    the whole chamber. Debates are counted distinct in the query, since the
+    same debate is counted once for each member who spoke in it and those
+    counts cannot be summed; a debate only falls in one month, so counts can
+    be summed over months.
+    """
+    where_clause = ""
+    if since_year_month:
+        # filtered on the date itself, so that BigQuery can prune by it
+        year, month = divmod(int(since_year_month), 100)
+        where_clause = f"where date >= date({year}, {month}, 1)"
+    return f"""
+    select
+        topic_title,
+        member_name,
+        extract(year from date) as year,
+        extract(month from date) as month,
+        grouping(member_name) = 1 as all_members,
+        count(distinct topic_id) as count_topics,
+        count(*) as count_speeches
+    from `{project_id}.prod_mart.mart_speeches`
+    {where_clause}
+    group by grouping sets (
+        (topic_title, member_name, year, month),
+        (topic_title, year, month)
+    )
+    """
+
+
+def add_periods(rollup: pd.DataFrame) -> pd.DataFrame:
+    rollup["period"] = pd.to_datetime(
+        dict(year=rollup["year"], month=rollup["month"], day=1)
+    )
+    return rollup
+
+
+def get_topic_rollup() -> pd.DataFrame:
+    """
+    Returns the topic x member x month rollup kept up to date by the sync job
+    (python -m sync), which is empty until the first sync.
+    """
+    rollup = read_synced_dataset("topic_rollup")
+    if rollup is None:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    return rollup
+
+
+def _rollup_rows(rollup: pd.DataFrame, member_name: Optional[str]) -> pd.Series:
+    all_members = rollup["all_members"].astype(bool)
+    if member_name:
+        return ~all_members & (rollup["member_name"] == member_name)
+    return all_members
+
+
+def top_topics(
+    rollup: pd.DataFrame,
+    start_period: pd.Timestamp,
+    end_period: pd.Timestamp,
+    n: int = 10,
+    member_name: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Returns the topics with the most speeches over a range of months.
+
+    Parameters:
+    - rollup (pd.DataFrame): Output of `get_topic_rollup`.
+    - start_period (pd.Timestamp): First month of the range.
+    - end_period (pd.Timestamp): Last month of the range.
+    - n (int): Number of topics to return.
+    - member_name (str): Only count speeches by this member.
+
+    Returns:
+    - pd.DataFrame: Topic titles with their summed counts, most speeches first.
+    """
+    mask = _rollup_rows(rollup, member_name) & rollup["period"].between(
+        start_period, end_period
+    )
+    return (
+        rollup[mask]
+        .groupby("topic_title")[["count_speeches", "count_topics"]]
+        .sum()
+        .nlargest(n, "count_speeches")
+        .reset_index()
+    )
+
+
+def topic_timeline(
+    rollup: pd.DataFrame,
+    topic_titles: List[str],
+    member_name: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Returns monthly speech counts for a set of topics, optionally for one member.
+    """
+    mask = _rollup_rows(rollup, member_name) & rollup["topic_title"].isin(topic_titles)
+    return (
+        rollup[mask]
+        .groupby(["period", "topic_title"])[["count_speeches", "count_topics"]]
+        .sum()
+        .reset_index()
+    )
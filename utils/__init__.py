@@ -1,7 +1,21 @@
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 import streamlit as st
 from google.oauth2 import service_account
 from google.cloud import bigquery
 import pandas as pd
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows, where the ledger is written without a file lock
+    fcntl = None
 
 EARLIEST_SITTING = "2012-09-10"
 
@@ -30,20 +44,384 @@ client = bigquery.Client(credentials=credentials)
 project_id = "singapore-parliament-speeches"
 
 
+# Query cost guard. Budgets can be set in the query_budget section of the secrets.
+# The hourly budget is kept per process: the Streamlit server, the API server
+# and each command line run count their own last hour of bytes separately.
+QUERY_BUDGET = st.secrets.get("query_budget", {})
+MAX_BYTES_PER_QUERY = int(QUERY_BUDGET.get("max_bytes_per_query", 10 * 1024**3))
+MAX_BYTES_PER_HOUR = int(QUERY_BUDGET.get("max_bytes_per_hour", 100 * 1024**3))
+QUERY_COSTS_PATH = os.path.join("data", "query_costs.json")
+# seconds between writes of the ledger; it is also written when the process exits
+QUERY_COSTS_FLUSH_INTERVAL = 60
+# rows of stale results kept in total, least recently stored dropped first
+STALE_RESULTS_MAX_ROWS = 200000
+
+# per distinct query: its dry-run estimate, and how often it ran, was refused
+# or was answered with a stale result
+_query_costs: Dict[str, dict] = {}
+# the same, counting only what happened since the ledger was last written
+_unsaved_costs: Dict[str, dict] = {}
+_last_saved = time.monotonic()
+# [time, bytes] of the queries run in the last hour, by this process
+_hourly_usage: list = []
+# the last result of each query run by run_query, served when over budget
+_stale_results: "OrderedDict[str, list]" = OrderedDict()
+_query_costs_lock = threading.RLock()
+_ledger_lock = threading.Lock()
+
+QUERY_COST_COUNTERS = ("runs", "bytes_billed", "refused", "served_stale")
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised instead of running a query which would exceed the bytes budget.
+    """
+
+
+def _cost_key(query: str, job_config: Optional[bigquery.QueryJobConfig]) -> str:
+    if job_config is None or not job_config.query_parameters:
+        return query
+    parameters = [p.to_api_repr() for p in job_config.query_parameters]
+    return f"{query}\n-- parameters: {json.dumps(parameters, default=str)}"
+
+
+def _new_query_cost() -> dict:
+    return {
+        "estimated_bytes": None,
+        **{counter: 0 for counter in QUERY_COST_COUNTERS},
+        "last_run": None,
+    }
+
+
+def _record_query_cost(key: str, **changes):
+    """
+    Records a change to a query's costs: counters in `changes` are added to,
+    and 'estimated_bytes' and 'last_run' replaced. Callers hold _query_costs_lock.
+    """
+    for costs in (_query_costs, _unsaved_costs):
+        cost = costs.setdefault(key, _new_query_cost())
+        for field, value in changes.items():
+            if field in QUERY_COST_COUNTERS:
+                cost[field] += value
+            else:
+                cost[field] = value
+
+
+def merge_query_costs(
+    ledger: Dict[str, dict], changes: Dict[str, dict]
+) -> Dict[str, dict]:
+    """
+    Adds counted changes to a ledger field by field, so counts other processes
+    wrote are kept. The latest estimate and run time replace the ledger's.
+    """
+    for key, change in changes.items():
+        cost = {**_new_query_cost(), **ledger.get(key, {})}
+        for counter in QUERY_COST_COUNTERS:
+            cost[counter] += change[counter]
+        if change["estimated_bytes"] is not None:
+            cost["estimated_bytes"] = change["estimated_bytes"]
+        if change["last_run"] is not None:
+            cost["last_run"] = max(cost["last_run"] or "", change["last_run"])
+        ledger[key] = cost
+    return ledger
+
+
+def save_query_costs(path: str = QUERY_COSTS_PATH):
+    """
+    Adds the costs counted since the last save to the query cost ledger, which
+    other processes add theirs to too.
+    """
+    global _last_saved
+    with _query_costs_lock:
+        changes = dict(_unsaved_costs)
+        _unsaved_costs.clear()
+        _last_saved = time.monotonic()
+    if not changes:
+        return
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with _ledger_lock, open(f"{path}.lock", "w") as lock:
+        if fcntl is not None:
+            # held while the ledger is read and replaced, so no process's
+            # changes are lost to another's write
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        ledger = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                ledger = json.load(f)
+        ledger = merge_query_costs(ledger, changes)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w") as f:
+                json.dump(ledger, f, indent=2)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+
+def _save_query_costs_periodically():
+    if time.monotonic() - _last_saved > QUERY_COSTS_FLUSH_INTERVAL:
+        save_query_costs()
+
+
+atexit.register(save_query_costs)
+
+
+def bytes_used_last_hour() -> int:
+    with _query_costs_lock:
+        an_hour_ago = time.time() - 3600
+        _hourly_usage[:] = [usage for usage in _hourly_usage if usage[0] > an_hour_ago]
+        return sum(usage[1] for usage in _hourly_usage)
+
+
+def estimate_query_bytes(
+    query: str,
+    job_config: Optional[bigquery.QueryJobConfig] = None,
+    bigquery_client: Optional[bigquery.Client] = None,
+) -> int:
+    """
+    Returns the bytes a query would scan, from a dry run made once per
+    distinct query (and query parameters).
+    """
+    key = _cost_key(query, job_config)
+    with _query_costs_lock:
+        estimate = _query_costs.get(key, {}).get("estimated_bytes")
+    if estimate is not None:
+        return estimate
+
+    dry_run_config = bigquery.QueryJobConfig(
+        dry_run=True,
+        use_query_cache=False,
+        query_parameters=job_config.query_parameters if job_config else [],
+    )
+    dry_run = (bigquery_client or client).query(query, job_config=dry_run_config)
+    estimate = dry_run.total_bytes_processed or 0
+    with _query_costs_lock:
+        _record_query_cost(key, estimated_bytes=estimate)
+    return estimate
+
+
+def guarded_query(
+    query: str,
+    job_config: Optional[bigquery.QueryJobConfig] = None,
+    bigquery_client: Optional[bigquery.Client] = None,
+) -> bigquery.QueryJob:
+    """
+    Runs a query within the bytes budgets, and waits for it to finish. The
+    query is refused if its estimated bytes exceed MAX_BYTES_PER_QUERY, or
+    would take the bytes this process used in the last hour over
+    MAX_BYTES_PER_HOUR. BigQuery is also told not to bill more than
+    MAX_BYTES_PER_QUERY, or the job configuration's own maximum_bytes_billed
+    if that is lower.
+
+    Parameters:
+    - query (str): The query to run.
+    - job_config (bigquery.QueryJobConfig): Configuration of the query, e.g. its parameters.
+    - bigquery_client (bigquery.Client): Client to use, defaults to the app's client.
+
+    Returns:
+    - bigquery.QueryJob: The finished query job.
+
+    Raises:
+    - QueryBudgetExceeded: If the query would exceed a budget.
+    """
+    key = _cost_key(query, job_config)
+    estimate = estimate_query_bytes(query, job_config, bigquery_client)
+
+    with _query_costs_lock:
+        used = bytes_used_last_hour()
+        if estimate > MAX_BYTES_PER_QUERY or used + estimate > MAX_BYTES_PER_HOUR:
+            _record_query_cost(key, refused=1)
+            raise QueryBudgetExceeded(
+                f"Query estimated at {estimate:,} bytes refused: the budget is"
+                f" {MAX_BYTES_PER_QUERY:,} bytes per query and {MAX_BYTES_PER_HOUR:,}"
+                f" bytes per hour, of which {used:,} were used."
+            )
+        # reserve the estimate, so concurrent queries can't overshoot the budget
+        usage = [time.time(), estimate]
+        _hourly_usage.append(usage)
+
+    # copied, so the caller's configuration is left as it was
+    job_config = copy.deepcopy(job_config) if job_config else bigquery.QueryJobConfig()
+    job_config.maximum_bytes_billed = min(
+        job_config.maximum_bytes_billed or MAX_BYTES_PER_QUERY, MAX_BYTES_PER_QUERY
+    )
+    query_job = (bigquery_client or client).query(query, job_config=job_config)
+    query_job.result()
+
+    with _query_costs_lock:
+        bytes_billed = query_job.total_bytes_billed or 0
+        usage[1] = bytes_billed
+        _record_query_cost(
+            key,
+            runs=1,
+            bytes_billed=bytes_billed,
+            last_run=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        )
+    _save_query_costs_periodically()
+    return query_job
+
+
+def query_cost_report(path: str = QUERY_COSTS_PATH) -> pd.DataFrame:
+    """
+    Returns the recorded cost of every distinct query, most expensive first.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with open(path) as f:
+        ledger = json.load(f)
+    report = pd.DataFrame.from_dict(ledger, orient="index").rename_axis("query")
+    report = report.reset_index()
+    report["query"] = report["query"].str.split().str.join(" ")
+    return report.sort_values("estimated_bytes", ascending=False, ignore_index=True)
+
+
 @st.cache_data(ttl=6000)
-def run_query(query):
-    query_job = client.query(query)
+def _run_query(query):
+    query_job = guarded_query(query)
     rows_raw = query_job.result()
     # Convert to list of dicts. Required for st.cache_data to hash the return value.
     rows = [dict(row) for row in rows_raw]
+    _keep_stale_result(query, rows)
     return rows
 
 
+def _keep_stale_result(key: str, rows: list):
+    with _query_costs_lock:
+        _stale_results.pop(key, None)
+        _stale_results[key] = rows
+        stored_rows = sum(len(stale) for stale in _stale_results.values())
+        while stored_rows > STALE_RESULTS_MAX_ROWS and len(_stale_results) > 1:
+            _, dropped = _stale_results.popitem(last=False)
+            stored_rows -= len(dropped)
+
+
+def _stale_result(key: str) -> Optional[list]:
+    with _query_costs_lock:
+        rows = _stale_results.get(key)
+        if rows is not None:
+            _stale_results.move_to_end(key)
+            _record_query_cost(key, served_stale=1)
+        return rows
+
+
+def run_query(query):
+    try:
+        return _run_query(query)
+    except QueryBudgetExceeded:
+        # over budget: serve the last result if there is one (the failure
+        # isn't cached, so the query runs again once within budget)
+        rows = _stale_result(query)
+        if rows is None:
+            raise
+        return rows
+
+
 @st.cache_data(ttl=6000)
 def query_to_dataframe(query):
     return pd.DataFrame(run_query(query))
 
 
+def run_parameterised_query(query: str, parameters: Tuple[Tuple[str, str, Any], ...]):
+    """
+    Runs a query with BigQuery query parameters, for queries built from user
+    input. Unlike `run_query`, the result is not cached; callers cache it. Like
+    `run_query`, a query over budget is answered with its last result for the
+    same parameters, if there is one.
+
+    Parameters:
+    - query (str): The query, referring to parameters as @name.
+    - parameters (Tuple[Tuple[str, str, Any], ...]): Name, BigQuery type and
+      value of each parameter. Lists and tuples are passed as array parameters.
+
+    Returns:
+    - List[dict]: The rows of the result.
+    """
+    query_parameters = [
+        bigquery.ArrayQueryParameter(name, type_, list(value))
+        if isinstance(value, (list, tuple))
+        else bigquery.ScalarQueryParameter(name, type_, value)
+        for name, type_, value in parameters
+    ]
+    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+    key = _cost_key(query, job_config)
+    try:
+        query_job = guarded_query(query, job_config=job_config)
+    except QueryBudgetExceeded:
+        rows = _stale_result(key)
+        if rows is None:
+            raise
+        return rows
+    rows = [dict(row) for row in query_job.result()]
+    _keep_stale_result(key, rows)
+    return rows
+
+
+STREAM_BATCH_SIZE = 10000
+
+
+class StreamPosition(NamedTuple):
+    """
+    Where a streamed result can be resumed from.
+
+    - destination (bigquery.TableReference): Table holding the query job's
+      result. BigQuery keeps anonymous result tables for about a day.
+    - page_token (str): Token of the next page, None after the last batch.
+    """
+
+    destination: bigquery.TableReference
+    page_token: Optional[str]
+
+
+def stream_query(
+    query: str,
+    batch_size: int = STREAM_BATCH_SIZE,
+    resume_from: Optional[StreamPosition] = None,
+    bigquery_client: Optional[bigquery.Client] = None,
+) -> Iterator[Tuple[pd.DataFrame, StreamPosition]]:
+    """
+    Runs a query and yields its result in columnar batches, for results too
+    large to hold in memory at once (unlike `run_query`).
+
+    Each batch is one page of the result, of at most `batch_size` rows; BigQuery
+    returns smaller pages when a page would exceed its response size limit.
+    Pages are only requested from BigQuery as the caller asks for the next
+    batch, so a slow consumer holds at most one batch in memory.
+
+    Parameters:
+    - query (str): The query to run.
+    - batch_size (int): Maximum number of rows per batch.
+    - resume_from (StreamPosition): Position yielded with an earlier batch, to
+      continue after that batch from the same result without running the query again.
+    - bigquery_client (bigquery.Client): Client to use, defaults to the app's client.
+
+    Yields:
+    - Tuple[pd.DataFrame, StreamPosition]: A batch, and the position after it.
+    """
+    bigquery_client = bigquery_client or client
+    if resume_from is None:
+        destination = guarded_query(query, bigquery_client=bigquery_client).destination
+        page_token = None
+    else:
+        destination, page_token = resume_from
+        if page_token is None:
+            return
+
+    rows = bigquery_client.list_rows(
+        destination, page_size=batch_size, page_token=page_token
+    )
+    column_names = [field.name for field in rows.schema]
+    for page in rows.pages:
+        columns = zip(*(row.values() for row in page)) if page.num_items else ()
+        batch = pd.DataFrame(
+            dict(zip(column_names, (list(column) for column in columns))),
+            columns=column_names,
+        )
+        yield batch, StreamPosition(destination, rows.next_page_token)
+
+
 def calculate_readability(row):
     total_words = row["count_words"]
     total_sentences = row["count_sentences"]
@@ -60,41 +438,115 @@ def calculate_readability(row):
     return readability
 
 
+def calculate_readability_vectorised(df: pd.DataFrame) -> pd.Series:
+    """
+    Calculates readability as `calculate_readability` does, for all rows at once.
+
+    Parameters:
+    - df (pd.DataFrame): DataFrame with 'count_words', 'count_sentences' and 'count_syllables' columns.
+
+    Returns:
+    - pd.Series: Readability per row, NaN where there are no words or sentences.
+    """
+    total_words = df["count_words"].where(df["count_words"] != 0)
+    total_sentences = df["count_sentences"].where(df["count_sentences"] != 0)
+
+    return (
+        206.835
+        - (1.015 * total_words / total_sentences)
+        - (84.6 * df["count_syllables"] / total_words)
+    )
+
+
+PERCENTAGE_FORMAT = "%.1f%%"
+COUNT_FORMAT = "%d"
+HIGHLIGHT_STYLE = "background-color: yellow"
+
+
 def process_metric_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Processes DataFrame columns that contain the '%' symbol in their names.
-    For these columns, rounds the values to 1 decimal place and adds a '%' suffix.
+    For these columns, rounds the values to 1 decimal place.
 
     Processes DataFrame columns that contain the '#' symbol in their names.
-    For these columns, rounds the values to 0 decimal places.
+    For these columns, rounds the values to 0 decimal places and casts them to
+    a nullable integer type.
+
+    Values stay numeric so that tables remain numerically sortable; the '%'
+    suffix is applied at display time through `metric_column_config`.
 
     Parameters:
     - df (pd.DataFrame): The DataFrame to process.
 
     Returns:
-    - pd.DataFrame: The processed DataFrame with percentage columns formatted.
+    - pd.DataFrame: The processed DataFrame with metric columns rounded.
     """
     if not isinstance(df, pd.DataFrame):
         raise ValueError("Input is not a DataFrame")
 
-    def format_percentage(value):
-        if pd.isna(value):
-            return value
-        return f"{value:.1f}%"
-
-    def format_count(value):
-        if pd.isna(value):
-            return value
-        return round(value)
-
     # Identify columns with '%' in their names
     percentage_columns = [col for col in df.columns if "%" in col]
     count_columns = [col for col in df.columns if "#" in col]
 
-    for col in percentage_columns:
-        df[col] = df[col].apply(lambda x: format_percentage(x))
+    if percentage_columns:
+        df[percentage_columns] = df[percentage_columns].astype(float).round(1)
 
     for col in count_columns:
-        df[col] = df[col].apply(lambda x: format_count(x))
+        df[col] = df[col].astype(float).round(0).astype("Int64")
 
     return df
+
+
+def metric_column_config(columns) -> dict:
+    """
+    Builds a Streamlit column configuration for metric columns, using the same
+    naming convention as `process_metric_columns`: '%' columns are displayed
+    with 1 decimal place and a '%' suffix, '#' columns as whole numbers.
+
+    Parameters:
+    - columns (Iterable[str]): Column names of the table to be displayed.
+
+    Returns:
+    - dict: Mapping of column name to `st.column_config.NumberColumn`.
+    """
+    config = {}
+    for col in columns:
+        if "%" in col:
+            config[col] = st.column_config.NumberColumn(col, format=PERCENTAGE_FORMAT)
+        elif "#" in col:
+            config[col] = st.column_config.NumberColumn(col, format=COUNT_FORMAT)
+    return config
+
+
+def highlight_rows(df: pd.DataFrame, mask: pd.Series):
+    """
+    Highlights the rows of a DataFrame selected by a boolean mask.
+
+    The style frame is built in one vectorised assignment rather than per row.
+    As Streamlit uses Styler display values over column formats, the metric
+    formats are re-applied on the Styler; the underlying values stay numeric.
+
+    Parameters:
+    - df (pd.DataFrame): The DataFrame to display.
+    - mask (pd.Series): Boolean Series aligned to `df.index`, True for rows to highlight.
+
+    Returns:
+    - pd.DataFrame | Styler: `df` unchanged if no rows are highlighted, otherwise a Styler.
+    """
+    mask = mask.reindex(df.index, fill_value=False).to_numpy(dtype=bool)
+    if not mask.any():
+        return df
+
+    styles = pd.DataFrame("", index=df.index, columns=df.columns)
+    styles.iloc[mask, :] = HIGHLIGHT_STYLE
+
+    # the same printf formats as `metric_column_config`, so highlighted and
+    # plain tables look alike
+    formatters = {}
+    for col in df.columns:
+        if "%" in col:
+            formatters[col] = PERCENTAGE_FORMAT.__mod__
+        elif "#" in col:
+            formatters[col] = COUNT_FORMAT.__mod__
+
+    return df.style.apply(lambda _: styles, axis=None).format(formatters, na_rep="")
@@ -0,0 +1,43 @@
+import argparse
+
+import pandas as pd
+
+from utils import (
+    MAX_BYTES_PER_HOUR,
+    MAX_BYTES_PER_QUERY,
+    QUERY_COSTS_PATH,
+    query_cost_report,
+)
+
+
+def format_bytes(count):
+    if pd.isna(count):
+        return ""
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if count < 1024:
+            return f"{count:,.1f} {unit}"
+        count /= 1024
+    return f"{count:,.1f} TiB"
+
+
+parser = argparse.ArgumentParser(
+    description="Report the estimated and billed bytes of every distinct query the app has run."
+)
+parser.add_argument("--path", default=QUERY_COSTS_PATH)
+parser.add_argument(
+    "--width", type=int, default=80, help="Characters of each query shown."
+)
+args = parser.parse_args()
+
+report = query_cost_report(args.path)
+print(
+    f"Budgets: {format_bytes(MAX_BYTES_PER_QUERY)} per query,"
+    f" {format_bytes(MAX_BYTES_PER_HOUR)} per hour per process."
+)
+if report.empty:
+    print(f"No queries recorded in {args.path}.")
+else:
+    report["query"] = report["query"].str.slice(0, args.width)
+    for column in ["estimated_bytes", "bytes_billed"]:
+        report[column] = report[column].map(format_bytes)
+    print(report.to_string(index=False))